@@ -1,6 +1,18 @@
+import tempfile
+from pathlib import Path
+
 import click
 
+from eit_dash.app import loading_cache, session_store
+from eit_dash.definitions.constants import CACHE_DIR_VARIABLE, COMPACT_STORAGE_VARIABLE
 from eit_dash.main import app
+from eit_dash.utils.batch_import import find_recordings, import_files
+from eit_dash.utils.loading import RecordingCache
+from eit_dash.utils.pipeline import read_config, run_pipeline, write_results
+
+# maximum time in seconds for handling a request before a worker is restarted. Loading a long recording can take a
+# while, so this is much longer than the default of gunicorn
+WORKER_TIMEOUT = 600
 
 
 @click.group(invoke_without_command=True)
@@ -12,9 +24,152 @@ def cli(ctx):
 
 
 @cli.command(name="run", help="Start the dashboard.")
-def run():
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on.")
+@click.option("--port", default=8050, show_default=True, help="Port to listen on.")
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of worker processes. More than one worker requires gunicorn.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar=CACHE_DIR_VARIABLE,
+    help="Directory where the sessions and the loaded recordings are shared between the workers "
+    f"[env var: {CACHE_DIR_VARIABLE}]. "
+    "Defaults to a temporary directory when running with several workers.",
+)
+@click.option(
+    "--compact-storage",
+    is_flag=True,
+    envvar=COMPACT_STORAGE_VARIABLE,
+    help="Store the loaded datasets in single precision, using about half of the memory "
+    f"[env var: {COMPACT_STORAGE_VARIABLE}].",
+)
+def run(host, port, workers, cache_dir, compact_storage):
     """Start the dashboard."""
-    app.run_server(debug=True)
+    session_store.compact = compact_storage
+
+    if cache_dir:
+        loading_cache.recording_cache = RecordingCache(cache_dir / "eit_dash_recordings")
+
+    if workers > 1:
+        session_store.cache_dir = cache_dir or Path(tempfile.gettempdir()) / "eit_dash_sessions"
+        run_gunicorn(f"{host}:{port}", workers)
+    else:
+        session_store.cache_dir = cache_dir
+        app.run_server(host=host, port=port, debug=True)
+
+
+@cli.command(name="import", help="Load all the recordings of a directory, so that the dashboard opens them quickly.")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option("--recursive", is_flag=True, help="Also load the recordings in the subdirectories.")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of processes loading the recordings. Defaults to the number of processors.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar=CACHE_DIR_VARIABLE,
+    help=f"Cache directory of the dashboard [env var: {CACHE_DIR_VARIABLE}]. Defaults to a temporary directory.",
+)
+def import_directory(directory, recursive, workers, cache_dir):
+    """Load the recordings of a directory in parallel, saving them in the recording cache of the dashboard."""
+    if cache_dir:
+        loading_cache.recording_cache = RecordingCache(cache_dir / "eit_dash_recordings")
+
+    paths = find_recordings(directory, recursive=recursive)
+    if not paths:
+        msg = f"No recordings found in {directory}"
+        raise click.ClickException(msg)
+
+    def report_progress(file, done, total):
+        status = click.style(f"failed ({file.error})", fg="red") if file.failed else "ok"
+        click.echo(f"[{done}/{total}] {file.path}: {status}")
+
+    report = import_files(paths, loading_cache.recording_cache, max_workers=workers, progress=report_progress)
+
+    click.echo(report.summary())
+
+    if report.failures:
+        raise SystemExit(1)
+
+
+@cli.command(name="pipeline", help="Compute the EELI of the periods of several recordings, without the dashboard.")
+@click.argument("config", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--output",
+    required=True,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory where the results are written.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of processes analyzing the recordings. Defaults to the number of processors.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar=CACHE_DIR_VARIABLE,
+    help=f"Cache directory of the dashboard [env var: {CACHE_DIR_VARIABLE}]. Defaults to a temporary directory.",
+)
+def pipeline(config, output, workers, cache_dir):
+    """Select the periods of the recordings of a configuration file, filter them and compute their EELI in parallel."""
+    if cache_dir:
+        loading_cache.recording_cache = RecordingCache(cache_dir / "eit_dash_recordings")
+
+    try:
+        pipeline_config = read_config(config)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+    def report_progress(result, done, total):
+        status = click.style(f"failed ({result.error})", fg="red") if result.failed else "ok"
+        click.echo(f"[{done}/{total}] {result.recording.path}: {status}")
+
+    report = run_pipeline(
+        pipeline_config,
+        loading_cache.recording_cache,
+        max_workers=workers,
+        progress=report_progress,
+    )
+
+    write_results(report, output)
+    click.echo(report.summary())
+    click.echo(f"Results written to {output}")
+
+    if report.failures:
+        raise SystemExit(1)
+
+
+def run_gunicorn(bind: str, workers: int) -> None:
+    """Serve the dashboard with several gunicorn worker processes.
+
+    Args:
+        bind: address and port to listen on
+        workers: number of worker processes
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        msg = "Running with several workers requires gunicorn. Install it with `pip install eit_dash[server]`"
+        raise click.ClickException(msg) from e
+
+    class DashApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", bind)
+            self.cfg.set("workers", workers)
+            self.cfg.set("timeout", WORKER_TIMEOUT)
+
+        def load(self):
+            return app.server
+
+    DashApplication().run()
 
 
 if __name__ == "__main__":
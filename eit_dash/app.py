@@ -1,16 +1,34 @@
 import logging
+import os
+import tempfile
+from pathlib import Path
 
 import dash_bootstrap_components as dbc
-from dash import Dash
+import diskcache
+from dash import Dash, DiskcacheManager
 
-from .utils import data_singleton
+from .definitions.constants import CACHE_DIR_VARIABLE
+from .utils.loading import LoadingCache, RecordingCache
+from .utils.session_store import SessionStore
 
 # this avoids the printing of warning errors in the console
 logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
-# this is a shared object to use the data through different pages
-# it is initialized here, and imported by the callbacks pages when needed
-data_object = data_singleton.get_singleton()
+# the data of each browser session is kept on the server, and shared through the different pages.
+# It is initialized here, and imported by the callbacks pages when needed.
+# When running with several processes, the sessions are shared through the cache directory
+session_store = SessionStore(cache_dir=os.environ.get(CACHE_DIR_VARIABLE))
+
+# the data loaded from files, shared by all the sessions of this process. The parsed files are also saved on disk,
+# to be shared by all the processes and to be read again quickly after a restart
+cache_dir = Path(os.environ.get(CACHE_DIR_VARIABLE) or tempfile.gettempdir())
+loading_cache = LoadingCache(recording_cache=RecordingCache(cache_dir / "eit_dash_recordings"))
+
+# the background callbacks (e.g. loading a file) run in separate processes. Their progress and their results are
+# shared with the app through this cache, which is also used to pass the loaded data back to the app
+job_cache = diskcache.Cache(cache_dir / "eit_dash_jobs")
+background_callback_manager = DiskcacheManager(job_cache)
+
 FONT_AWESOME = "https://use.fontawesome.com/releases/v5.13.0/css/all.css"
 external_stylesheets = [dbc.themes.BOOTSTRAP, FONT_AWESOME]
 app = Dash(
@@ -18,4 +36,5 @@ app = Dash(
     use_pages=True,
     external_stylesheets=external_stylesheets,
     suppress_callback_exceptions=True,
+    background_callback_manager=background_callback_manager,
 )
@@ -0,0 +1,45 @@
+// Clientside callbacks toggling the visibility of the signals plotted in a figure.
+// The figure is updated in the browser, so ticking a signal does not involve the server.
+
+// same as RAW_EIT_LABEL in eit_dash/definitions/constants.py
+const RAW_EIT_LABEL = "global_impedance_(raw)";
+
+function selectedLabels(ticked, options) {
+    return (ticked || []).map((value) => options[value].label);
+}
+
+function withVisibility(figure, visibility) {
+    const data = figure.data.map((trace) => Object.assign({}, trace, {visible: visibility(trace.name)}));
+
+    return Object.assign({}, figure, {data: data});
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    visibility: {
+        // load page: the raw EIT signal is shown, the ticked signals are available in the legend
+        preview_signals: function (ticked, options, figure) {
+            if (!figure || !figure.data) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            const selected = selectedLabels(ticked, options);
+
+            return withVisibility(figure, (name) => {
+                if (name === RAW_EIT_LABEL) {
+                    return true;
+                }
+                return selected.includes(name) ? "legendonly" : false;
+            });
+        },
+
+        // preprocessing page: only the ticked signals are shown, and the graph is displayed
+        periods_signals: function (ticked, options, figure) {
+            if (!figure || !figure.data) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            const selected = selectedLabels(ticked, options);
+
+            // the second output is the style of the graph (GRAPH in eit_dash/definitions/layout_styles.py)
+            return [withVisibility(figure, (name) => selected.includes(name)), {}];
+        },
+    },
+});
@@ -1,21 +1,31 @@
+from __future__ import annotations
+
 import contextlib
+import uuid
 
 import plotly.graph_objects as go
-from dash import Input, Output, State, callback, ctx
+from dash import Input, Output, State, callback, ctx, no_update
+from dash.exceptions import PreventUpdate
+from plotly.subplots import make_subplots
 
-# from eitprocessing.parameters.eeli import EELI
 import eit_dash.definitions.element_ids as ids
 import eit_dash.definitions.layout_styles as styles
-from eit_dash.app import data_object
-from eit_dash.definitions.constants import FILTERED_EIT_LABEL, RAW_EIT_LABEL
+from eit_dash.app import job_cache, session_store
+from eit_dash.definitions.constants import (
+    EELI_RESULT,
+    FILTERED_EIT_LABEL,
+    JOB_RESULT_EXPIRE,
+    MAX_PLOT_POINTS,
+    RAW_EIT_LABEL,
+)
 from eit_dash.utils.common import (
     create_filter_results_card,
     create_info_card,
     create_selected_period_card,
 )
-
-# ruff: noqa: ERA001
-eeli = []
+from eit_dash.utils.downsampling import downsample
+from eit_dash.utils.eeli import compute_signals_eeli, get_eeli_inputs, get_period_eeli
+from eit_dash.utils.regional import get_period_regional_maps
 
 
 @callback(
@@ -26,11 +36,12 @@ eeli = []
     ],
     [
         State(ids.SUMMARY_COLUMN_ANALYZE, "children"),
+        State(ids.SESSION_ID, "data"),
     ],
     # this allows duplicate outputs with initial call
     prevent_initial_call="initial_duplicate",
 )
-def page_setup(_, summary):
+def page_setup(_, summary, session_id):
     """Setups the page elements when it starts up.
 
     When the page is loaded, it populates the summary column
@@ -41,6 +52,8 @@ def page_setup(_, summary):
     options = []
 
     if trigger is None:
+        data_object = session_store.get(session_id).loaded_data
+
         for d in data_object.get_all_sequences():
             card = create_info_card(d)
             summary += [card]
@@ -78,31 +91,111 @@ def page_setup(_, summary):
 
 @callback(
     Output(ids.EELI_RESULTS_GRAPH_DIV, "hidden"),
+    Output(ids.EELI_REQUEST, "data"),
     Input(ids.EELI_APPLY, "n_clicks"),
+    State(ids.SESSION_ID, "data"),
+    prevent_initial_call=True,
+)
+def apply_eeli(_, session_id):
+    """Apply EELI and store results.
+
+    The EELI of each period is only computed if it has not been computed yet with the same signal and filter, so
+    applying it again (e.g. when opening the page again) is immediate. The missing results are computed in the
+    background by `compute_eeli_job`, which receives the signals through the job cache.
+    """
+    session = session_store.get(session_id)
+    # selection, inputs and signal of the periods to be computed, by period index
+    signals = {}
+
+    for period in session.loaded_data.get_all_stable_periods():
+        inputs = get_eeli_inputs(period)
+        if session.results.get(period.get_period_index(), EELI_RESULT, inputs) is None:
+            data = period.get_data()
+            signals[period.get_period_index()] = (
+                period.get_selection(),
+                inputs,
+                data.continuous_data[inputs[0]].values,  # noqa: PD011
+                data.eit_data["raw"].framerate,
+            )
+
+    if signals:
+        job_key = f"eeli-signals-{session_id}-{uuid.uuid4().hex}"
+        job_cache.set(job_key, signals, expire=JOB_RESULT_EXPIRE)
+        return no_update, {"key": job_key}
+
+    return False, no_update
+
+
+@callback(
+    Output(ids.EELI_RESULTS, "data"),
+    Input(ids.EELI_REQUEST, "data"),
+    State(ids.SESSION_ID, "data"),
+    background=True,
+    progress=[
+        Output(ids.EELI_PROGRESS, "value"),
+        Output(ids.EELI_PROGRESS, "label"),
+    ],
+    running=[
+        (Output(ids.EELI_APPLY, "disabled"), True, False),
+        (Output(ids.EELI_PROGRESS_DIV, "hidden"), False, True),
+    ],
+    prevent_initial_call=True,
+)
+def compute_eeli_job(set_progress, request, session_id):
+    """Compute the EELI of the signals requested by `apply_eeli`, in a pool of processes.
+
+    The results are passed to `store_eeli` through the job cache. The returned key identifies them.
+    """
+    # the signals may have expired, if the job has not started for a long time
+    signals = job_cache.pop(request["key"], None)
+    if signals is None:
+        raise PreventUpdate
+
+    set_progress((0, f"0/{len(signals)} periods"))
+
+    def report_progress(_, done, total):
+        set_progress((100 * done // total, f"{done}/{total} periods"))
+
+    results = compute_signals_eeli(
+        [(values, sample_frequency) for _, _, values, sample_frequency in signals.values()],
+        progress=report_progress,
+    )
+
+    key = f"eeli-results-{session_id}-{uuid.uuid4().hex}"
+    job_cache.set(
+        key,
+        {
+            index: (selection, inputs, result)
+            for (index, (selection, inputs, _, _)), result in zip(signals.items(), results, strict=True)
+        },
+        expire=JOB_RESULT_EXPIRE,
+    )
+
+    return {"key": key}
+
+
+@callback(
+    Output(ids.EELI_RESULTS_GRAPH_DIV, "hidden", allow_duplicate=True),
+    Input(ids.EELI_RESULTS, "data"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call=True,
 )
-def apply_eeli(_):
-    """Apply EELI and store results."""
-    # global eeli
-    #
-    # eeli.clear()
-    #
-    # periods = data_object.get_all_stable_periods()
-    #
-    # for period in periods:
-    #     sequence = period.get_data()
-    #     if sequence.continuous_data.get(FILTERED_EIT_LABEL):
-    #         eeli_result_filtered = EELI().compute_parameter(
-    #             sequence,
-    #             FILTERED_EIT_LABEL,
-    #         )
-    #     else:
-    #         eeli_result_filtered = EELI().compute_parameter(sequence, RAW_EIT_LABEL)
-    #
-    #     # TODO: the results should be stored in the sequence object
-    #     eeli_result_filtered["index"] = period.get_period_index()
-    #
-    #     eeli.append(eeli_result_filtered)
+def store_eeli(computed, session_id):
+    """Add the EELI computed in the background to the results of the session, and show them."""
+    # the results may have expired, if they have not been used for a long time
+    results = job_cache.pop(computed["key"], None)
+    if results is None:
+        raise PreventUpdate
+
+    with session_store.edit(session_id) as session:
+        periods = {period.get_period_index(): period for period in session.loaded_data.get_all_stable_periods()}
+
+        for period_index, (selection, inputs, result) in results.items():
+            # the period may have been removed, or replaced by another one with the same index, while the job was
+            # running
+            period = periods.get(period_index)
+            if period is not None and period.get_selection() == selection:
+                session.results.set(period_index, EELI_RESULT, result, inputs)
 
     return False
 
@@ -113,26 +206,33 @@ def apply_eeli(_):
         Output(ids.EELI_RESULTS_GRAPH, "style"),
     ],
     Input(ids.ANALYZE_SELECT_PERIOD_VIEW, "value"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call=True,
 )
-def show_eeli(selected):
+def show_eeli(selected, session_id):
     """Show the results of the EELI for the selected period."""
+    if selected is None:
+        raise PreventUpdate
+
     figure = go.Figure()
 
-    sequence = data_object.get_stable_period(int(selected)).get_data()
-    for e in eeli:
-        if e["index"] == int(selected):
-            result = e
+    # edited, because the EELI is computed and added to the results if the period has been filtered again since
+    # `apply_eeli`
+    with session_store.edit(session_id) as session:
+        period = session.loaded_data.get_stable_period(int(selected))
+        sequence = period.get_data()
+        result = get_period_eeli(period, session.results)
 
     if sequence.continuous_data.get(FILTERED_EIT_LABEL):
         data = sequence.continuous_data.get(FILTERED_EIT_LABEL)
     else:
         data = sequence.continuous_data.get(RAW_EIT_LABEL)
 
+    x, y = downsample(data.time, data.values, MAX_PLOT_POINTS)
     figure.add_trace(
         go.Scatter(
-            x=data.time,
-            y=data.values,
+            x=x,
+            y=y,
             name=data.label,
         ),
     )
@@ -151,10 +251,13 @@ def show_eeli(selected):
     sd_upper = result["mean"] + result["standard deviation"]
     sd_lower = result["mean"] - result["standard deviation"]
 
+    # the standard deviation band is constant, so the first and the last time points are enough to draw it
+    time_range = [data.time[0], data.time[-1]]
+
     figure.add_trace(
         go.Scatter(
-            x=data.time,
-            y=[sd_upper] * len(data.time),
+            x=time_range,
+            y=[sd_upper] * len(time_range),
             fill=None,
             mode="lines",
             line_color="rgba(0,0,255,0)",  # Set to transparent blue
@@ -165,8 +268,8 @@ def show_eeli(selected):
     # Add the lower bound line
     figure.add_trace(
         go.Scatter(
-            x=data.time,
-            y=[sd_lower] * len(data.time),
+            x=time_range,
+            y=[sd_lower] * len(time_range),
             fill="tonexty",  # Fill area below this line
             mode="lines",
             line_color="rgba(0,0,255,0.3)",  # Set to semi-transparent blue
@@ -175,3 +278,35 @@ def show_eeli(selected):
     )
 
     return figure, styles.GRAPH
+
+
+@callback(
+    [
+        Output(ids.REGIONAL_MAPS_GRAPH, "figure"),
+        Output(ids.REGIONAL_MAPS_GRAPH, "style"),
+    ],
+    Input(ids.ANALYZE_SELECT_PERIOD_VIEW, "value"),
+    State(ids.SESSION_ID, "data"),
+    prevent_initial_call=True,
+)
+def show_regional_maps(selected, session_id):
+    """Show the maps of the EELI and of the tidal variation of each pixel for the selected period."""
+    if selected is None:
+        raise PreventUpdate
+
+    # edited, because the maps are added to the results if they have not been computed for the period yet
+    with session_store.edit(session_id) as session:
+        maps = get_period_regional_maps(session.loaded_data.get_stable_period(int(selected)), session.results)
+
+    figure = make_subplots(rows=1, cols=2, subplot_titles=["EELI", "Tidal variation"], horizontal_spacing=0.15)
+
+    for column, (name, colorbar_x) in enumerate((("eeli", 0.425), ("tidal variation", 1)), start=1):
+        figure.add_trace(
+            go.Heatmap(z=maps[name], colorscale="Viridis", colorbar={"x": colorbar_x}, name=name),
+            row=1,
+            col=column,
+        )
+        # the images are shown with the first row at the top, and with square pixels
+        figure.update_yaxes(autorange="reversed", scaleanchor=f"x{column}", row=1, col=column)
+
+    return figure, styles.GRAPH
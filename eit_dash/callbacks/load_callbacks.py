@@ -1,29 +1,31 @@
 from __future__ import annotations
 
 import os
+import uuid
 from pathlib import Path
-from typing import TYPE_CHECKING
 
 import plotly.graph_objects as go
-from dash import ALL, Input, Output, State, callback, ctx, html
+from dash import ALL, ClientsideFunction, Input, Output, State, callback, clientside_callback, ctx, html, no_update
 from dash.exceptions import PreventUpdate
-from eitprocessing.datahandling.loading import load_eit_data
 
 import eit_dash.definitions.element_ids as ids
-from eit_dash.app import data_object
-from eit_dash.definitions.constants import RAW_EIT_LABEL
+from eit_dash.app import job_cache, loading_cache, session_store
+from eit_dash.definitions.constants import JOB_RESULT_EXPIRE, RAW_EIT_LABEL
 from eit_dash.definitions.option_lists import InputFiletypes
+from eit_dash.utils.batch_import import find_recordings, import_files, register_datasets
 from eit_dash.utils.common import (
     create_info_card,
     create_slider_figure,
     get_selections_slidebar,
     get_signal_options,
+    get_zoom_range,
 )
+from eit_dash.utils.data_singleton import compact_sequence
+from eit_dash.utils.loading import get_file_key
 
-if TYPE_CHECKING:
-    from eitprocessing.datahandling.sequence import Sequence
-
-file_data: Sequence | None = None
+# progress of the loading of a file, in percent, at the beginning of each stage
+LOAD_PROGRESS_READING = 10
+LOAD_PROGRESS_PREVIEW = 90
 
 
 # managing the file selection. Confirm button clicked
@@ -35,6 +37,7 @@ file_data: Sequence | None = None
     Input(ids.SELECT_CONFIRM_BUTTON, "n_clicks"),
     State(ids.STORED_CWD, "data"),
     State(ids.INPUT_TYPE_SELECTOR, "value"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call=True,
 )
 def select_file(
@@ -42,6 +45,7 @@ def select_file(
     confirm_select,
     file_path,
     file_type,
+    session_id,
 ):
     """Check if the selected file is compatible and closes the popup."""
     open_modal = True
@@ -55,7 +59,7 @@ def select_file(
     if trigger == ids.SELECT_FILES_BUTTON:
         # if a file has been loaded already, the data should not be cancelled,
         # unless a new file is loaded. if `data` is None, the selection is cancelled
-        data = file_path if file_data else None
+        data = file_path if session_store.get(session_id).file_data is not None else None
 
     # if the callback has not been triggered by the select files button,
     # get the information on the selected file and try to read it
@@ -85,78 +89,224 @@ def select_file(
     return open_modal, data, show_alert
 
 
+@callback(
+    Output(ids.LOADED_FILE, "data", allow_duplicate=True),
+    Output(ids.LOAD_REQUEST, "data"),
+    Input(ids.NFILES_PLACEHOLDER, "children"),
+    State(ids.INPUT_TYPE_SELECTOR, "value"),
+    prevent_initial_call=True,
+)
+def request_file(data_path, file_type):
+    """Look for the selected file in the loading cache, and request to load it in the background if it is not there."""
+    if not data_path:
+        return None, no_update
+
+    selected_file = {"path": data_path, "vendor": InputFiletypes(int(file_type)).name.lower()}
+    file_key = get_file_key(data_path, selected_file["vendor"])
+
+    if loading_cache.get(file_key) is not None or loading_cache.is_persisted(file_key):
+        return selected_file, no_update
+
+    return no_update, selected_file
+
+
+@callback(
+    Output(ids.LOADED_FILE, "data"),
+    Input(ids.LOAD_REQUEST, "data"),
+    State(ids.SESSION_ID, "data"),
+    background=True,
+    progress=[
+        Output(ids.LOAD_PROGRESS, "value"),
+        Output(ids.LOAD_PROGRESS, "label"),
+    ],
+    running=[
+        (Output(ids.DATA_SELECTOR_OPTIONS, "hidden"), False, True),
+        (Output(ids.LOAD_PROGRESS_DIV, "hidden"), False, True),
+        (Output(ids.LOAD_PREVIEW_DIV, "hidden"), True, False),
+        (Output(ids.LOAD_CONFIRM_BUTTON, "disabled"), True, False),
+        (Output(ids.SELECT_FILES_BUTTON, "disabled"), True, False),
+    ],
+    cancel=[Input(ids.LOAD_CANCEL_BUTTON, "n_clicks")],
+    prevent_initial_call=True,
+)
+def load_file(set_progress, selected_file, session_id):
+    """Read the preview of the file selected in the file selector, in a background process.
+
+    The loaded data cannot be sent to the browser. Complete recordings are saved in the recording cache, from which
+    `load_selected_data` reads them. Previews, and recordings that cannot be saved there, are passed through the job
+    cache instead, and the returned key identifies the data in the job cache.
+    """
+    if not selected_file:
+        return None
+
+    set_progress((LOAD_PROGRESS_READING, "Reading the file"))
+
+    data = loading_cache.load_preview(selected_file["path"], selected_file["vendor"])
+
+    set_progress((LOAD_PROGRESS_PREVIEW, "Preparing the preview"))
+
+    if loading_cache.is_persisted(get_file_key(selected_file["path"], selected_file["vendor"])):
+        return selected_file
+
+    key = f"loaded-file-{session_id}-{uuid.uuid4().hex}"
+    job_cache.set(key, data, expire=JOB_RESULT_EXPIRE)
+
+    return {**selected_file, "key": key}
+
+
 @callback(
     Output(ids.DATA_SELECTOR_OPTIONS, "hidden"),
     Output(ids.CHECKBOX_SIGNALS, "options"),
     Output(ids.CHECKBOX_SIGNALS, "value"),
     Output(ids.FILE_LENGTH_SLIDER, "figure"),
-    Input(ids.NFILES_PLACEHOLDER, "children"),
+    Input(ids.LOADED_FILE, "data"),
     Input(ids.LOAD_CANCEL_BUTTON, "n_clicks"),
-    Input(ids.CHECKBOX_SIGNALS, "value"),
-    State(ids.INPUT_TYPE_SELECTOR, "value"),
-    State(ids.FILE_LENGTH_SLIDER, "figure"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call=True,
 )
-def load_selected_data(data_path, cancel_load, sig, file_type, fig):
-    """Read the file selected in the file selector."""
-    global file_data
+def load_selected_data(loaded_file, cancel_load, session_id):
+    """Show the preview of the loaded file.
 
+    The file has been loaded in the background, or it has been found in the loading cache.
+    """
     trigger = ctx.triggered_id
 
     # cancelled selection. Reset the data and turn off the data selector
     if trigger == ids.LOAD_CANCEL_BUTTON:
-        data_path = None
-        file_data = None
-        options = ticked = []
-
-    if not data_path:
+        loaded_file = None
+        with session_store.edit(session_id) as session:
+            session.file_data = None
+
+    file_data = None
+
+    if loaded_file and "key" in loaded_file:
+        # the data may have expired, if it has not been used for a long time
+        file_data = job_cache.pop(loaded_file["key"], None)
+
+        # the previews without images are not kept in the loading cache, which holds the complete recordings
+        if file_data is not None and len(file_data.eit_data):
+            loading_cache.put(get_file_key(loaded_file["path"], loaded_file["vendor"]), file_data)
+    elif loaded_file:
+        file_key = get_file_key(loaded_file["path"], loaded_file["vendor"])
+        # the file has been saved in the recording cache by the background job, or it has been found in the loading
+        # cache of another process
+        file_data = loading_cache.peek(file_key)
+        if file_data is None:
+            file_data = loading_cache.load(loaded_file["path"], loaded_file["vendor"])
+
+    if file_data is None:
         # this is needed, because a figure object must be returned for the graph, even if empty
         figure = go.Figure()
         return True, [], [], figure
 
-    if trigger in [ids.NFILES_PLACEHOLDER, ids.CHECKBOX_SIGNALS]:
-        if trigger == ids.CHECKBOX_SIGNALS:
-            options = get_signal_options(file_data)
-            figure = fig
-            ticked = sig
-        else:
-            path = Path(data_path)
-            file_data = load_eit_data(
-                path,
-                vendor=InputFiletypes(int(file_type)).name.lower(),
-                label="selected data",
-            )
-
-            options = get_signal_options(file_data)
-
-            figure = create_slider_figure(
-                file_data,
-                continuous_data=list(file_data.continuous_data),
-                clickable_legend=True,
-            )
-            ticked = [s["value"] for s in options]
-
-        ok = [RAW_EIT_LABEL]
-        if ticked:
-            ok += [options[s]["label"] for s in ticked]
-
-        for s in figure["data"]:
-            if s["name"] in ok:
-                # raw signal visible
-                if s["name"] == RAW_EIT_LABEL:
-                    s["visible"] = True
-                else:
-                    # other selected signals are included but toggled off
-                    # (the legend item has to be clicked to make the trace visible)
-                    s["visible"] = "legendonly"
-            else:
-                s["visible"] = False
+    with session_store.edit(session_id) as session:
+        session.file_data = file_data
+
+    options = get_signal_options(file_data)
+
+    figure = create_slider_figure(
+        file_data,
+        continuous_data=list(file_data.continuous_data),
+        clickable_legend=True,
+    )
+    figure.update_layout(uirevision=loaded_file["path"])
+    ticked = [s["value"] for s in options]
+
+    set_signals_visibility(figure, options, ticked)
 
     return False, options, ticked, figure
 
 
+# ticking a signal only changes the visibility of the traces, which is done in the browser
+clientside_callback(
+    ClientsideFunction(namespace="visibility", function_name="preview_signals"),
+    Output(ids.FILE_LENGTH_SLIDER, "figure", allow_duplicate=True),
+    Input(ids.CHECKBOX_SIGNALS, "value"),
+    State(ids.CHECKBOX_SIGNALS, "options"),
+    State(ids.FILE_LENGTH_SLIDER, "figure"),
+    prevent_initial_call=True,
+)
+
+
+@callback(
+    Output(ids.FILE_LENGTH_SLIDER, "figure", allow_duplicate=True),
+    Input(ids.FILE_LENGTH_SLIDER, "relayoutData"),
+    State(ids.NFILES_PLACEHOLDER, "children"),
+    State(ids.CHECKBOX_SIGNALS, "value"),
+    State(ids.CHECKBOX_SIGNALS, "options"),
+    State(ids.SESSION_ID, "data"),
+    prevent_initial_call=True,
+)
+def update_slider_resolution(slidebar_stat, data_path, sig, options, session_id):
+    """Plot the signals in the visible time range with full detail when zooming or panning the preview."""
+    file_data = session_store.get(session_id).file_data
+    if file_data is None:
+        raise PreventUpdate
+
+    time_range = get_zoom_range(slidebar_stat)
+
+    figure = create_slider_figure(
+        file_data,
+        continuous_data=list(file_data.continuous_data),
+        clickable_legend=True,
+        time_range=time_range,
+    )
+    # keep the zoom level and the legend selections of the user
+    figure.update_layout(uirevision=data_path)
+    set_signals_visibility(figure, options or [], sig)
+
+    return figure
+
+
+def set_signals_visibility(figure: go.Figure, options: list[dict], ticked: list[int] | None) -> None:
+    """Show the raw EIT signal and make the ticked signals available in the legend of the preview figure.
+
+    Args:
+        figure: preview figure
+        options: signals options of the checkbox
+        ticked: values of the ticked signals
+    """
+    visibility = get_signals_visibility([trace["name"] for trace in figure["data"]], options, ticked)
+
+    for trace, visible in zip(figure["data"], visibility, strict=True):
+        trace["visible"] = visible
+
+
+def get_signals_visibility(names: list[str], options: list[dict], ticked: list[int] | None) -> list[bool | str]:
+    """Get the visibility of the traces of the preview figure.
+
+    Args:
+        names: names of the traces
+        options: signals options of the checkbox
+        ticked: values of the ticked signals
+
+    Returns:
+        The visibility of each trace: True for the raw EIT signal, "legendonly" for the ticked signals,
+        False for the other signals.
+    """
+    ok = [RAW_EIT_LABEL]
+    if ticked:
+        ok += [options[s]["label"] for s in ticked]
+
+    visibility = []
+    for name in names:
+        if name in ok:
+            # raw signal visible
+            if name == RAW_EIT_LABEL:
+                visibility.append(True)
+            else:
+                # other selected signals are included but toggled off
+                # (the legend item has to be clicked to make the trace visible)
+                visibility.append("legendonly")
+        else:
+            visibility.append(False)
+
+    return visibility
+
+
 @callback(
     Output(ids.DATASET_CONTAINER, "children", allow_duplicate=True),
+    Output(ids.DATA_SELECTOR_OPTIONS, "hidden", allow_duplicate=True),
     Input(ids.LOAD_CONFIRM_BUTTON, "n_clicks"),
     State(ids.NFILES_PLACEHOLDER, "children"),
     State(ids.DATASET_CONTAINER, "children"),
@@ -164,6 +314,7 @@ def load_selected_data(data_path, cancel_load, sig, file_type, fig):
     State(ids.FILE_LENGTH_SLIDER, "relayoutData"),
     State(ids.CHECKBOX_SIGNALS, "value"),
     State(ids.CHECKBOX_SIGNALS, "options"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call=True,
 )
 def show_info(
@@ -174,51 +325,142 @@ def show_info(
     slidebar_stat,
     selected_signals,
     signals_options,
+    session_id,
 ):
-    """Creates the preview for preselecting part of the dataset."""
-    if file_data:
-        # get the first and last sample selected in the slidebar
-        if slidebar_stat is not None:
-            start_sample, stop_sample = get_selections_slidebar(slidebar_stat)
-
-            if not start_sample:
-                start_sample = file_data.continuous_data[RAW_EIT_LABEL].time[0]
-            if not stop_sample:
-                stop_sample = file_data.continuous_data[RAW_EIT_LABEL].time[-1]
-        else:
+    """Add the part of the file selected in the preview to the loaded datasets.
+
+    Only the selected frames are read from the file (or taken from the loading cache). The preview is released
+    afterwards, and its figure is hidden.
+    """
+    file_data = session_store.get(session_id).file_data
+
+    if file_data is None:
+        return container_state, no_update
+
+    # get the first and last sample selected in the slidebar
+    if slidebar_stat is not None:
+        start_sample, stop_sample = get_selections_slidebar(slidebar_stat)
+
+        if not start_sample:
             start_sample = file_data.continuous_data[RAW_EIT_LABEL].time[0]
+        if not stop_sample:
             stop_sample = file_data.continuous_data[RAW_EIT_LABEL].time[-1]
+    else:
+        start_sample = file_data.continuous_data[RAW_EIT_LABEL].time[0]
+        stop_sample = file_data.continuous_data[RAW_EIT_LABEL].time[-1]
+
+    selected_signals = selected_signals or []
+    # get the name of the selected continuous signals
+    selected = [signals_options[s]["label"] for s in selected_signals]
+
+    # load the selected data
+    cut_data = loading_cache.load_selection(
+        loaded_data,
+        InputFiletypes(int(filetype)).name.lower(),
+        file_data.continuous_data[RAW_EIT_LABEL].time,
+        start_sample,
+        stop_sample,
+    )
+
+    for data_type in list(cut_data.continuous_data):
+        # add just the selected signals and the raw EIT
+        if not (data_type in selected or data_type == RAW_EIT_LABEL):
+            cut_data.continuous_data.pop(data_type)
+
+    if session_store.compact:
+        cut_data = compact_sequence(cut_data)
+
+    # save the selected data in the session, releasing the preview
+    with session_store.edit(session_id) as session:
+        # reassign the label
+        cut_data.label = session.loaded_data.get_next_dataset_label()
+        session.loaded_data.add_sequence(cut_data)
+        session.file_data = None
 
-        dataset_name = data_object.get_next_dataset_label()
+    # create the info summary card
+    card = create_info_card(cut_data, remove_button=True)
 
-        selected_signals = selected_signals or []
-        # get the name of the selected continuous signals
-        selected = [signals_options[s]["label"] for s in selected_signals]
+    # add the card to the current results
+    if container_state:
+        container_state += [card]
+    else:
+        container_state = [card]
 
-        # cut the data
-        cut_data = file_data.select_by_time(start_sample, stop_sample)
+    return container_state, True
 
-        for data_type in file_data.continuous_data:
-            # add just the selected signals and the raw EIT
-            if not (data_type in selected or data_type == RAW_EIT_LABEL):
-                cut_data.continuous_data.pop(data_type)
 
-        # reassign the label
-        cut_data.label = dataset_name
+@callback(
+    Output(ids.IMPORTED_FILES, "data"),
+    Input(ids.IMPORT_FOLDER_BUTTON, "n_clicks"),
+    State(ids.CWD, "children"),
+    State(ids.SESSION_ID, "data"),
+    background=True,
+    progress=[
+        Output(ids.LOAD_PROGRESS, "value"),
+        Output(ids.LOAD_PROGRESS, "label"),
+    ],
+    running=[
+        (Output(ids.CHOOSE_DATA_POPUP, "is_open"), False, False),
+        (Output(ids.DATA_SELECTOR_OPTIONS, "hidden"), False, True),
+        (Output(ids.LOAD_PROGRESS_DIV, "hidden"), False, True),
+        (Output(ids.LOAD_PREVIEW_DIV, "hidden"), True, False),
+        (Output(ids.LOAD_CONFIRM_BUTTON, "disabled"), True, False),
+        (Output(ids.SELECT_FILES_BUTTON, "disabled"), True, False),
+    ],
+    cancel=[Input(ids.LOAD_CANCEL_BUTTON, "n_clicks")],
+    prevent_initial_call=True,
+)
+def import_folder(set_progress, _, directory, session_id):
+    """Load all the recordings of the directory shown in the file browser, in a pool of processes.
 
-        # save the selected data in the singleton
-        data_object.add_sequence(cut_data)
+    Like in `load_file`, the recordings are passed to `register_imported_files` through the recording cache, or
+    through the job cache if they cannot be saved there. The returned key identifies the results in the job cache.
+    """
+    paths = find_recordings(directory)
+    if not paths:
+        return {"key": None}
 
-        # create the info summary card
-        card = create_info_card(cut_data, remove_button=True)
+    set_progress((0, f"0/{len(paths)} files"))
 
-        # add the card to the current results
-        if container_state:
-            container_state += [card]
-        else:
-            container_state = [card]
+    def report_progress(_, done, total):
+        set_progress((100 * done // total, f"{done}/{total} files"))
+
+    report = import_files(paths, loading_cache.recording_cache, progress=report_progress)
+
+    key = f"imported-files-{session_id}-{uuid.uuid4().hex}"
+    job_cache.set(key, report, expire=JOB_RESULT_EXPIRE)
+
+    return {"key": key}
+
+
+@callback(
+    Output(ids.DATASET_CONTAINER, "children", allow_duplicate=True),
+    Output(ids.IMPORT_RESULTS, "children"),
+    Output(ids.IMPORT_RESULTS, "is_open"),
+    Input(ids.IMPORTED_FILES, "data"),
+    State(ids.DATASET_CONTAINER, "children"),
+    State(ids.SESSION_ID, "data"),
+    prevent_initial_call=True,
+)
+def register_imported_files(imported_files, container_state, session_id):
+    """Add the recordings imported from a directory to the datasets, and show the results of the import."""
+    if not imported_files:
+        raise PreventUpdate
+
+    if imported_files["key"] is None:
+        return no_update, "No recordings found in the directory", True
+
+    # the results may have expired, if they have not been used for a long time
+    report = job_cache.pop(imported_files["key"], None)
+    if report is None:
+        raise PreventUpdate
+
+    with session_store.edit(session_id) as session:
+        datasets = register_datasets(report, session.loaded_data, loading_cache, compact=session_store.compact)
+
+    cards = [create_info_card(dataset, remove_button=True) for dataset in datasets]
 
-    return container_state
+    return (container_state or []) + cards, report.summary(), True
 
 
 # file browser
@@ -295,10 +537,11 @@ def store_clicked_file(n_clicks, title):
     ],
     [
         State(ids.DATASET_CONTAINER, "children"),
+        State(ids.SESSION_ID, "data"),
     ],
     prevent_initial_call=True,
 )
-def remove_dataset(n_clicks, container):
+def remove_dataset(n_clicks, container, session_id):
     """React to clicking the remove button of a dataset.
 
     Removes the card from the results and the dataset from the loaded selections.
@@ -309,8 +552,9 @@ def remove_dataset(n_clicks, container):
 
     input_id = ctx.triggered_id["index"]
 
-    # remove from the singleton
-    data_object.remove_data(input_id)
+    # remove from the session
+    with session_store.edit(session_id) as session:
+        session.loaded_data.remove_data(input_id)
 
     return [card for card in container if f"'index': '{input_id}'" not in str(card)]
 
@@ -319,10 +563,11 @@ def remove_dataset(n_clicks, container):
 @callback(
     Output(ids.DATASET_CONTAINER, "children", allow_duplicate=True),
     Input(ids.POPULATE_DATA, "children"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call="initial_duplicate",
 )
-def repopulate_data(reload):
+def repopulate_data(reload, session_id):
     """Repopulate data after reloading page."""
     # create the info summary card
-    reloaded_data = data_object.get_all_sequences()
+    reloaded_data = session_store.get(session_id).loaded_data.get_all_sequences()
     return [create_info_card(element, remove_button=True) for element in reloaded_data]
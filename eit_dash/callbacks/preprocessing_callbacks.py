@@ -1,44 +1,58 @@
 from __future__ import annotations
 
 import contextlib
-import time
 from typing import TYPE_CHECKING
 
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-from dash import ALL, Input, Output, State, callback, ctx, dcc, html
+from dash import (
+    ALL,
+    ClientsideFunction,
+    Input,
+    Output,
+    Patch,
+    State,
+    callback,
+    clientside_callback,
+    ctx,
+    dcc,
+    html,
+    no_update,
+)
 from dash.exceptions import PreventUpdate
-from eitprocessing.datahandling.continuousdata import ContinuousData
-from eitprocessing.filters.butterworth_filters import ButterworthFilter
 
 import eit_dash.definitions.element_ids as ids
 import eit_dash.definitions.layout_styles as styles
-from eit_dash.app import data_object
-from eit_dash.definitions.constants import FILTERED_EIT_LABEL, RAW_EIT_LABEL
+from eit_dash.app import session_store
+from eit_dash.definitions.constants import FILTERED_EIT_LABEL, FILTERED_PIXELS_LABEL, MAX_PLOT_POINTS, RAW_EIT_LABEL
 from eit_dash.definitions.option_lists import FilterTypes, PeriodsSelectMethods
 from eit_dash.utils.common import (
     create_filter_results_card,
     create_info_card,
     create_selected_period_card,
     create_slider_figure,
+    get_figure_traces,
     get_selections_slidebar,
     get_signal_options,
+    get_zoom_range,
     mark_selected_periods,
 )
-from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.downsampling import downsample
+from eit_dash.utils.filtering import filter_data, filter_periods, filter_pixels, get_selected_parameters
 
 if TYPE_CHECKING:
-    from eitprocessing.datahandling.sequence import Sequence
-
-tmp_results: LoadedData = LoadedData()
+    from eit_dash.utils.data_singleton import LoadedData
 
 # ruff: noqa: D103  #TODO remove this line when finalizing this module
 
 
-def check_continuous_data_loaded() -> bool:
+def check_continuous_data_loaded(data_object: LoadedData) -> bool:
     """
     Checks if continuous data have been loaded.
 
+    Args:
+        data_object: the data of the session
+
     Return: True if continuous data are present, False otherwise
     """
     loaded_data = data_object.get_all_sequences()
@@ -70,7 +84,7 @@ def create_resampling_card(loaded_data):
     return row, options
 
 
-def get_loaded_data():
+def get_loaded_data(data_object: LoadedData):
     loaded_data = data_object.get_all_sequences()
     data = []
     for dataset in loaded_data:
@@ -115,8 +129,8 @@ def load_datasets(title):
      the data in the resampling card and in the dataset selection menu.
     """
     # ruff: noqa: ERA001
-    # loaded_data = get_loaded_data()
-    # continuous_data_loaded = check_continuous_data_loaded()
+    # loaded_data = get_loaded_data(data_object)
+    # continuous_data_loaded = check_continuous_data_loaded(data_object)
     #
     # if not continuous_data_loaded:
     #     return [], [], [], None
@@ -144,11 +158,12 @@ def load_datasets(title):
     ],
     [
         State(ids.SUMMARY_COLUMN, "children"),
+        State(ids.SESSION_ID, "data"),
     ],
     # this allows duplicate outputs with initial call
     prevent_initial_call="initial_duplicate",
 )
-def update_summary(start, summary):
+def update_summary(start, summary, session_id):
     """Updates summary.
 
     When the page is loaded, it populates the summary column
@@ -160,6 +175,8 @@ def update_summary(start, summary):
     results = []
 
     if trigger is None:
+        data_object = session_store.get(session_id).loaded_data
+
         for d in data_object.get_all_sequences():
             card = create_info_card(d)
             summary += [card]
@@ -206,14 +223,15 @@ def open_periods_modal(open_click, confirm_click) -> bool:
 @callback(
     Output(ids.PERIODS_SELECTION_SELECT_DATASET, "children"),
     Input(ids.PERIODS_METHOD_SELECTOR, "value"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call=False,
 )
-def populate_periods_selection_modal(method):
+def populate_periods_selection_modal(method, session_id):
     """Populate modal body according to the selected method for stable periods selection."""
     int_value = int(method)
 
     if int_value == PeriodsSelectMethods.Manual.value:
-        signals = data_object.get_all_sequences()
+        signals = session_store.get(session_id).loaded_data.get_all_sequences()
         options = [{"label": sequence.label, "value": index} for index, sequence in enumerate(signals)]
 
         body = (
@@ -246,39 +264,33 @@ def show_selection_div(signals):
 
 @callback(
     [
-        Output(ids.PREPROCESING_PERIODS_GRAPH, "figure", allow_duplicate=True),
-        Output(ids.PREPROCESING_PERIODS_GRAPH, "style", allow_duplicate=True),
         Output(ids.PREPROCESING_SIGNALS_CHECKBOX_ROW, "children"),
+        Output(ids.PREPROCESING_FIGURE_DATASET, "data"),
     ],
     [
         Input(ids.PREPROCESING_DATASET_SELECT, "value"),
     ],
+    [
+        State(ids.SESSION_ID, "data"),
+    ],
     prevent_initial_call=True,
 )
-def initialize_figure(
+def initialize_signals_checkbox(
     dataset,
+    session_id,
 ):
-    """When the dataset is selected, the figure and the checkbox are initialized."""
+    """When the dataset is selected, the checkbox is initialized.
+
+    The figure is created by `initialize_figure`, which is triggered by the dataset stored here. This ensures that
+    the checkbox is in the page before the figure is created, without blocking the selection.
+    """
     # the callback is run also when populating the dataset options.
     # In this case we don't want to run it
     if not dataset:
         raise PreventUpdate
 
-    data = data_object.get_sequence_at(int(dataset))
-
-    style = styles.EMPTY_ELEMENT
-
-    current_figure = create_slider_figure(
-        data,
-        list(data.continuous_data),
-    )
-
-    # mark the stable periods already selected, if there are any
-    if saved_periods := data_object.get_dataset_stable_periods(int(dataset)):
-        current_figure = mark_selected_periods(current_figure, saved_periods)
-
     options = get_signal_options(
-        data_object.get_sequence_at(int(dataset)),
+        session_store.get(session_id).loaded_data.get_sequence_at(int(dataset)),
         show_eit=True,
     )
 
@@ -291,10 +303,107 @@ def initialize_figure(
         ),
     ]
 
-    # THIS IS A TEMPORARY PATCH
-    time.sleep(2)
+    return signals_checkbox, dataset
+
+
+@callback(
+    [
+        Output(ids.PREPROCESING_PERIODS_GRAPH, "figure", allow_duplicate=True),
+        Output(ids.PREPROCESING_PERIODS_GRAPH, "style", allow_duplicate=True),
+    ],
+    [
+        Input(ids.PREPROCESING_FIGURE_DATASET, "data"),
+    ],
+    [
+        State(ids.PREPROCESING_SIGNALS_CHECKBOX, "value"),
+        State(ids.PREPROCESING_SIGNALS_CHECKBOX, "options"),
+        State(ids.SESSION_ID, "data"),
+    ],
+    prevent_initial_call=True,
+)
+def initialize_figure(
+    dataset,
+    signals,
+    options,
+    session_id,
+):
+    """When the checkbox of the selected dataset is ready, the figure is initialized.
+
+    The signals ticked in the meantime are shown, so that the figure and the checkbox are consistent.
+    """
+    if not dataset:
+        raise PreventUpdate
+
+    current_figure = create_periods_figure(session_store.get(session_id).loaded_data, int(dataset))
 
-    return current_figure, style, signals_checkbox
+    selected = [options[s]["label"] for s in signals or []]
+    for trace in current_figure.data:
+        trace.visible = trace.name in selected
+
+    style = styles.GRAPH if selected else styles.EMPTY_ELEMENT
+
+    return current_figure, style
+
+
+@callback(
+    Output(ids.PREPROCESING_PERIODS_GRAPH, "figure", allow_duplicate=True),
+    Input(ids.PREPROCESING_PERIODS_GRAPH, "relayoutData"),
+    State(ids.PREPROCESING_FIGURE_DATASET, "data"),
+    State(ids.PREPROCESING_SIGNALS_CHECKBOX, "value"),
+    State(ids.PREPROCESING_SIGNALS_CHECKBOX, "options"),
+    State(ids.SESSION_ID, "data"),
+    prevent_initial_call=True,
+)
+def update_periods_graph_resolution(slidebar_stat, dataset, signals, options, session_id):
+    """Plot the signals in the visible time range with full detail when zooming or panning the graph."""
+    if not dataset:
+        raise PreventUpdate
+
+    time_range = get_zoom_range(slidebar_stat)
+
+    current_figure = create_periods_figure(session_store.get(session_id).loaded_data, int(dataset), time_range)
+
+    signals = signals or []
+    selected = [options[s]["label"] for s in signals]
+
+    for s in current_figure["data"]:
+        s["visible"] = s["name"] in selected
+
+    return current_figure
+
+
+def create_periods_figure(
+    data_object: LoadedData,
+    dataset: int,
+    time_range: tuple[float, float] | None = None,
+) -> go.Figure:
+    """Create the figure for the selection of the periods, marking the periods already selected.
+
+    Args:
+        data_object: the data of the session
+        dataset: index of the dataset
+        time_range: visible time range, plotted with full detail
+    """
+    data = data_object.get_sequence_at(dataset)
+
+    current_figure = create_slider_figure(
+        data,
+        list(data.continuous_data),
+        time_range=time_range,
+    )
+    # keep the zoom level when the figure is updated
+    current_figure.update_layout(uirevision=dataset)
+
+    # mark the stable periods already selected, if there are any
+    if saved_periods := data_object.get_dataset_stable_periods(dataset):
+        current_figure = mark_selected_periods(
+            current_figure,
+            saved_periods,
+            time_range=time_range,
+            signals=list(data.continuous_data),
+        )
+
+    return current_figure
 
 
 @callback(
@@ -308,10 +417,9 @@ def initialize_figure(
     [
         State(ids.PREPROCESING_SIGNALS_CHECKBOX, "value"),
         State(ids.PREPROCESING_SIGNALS_CHECKBOX, "options"),
-        State(ids.PREPROCESING_DATASET_SELECT, "value"),
+        State(ids.PREPROCESING_FIGURE_DATASET, "data"),
         State(ids.PREPROCESING_PERIODS_GRAPH, "relayoutData"),
-        State(ids.PREPROCESING_PERIODS_GRAPH, "figure"),
-        State(ids.PREPROCESING_RESULTS_CONTAINER, "children"),
+        State(ids.SESSION_ID, "data"),
     ],
     prevent_initial_call=True,
 )
@@ -321,54 +429,61 @@ def select_period(
     options,
     dataset,
     slidebar_stat,
-    current_figure,
-    current_summary,
+    session_id,
 ):
-    """Mark the selected period in the graph and save it."""
-    data = data_object.get_sequence_at(int(dataset))
-    # get the first and last sample selected in the slidebar
-    if slidebar_stat is not None:
-        start_sample, stop_sample = get_selections_slidebar(slidebar_stat)
+    """Mark the selected period in the graph and save it.
 
-        if not start_sample:
+    Only the traces of the new period and the new card are sent to the browser.
+    """
+    with session_store.edit(session_id) as session:
+        data_object = session.loaded_data
+        data = data_object.get_sequence_at(int(dataset))
+        # get the first and last sample selected in the slidebar
+        if slidebar_stat is not None:
+            start_sample, stop_sample = get_selections_slidebar(slidebar_stat)
+
+            if not start_sample:
+                start_sample = data.time[0]
+            if not stop_sample:
+                stop_sample = data.time[-1]
+        else:
             start_sample = data.time[0]
-        if not stop_sample:
             stop_sample = data.time[-1]
-    else:
-        start_sample = data.time[0]
-        stop_sample = data.time[-1]
 
-    period_index = data_object.get_next_period_index()
+        period_index = data_object.get_next_period_index()
 
-    cut_data = data.select_by_time(
-        start_time=start_sample,
-        end_time=stop_sample,
-        label=f"Period {period_index}",
-    )
+        cut_data = data.select_by_time(
+            start_time=start_sample,
+            end_time=stop_sample,
+            label=f"Period {period_index}",
+        )
 
-    data_object.add_stable_period(cut_data, int(dataset))
+        data_object.add_stable_period(cut_data, int(dataset))
 
-    # TODO: explore Patch https://dash.plotly.com/partial-properties
-    current_figure = mark_selected_periods(
-        current_figure,
+    new_traces = mark_selected_periods(
+        {"data": []},
         [data_object.get_stable_period(period_index)],
-    )
+        time_range=(start_sample, stop_sample),
+        signals=list(data.continuous_data),
+    )["data"]
 
-    # TODO: refactor to avoid duplications
-    ok = [options[s]["label"] for s in signals]
-    for s in current_figure["data"]:
-        if s["name"] in ok:
-            s["visible"] = True
-        else:
-            s["visible"] = False
+    selected = [options[s]["label"] for s in signals or []]
+    for trace in new_traces:
+        trace["visible"] = trace["name"] in selected
+
+    current_figure = Patch()
+    current_figure["data"].extend(new_traces)
 
-    content = [create_selected_period_card(cut_data, data.label, period_index)]
-    current_summary += content
+    current_summary = Patch()
+    current_summary.append(create_selected_period_card(cut_data, data.label, period_index))
 
     return current_figure, current_summary
 
 
-@callback(
+# ticking a signal shows the ticked signals and hides the unticked ones.
+# Only the visibility of the traces changes, which is done in the browser
+clientside_callback(
+    ClientsideFunction(namespace="visibility", function_name="periods_signals"),
     [
         Output(ids.PREPROCESING_PERIODS_GRAPH, "figure", allow_duplicate=True),
         Output(ids.PREPROCESING_PERIODS_GRAPH, "style", allow_duplicate=True),
@@ -382,32 +497,6 @@ def select_period(
     ],
     prevent_initial_call=True,
 )
-def select_signals(
-    signals,
-    options,
-    current_figure,
-):
-    """React to ticking a signal.
-
-    The function updates the figure by showing the ticked signals and hiding the unticked ones.
-    """
-    # the callback is run also when populating the signals options (no figure created).
-    # In this case we don't want to run it
-    if not current_figure:
-        raise PreventUpdate
-
-    signals = signals or []
-    selected = [options[s]["label"] for s in signals]
-
-    for s in current_figure["data"]:
-        if s["name"] in selected:
-            s["visible"] = True
-        else:
-            s["visible"] = False
-
-    style = styles.GRAPH
-
-    return current_figure, style
 
 
 @callback(
@@ -418,14 +507,16 @@ def select_signals(
     ],
     [
         State(ids.PREPROCESING_RESULTS_CONTAINER, "children"),
-        State(ids.PREPROCESING_PERIODS_GRAPH, "figure"),
+        State(ids.PREPROCESING_FIGURE_DATASET, "data"),
+        State(ids.SESSION_ID, "data"),
     ],
     prevent_initial_call=True,
 )
-def remove_period(n_clicks, container, figure):
+def remove_period(n_clicks, container, dataset, session_id):
     """React to clicking the remove button of a period.
 
     Removes the card from the results and the period from the saved selections.
+    Only the indexes of the traces to be deleted are sent to the browser.
     """
     # at the element creation time, the update should be avoided
     if all(element is None for element in n_clicks):
@@ -433,27 +524,48 @@ def remove_period(n_clicks, container, figure):
 
     input_id = int(ctx.triggered_id["index"])
 
-    # remove from the singleton
-    data_object.remove_stable_period(input_id)
-
-    # remove from the temp data, if present
-    if tmp_results:
-        try:
-            tmp_results.remove_stable_period(input_id)
-        except ValueError:
-            contextlib.suppress(Exception)
-
-    # remove from the figure (if the figure exists)
-    try:
-        figure["data"] = [trace for trace in figure["data"] if "meta" not in trace or trace["meta"]["uid"] != input_id]
-    except TypeError:
-        contextlib.suppress(Exception)
+    with session_store.edit(session_id) as session:
+        data_object = session.loaded_data
+
+        # remove from the figure, if it shows the dataset of the period
+        figure = no_update
+        if dataset is not None and data_object.get_stable_period(input_id).get_dataset_index() == int(dataset):
+            traces = get_dataset_figure_traces(data_object, int(dataset))
+            figure = Patch()
+            # delete from the last trace, so that the indexes of the remaining ones do not change
+            for n in reversed(range(len(traces))):
+                if traces[n][1] == input_id:
+                    del figure["data"][n]
+
+        # remove from the session, with its results
+        data_object.remove_stable_period(input_id)
+        session.results.remove_period(input_id)
+
+        # remove from the temp data, if present
+        if session.tmp_results:
+            try:
+                session.tmp_results.remove_stable_period(input_id)
+            except ValueError:
+                contextlib.suppress(Exception)
 
     results = [card for card in container if f"'index': '{input_id}'" not in str(card)]
 
     return results, figure
 
 
+def get_dataset_figure_traces(data_object: LoadedData, dataset: int) -> list[tuple[str, int | None]]:
+    """List the traces of the figure created by `create_periods_figure` for a dataset.
+
+    Args:
+        data_object: the data of the session
+        dataset: index of the dataset
+    """
+    return get_figure_traces(
+        list(data_object.get_sequence_at(dataset).continuous_data),
+        data_object.get_dataset_stable_periods(dataset),
+    )
+
+
 # filters
 @callback(
     Output(ids.OPEN_FILTER_DATA_BUTTON, "disabled"),
@@ -544,11 +656,24 @@ def enable_apply_button(
     filter_selected,
 ):
     """Enable the apply button."""
-    if not filter_selected:
-        return True
+    return not is_filter_valid(co_low, co_high, order, filter_selected)
 
-    return (
-        not (
+
+def is_filter_valid(co_low, co_high, order, filter_selected) -> bool:
+    """Check whether the parameters needed by the selected filter have been set.
+
+    Args:
+        co_low: cut off lower limit
+        co_high: cut off upper limit
+        order: filter order
+        filter_selected: value coming from the filter selection dropbox
+    """
+    # the value of the first filter is 0
+    if filter_selected is None or filter_selected == "":
+        return False
+
+    return bool(
+        (
             (int(filter_selected) == FilterTypes.lowpass.value and co_high and co_high > 0)
             or (int(filter_selected) == FilterTypes.highpass.value and co_low and co_low > 0)
             or (
@@ -559,7 +684,7 @@ def enable_apply_button(
                 and co_high > 0
             )
         )
-        and order
+        and order,
     )
 
 
@@ -572,19 +697,36 @@ def enable_apply_button(
     [
         Input(ids.FILTER_APPLY, "disabled"),
     ],
+    [
+        State(ids.SESSION_ID, "data"),
+    ],
     prevent_initial_call=True,
 )
-def disable_results(disabled):
-    """Hide and disable results if the apply button is disabled."""
-    # flag for showing graphs and confirm button
-    if not disabled:
-        raise PreventUpdate
+def toggle_results(disabled, session_id):
+    """Hide the results if the apply button is disabled, show the preview of the filter if it is enabled.
 
-    hidden_div = True
+    When the filter parameters are valid, a period can be selected to preview the filter while changing its parameters.
+    The filter is applied to all the periods when confirming the results.
+    """
+    if disabled:
+        return True, True, []
 
-    options = []
+    return False, False, get_period_options(session_store.get(session_id).loaded_data)
 
-    return hidden_div, hidden_div, options
+
+def get_period_options(data_object: LoadedData) -> list[dict]:
+    """Get the options for selecting one of the stable periods.
+
+    Args:
+        data_object: the data of the session
+    """
+    return [
+        {
+            "label": f"Period {period.get_period_index()}",
+            "value": period.get_period_index(),
+        }
+        for period in data_object.get_all_stable_periods()
+    ]
 
 
 @callback(
@@ -606,12 +748,17 @@ def disable_results(disabled):
         State(ids.FILTER_ORDER, "value"),
         State(ids.FILTER_SELECTOR, "value"),
         State(ids.PREPROCESING_RESULTS_CONTAINER, "children"),
+        State(ids.SESSION_ID, "data"),
+        State(ids.FILTER_PIXELS, "value"),
     ],
     prevent_initial_call=True,
 )
-def apply_filter(_, co_low, co_high, order, filter_selected, results):
-    """Apply the filter."""
-    global tmp_results  # noqa: PLW0602
+def apply_filter(_, co_low, co_high, order, filter_selected, results, session_id, pixels=False):
+    """Apply the filter.
+
+    The global impedance of all the periods is filtered. If `pixels` is ticked, the impedance of each pixel is filtered
+    too, and added to the EIT data of the periods.
+    """
     # flag for the alert message
     show_alert = False
     # alert message
@@ -628,31 +775,15 @@ def apply_filter(_, co_low, co_high, order, filter_selected, results):
 
     options = []
 
-    tmp_results.clear_data()
-
-    # filter all the periods
-    try:
-        for period in data_object.get_all_stable_periods():
-            filtered_data = filter_data(period.get_data(), filter_params)
-            data = period.get_data()
-            data.continuous_data.add(filtered_data)
-            tmp_results.add_stable_period(
-                data,
-                0,
-                period.get_period_index(),
-            )
-
-            options.append(
-                {
-                    "label": f"Period {period.get_period_index()}",
-                    "value": period.get_period_index(),
-                },
-            )
-    except ValueError as e:
-        show_alert = True
-        alert_msg = f"{e}"
-        hidden_div = True
-        placeholder_div = None
+    with session_store.edit(session_id) as session:
+        try:
+            filter_all_periods(session.loaded_data, session.tmp_results, filter_params, pixels)
+            options = get_period_options(session.tmp_results)
+        except ValueError as e:
+            show_alert = True
+            alert_msg = f"{e}"
+            hidden_div = True
+            placeholder_div = None
 
     return (
         results,
@@ -665,42 +796,122 @@ def apply_filter(_, co_low, co_high, order, filter_selected, results):
     )
 
 
+def filter_all_periods(data_object: LoadedData, tmp_results: LoadedData, filter_params: dict, pixels: bool) -> None:
+    """Filter all the stable periods, saving the filtered periods in the temporary results.
+
+    Args:
+        data_object: the data of the session
+        tmp_results: the temporary results, replaced by the filtered periods
+        filter_params: parameters for the filter
+        pixels: if True, the impedance of each pixel is filtered too
+
+    Raises:
+        ValueError: if the filter cannot be applied.
+    """
+    tmp_results.clear_data()
+
+    periods = data_object.get_all_stable_periods()
+    filtered_data = filter_periods([period.get_data() for period in periods], filter_params)
+
+    for period, period_filtered_data in zip(periods, filtered_data, strict=True):
+        # the period is only changed when the results are confirmed
+        data = period.copy_data()
+        data.continuous_data.add(period_filtered_data, overwrite=True)
+        if pixels:
+            data.eit_data.add(filter_pixels(data, filter_params), overwrite=True)
+        else:
+            # pixels filtered with previous settings would not match the filtered global impedance
+            data.eit_data.pop(FILTERED_PIXELS_LABEL, None)
+        tmp_results.add_stable_period(
+            data,
+            0,
+            period.get_period_index(),
+            dataset=period.get_dataset(),
+        )
+
+
+def is_filtered_with(data_object: LoadedData, tmp_results: LoadedData, filter_params: dict, pixels: bool) -> bool:
+    """Check whether the temporary results contain all the periods, filtered with the given settings.
+
+    Args:
+        data_object: the data of the session
+        tmp_results: the temporary results
+        filter_params: parameters for the filter
+        pixels: whether the impedance of each pixel has to be filtered too
+    """
+    if tmp_results.get_stable_periods_indexes() != data_object.get_stable_periods_indexes():
+        return False
+
+    for period in tmp_results.get_all_stable_periods():
+        data = period.get_data()
+        # the parameters of the filtered data include the sampling frequency as well
+        parameters = data.continuous_data[FILTERED_EIT_LABEL].parameters
+        if any(parameters.get(key) != value for key, value in filter_params.items()):
+            return False
+        if (FILTERED_PIXELS_LABEL in data.eit_data) != bool(pixels):
+            return False
+
+    return True
+
+
 @callback(
     [
         Output(ids.FILTERING_RESULTS_GRAPH, "figure"),
         Output(ids.FILTERING_RESULTS_GRAPH, "style"),
     ],
     Input(ids.FILTERING_SELECT_PERIOD_VIEW, "value"),
+    Input(ids.FILTER_CUTOFF_LOW, "value"),
+    Input(ids.FILTER_CUTOFF_HIGH, "value"),
+    Input(ids.FILTER_ORDER, "value"),
     Input(ids.UPDATE_FILTER_RESULTS, "children"),
-    State(ids.FILTERING_SELECT_PERIOD_VIEW, "value"),
+    State(ids.FILTER_SELECTOR, "value"),
+    State(ids.FILTERING_RESULTS_GRAPH, "style"),
+    State(ids.SESSION_ID, "data"),
     prevent_initial_call=True,
 )
-def show_filtered_results(_, update, selected):
-    """When selecting a period, shows the original and the filtered signal."""
-    if not selected or not update:
+def show_filtered_results(selected, co_low, co_high, order, _, filter_selected, style, session_id):
+    """Preview the filter on the selected period, showing the original and the filtered signal.
+
+    Only the selected period is filtered, so the preview follows the changes of the parameters (which are debounced in
+    the page). When only the parameters change, only the filtered signal is sent to the browser.
+    """
+    if not selected or not is_filter_valid(co_low, co_high, order, filter_selected):
         raise PreventUpdate
 
-    fig = go.Figure()
+    filter_params = get_selected_parameters(co_high, co_low, order, filter_selected)
+    data = session_store.get(session_id).loaded_data.get_stable_period(int(selected)).get_data()
 
     try:
-        filtered_data = tmp_results.get_stable_period(int(selected)).get_data()
-    except ValueError:
-        return fig, styles.EMPTY_ELEMENT
+        filtered_data = filter_data(data, filter_params)
+    except (TypeError, ValueError):
+        # e.g. a cutoff frequency above the Nyquist frequency, reported when applying the filter
+        raise PreventUpdate from None
+
+    filtered_x, filtered_y = downsample(filtered_data.time, filtered_data.values, MAX_PLOT_POINTS)
 
-    data = data_object.get_stable_period(int(selected)).get_data()
+    if ctx.triggered_id in (ids.FILTER_CUTOFF_LOW, ids.FILTER_CUTOFF_HIGH, ids.FILTER_ORDER) and style == styles.GRAPH:
+        fig = Patch()
+        fig["data"][1]["x"] = filtered_x
+        fig["data"][1]["y"] = filtered_y
 
+        return fig, no_update
+
+    fig = go.Figure()
+
+    raw_data = data.continuous_data[RAW_EIT_LABEL]
+    x, y = downsample(raw_data.time, raw_data.values, MAX_PLOT_POINTS)
     fig.add_trace(
         go.Scatter(
-            x=data.continuous_data[RAW_EIT_LABEL].time,
-            y=data.continuous_data[RAW_EIT_LABEL].values,
+            x=x,
+            y=y,
             name="Original signal",
         ),
     )
 
     fig.add_trace(
         go.Scatter(
-            x=filtered_data.continuous_data.data[FILTERED_EIT_LABEL].time,
-            y=filtered_data.continuous_data.data[FILTERED_EIT_LABEL].values,
+            x=filtered_x,
+            y=filtered_y,
             name="Filtered signal",
         ),
     )
@@ -713,23 +924,54 @@ def show_filtered_results(_, update, selected):
         Output(ids.PREPROCESING_RESULTS_CONTAINER, "children", allow_duplicate=True),
         Output(ids.ALERT_SAVED_RESULTS, "is_open"),
         Output(ids.ALERT_SAVED_RESULTS, "children"),
+        Output(ids.ALERT_FILTER, "is_open", allow_duplicate=True),
+        Output(ids.ALERT_FILTER, "children", allow_duplicate=True),
     ],
     Input(ids.FILTERING_CONFIRM_BUTTON, "n_clicks"),
     State(ids.PREPROCESING_RESULTS_CONTAINER, "children"),
+    State(ids.SESSION_ID, "data"),
+    State(ids.FILTER_CUTOFF_LOW, "value"),
+    State(ids.FILTER_CUTOFF_HIGH, "value"),
+    State(ids.FILTER_ORDER, "value"),
+    State(ids.FILTER_SELECTOR, "value"),
+    State(ids.FILTER_PIXELS, "value"),
     prevent_initial_call=True,
 )
-def save_filtered_signal(confirm, results: list):
-    """When clocking the confirm button, store the results in the singleton."""
+def save_filtered_signal(
+    confirm,
+    results: list,
+    session_id,
+    co_low=None,
+    co_high=None,
+    order=None,
+    filter_selected=None,
+    pixels=False,
+):
+    """When clocking the confirm button, filter all the periods and store the results in the session.
+
+    The periods are not filtered again if they have already been filtered with the same settings by `apply_filter`.
+    """
     params = {}
 
-    # save the filtered data
-    for res in tmp_results.get_all_stable_periods():
-        data = data_object.get_stable_period(res.get_period_index())
-        tmp_data = res.get_data()
-        data.update_data(tmp_data)
+    with session_store.edit(session_id) as session:
+        if filter_selected is not None:
+            filter_params = get_selected_parameters(co_high, co_low, order, filter_selected)
 
-        if not params:
-            params = tmp_data.continuous_data.data[FILTERED_EIT_LABEL].parameters
+            if not is_filtered_with(session.loaded_data, session.tmp_results, filter_params, pixels):
+                try:
+                    filter_all_periods(session.loaded_data, session.tmp_results, filter_params, pixels)
+                except ValueError as e:
+                    return results, False, no_update, True, f"{e}"
+
+        # save the filtered data
+        for res in session.tmp_results.get_all_stable_periods():
+            data = session.loaded_data.get_stable_period(res.get_period_index())
+            tmp_data = res.get_data()
+            data.update_data(tmp_data)
+            session.results.remove_period(res.get_period_index())
+
+            if not params:
+                params = tmp_data.continuous_data.data[FILTERED_EIT_LABEL].parameters
 
     # show info card
     for element in results:
@@ -737,56 +979,4 @@ def save_filtered_signal(confirm, results: list):
             results.remove(element)
     results += [create_filter_results_card(params)]
 
-    return results, True, "Results have been saved"
-
-
-def get_selected_parameters(co_high, co_low, order, filter_selected) -> dict:
-    """Build the parameters dictionary for the filter.
-
-    Args:
-        co_high: cut off upper limit
-        co_low: cut off lower limit
-        order: filter order
-        filter_selected: value coming from the filter selection dropbox
-
-    Returns: dictionary containing parameters for the filter
-    """
-    if co_high is None:
-        cutoff_frequency = co_low
-    elif co_low is None:
-        cutoff_frequency = co_high
-    else:
-        cutoff_frequency = [co_low, co_high]
-
-    return {
-        "filter_type": FilterTypes(int(filter_selected)).name,
-        "cutoff_frequency": cutoff_frequency,
-        "order": order,
-    }
-
-
-def filter_data(data: Sequence, filter_params: dict) -> ContinuousData | None:
-    """Filter the impedance data in a period.
-
-    Args:
-        data: sequence containing the data
-        filter_params: parameters for the filter
-
-    Returns: the data with the filtered version added
-    """
-    filter_params["sample_frequency"] = data.eit_data.data["raw"].framerate
-
-    filt = ButterworthFilter(**filter_params)
-
-    gi = data.continuous_data[RAW_EIT_LABEL]
-
-    return ContinuousData(
-        FILTERED_EIT_LABEL,
-        f"global_impedance filtered with {filter_params['filter_type']}",
-        "a.u.",
-        "impedance",
-        derived_from=[*gi.derived_from, gi],
-        parameters=filter_params,
-        time=data.continuous_data[RAW_EIT_LABEL].time,
-        values=filt.apply_filter(data.continuous_data[RAW_EIT_LABEL].values),
-    )
+    return results, True, "Results have been saved", no_update, no_update
@@ -1,2 +1,54 @@
 RAW_EIT_LABEL = "global_impedance_(raw)"
 FILTERED_EIT_LABEL = "global_impedance_(filtered)"
+# label of the EIT data with the filtered impedance of each pixel, added next to the "raw" EIT data
+FILTERED_PIXELS_LABEL = "filtered"
+# names of the EELI and of the regional maps (EELI and tidal variation of each pixel) in the results of the periods
+EELI_RESULT = "eeli"
+REGIONAL_RESULT = "regional maps"
+
+# maximum number of points per trace sent to the browser. Longer signals are decimated keeping their min/max envelope
+MAX_PLOT_POINTS = 4000
+
+# the data of the browser sessions is kept on the server. The least recently used sessions are removed when the
+# data of all the sessions exceeds SESSION_MAX_BYTES, and sessions idle for SESSION_IDLE_TIMEOUT seconds are removed
+SESSION_MAX_BYTES = 4 * 1024**3
+SESSION_IDLE_TIMEOUT = 4 * 60 * 60
+# when accessing a session, the idle sessions and the memory limit are checked at most every SESSION_EVICT_INTERVAL
+# seconds
+SESSION_EVICT_INTERVAL = 10
+
+# environment variable with the directory where the sessions are saved, to share them between several processes
+CACHE_DIR_VARIABLE = "EIT_DASH_CACHE_DIR"
+# environment variable enabling the storage of the datasets of the sessions in single precision
+COMPACT_STORAGE_VARIABLE = "EIT_DASH_COMPACT_STORAGE"
+
+# time in seconds after which the data loaded by a background job is removed, if it has not been used by the app
+JOB_RESULT_EXPIRE = 60 * 60
+
+# the data loaded from files is kept in memory, to be reused when the same file is loaded again (also by other
+# sessions). The least recently used data is removed when the data exceeds LOADING_CACHE_MAX_BYTES
+LOADING_CACHE_MAX_BYTES = 2 * 1024**3
+
+# the data parsed from files is also saved on disk, to be read again without parsing the files (also after a restart).
+# The least recently used recordings are removed when the saved recordings exceed RECORDING_CACHE_MAX_BYTES
+RECORDING_CACHE_MAX_BYTES = 50 * 1024**3
+# arrays smaller than MIN_MAPPED_ARRAY_BYTES are pickled with the rest of the data, instead of being saved in a separate
+# `.npy` file (in the recording cache and in the saved sessions)
+MIN_MAPPED_ARRAY_BYTES = 64 * 1024
+
+# the designed filters are cached, so that applying the same filter again only costs the filtering. At most
+# FILTER_DESIGN_CACHE_SIZE filters (combinations of type, cutoff frequencies, order and sampling frequency) are kept
+FILTER_DESIGN_CACHE_SIZE = 128
+
+# the filter is previewed while its parameters are typed, once they have not changed for FILTER_PREVIEW_DEBOUNCE
+# milliseconds
+FILTER_PREVIEW_DEBOUNCE = 300
+
+# the impedance of the pixels is filtered in chunks of pixels, each of at most PIXEL_FILTER_CHUNK_BYTES, to bound the
+# memory used by the filter
+PIXEL_FILTER_CHUNK_BYTES = 64 * 1024**2
+
+# end-expirations are the minima of the global impedance that are at least MIN_BREATH_DURATION seconds apart, and whose
+# prominence is at least MIN_BREATH_PROMINENCE times the range of the signal (between its 5th and 95th percentile)
+MIN_BREATH_DURATION = 1
+MIN_BREATH_PROMINENCE = 0.25
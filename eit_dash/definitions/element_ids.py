@@ -10,6 +10,7 @@ PREV_PAGE_BUTTON_PREP = "prev-page-button-prep"
 PREV_PAGE_LINK_PREP = "prev-page-link-prep"
 PREV_PAGE_BUTTON_ANALYZE = "prev-page-button-analyze"
 PREV_PAGE_LINK_ANALYZE = "prev-page-link-analyze"
+SESSION_ID = "session-id"
 
 # load page
 ADD_DATA_BUTTON = "add-data-button"
@@ -18,6 +19,9 @@ CHECKBOX_SIGNALS = "checkbox-signals"
 CHOOSE_DATA_POPUP = "choose-data-popup"
 CWD = "cwd"
 CWD_FILES = "cwd-files"
+IMPORT_FOLDER_BUTTON = "import-folder-button"
+IMPORT_RESULTS = "import-results"
+IMPORTED_FILES = "imported-files"
 INPUT_TYPE_SELECTOR = "input-type-selector"
 SELECT_FILES_BUTTON = "select-files-button"
 METADATA = "metadata"
@@ -27,6 +31,11 @@ NFILES_PLACEHOLDER = "nfiles-placeholder"
 DATASET_CONTAINER = "dataset-container"
 LOAD_CONFIRM_BUTTON = "load-confirm-button"
 LOAD_CANCEL_BUTTON = "load-cancel-button"
+LOAD_PREVIEW_DIV = "load-preview-div"
+LOAD_PROGRESS = "load-progress"
+LOAD_PROGRESS_DIV = "load-progress-div"
+LOAD_REQUEST = "load-request"
+LOADED_FILE = "loaded-file"
 LOAD_RESULTS_TITLE = "load-results-title"
 PARENT_DIR = "parent-dir"
 POPULATE_DATA = "populate-data"
@@ -48,6 +57,7 @@ FILTERING_CLOSE_BUTTON = "filtering-close-button"
 FILTERING_CONFIRM_BUTTON = "filtering-confirm-button"
 FILTERING_CONFIRM_DIV = "filtering-confirm-div"
 FILTER_PARAMS = "filter-params"
+FILTER_PIXELS = "filter-pixels"
 FILTERING_SELECTION_POPUP = "filtering-selection-popup"
 FILTER_SELECTOR = "filter-selector"
 FILTERING_SELECT_PERIOD_VIEW = "filtering-select-period-view"
@@ -70,6 +80,7 @@ PERIODS_SELECTION_BODY = "periods-selection-body"
 PERIODS_SELECTION_DIV = "periods-selection-div"
 PERIODS_SELECTION_SELECT_DATASET = "periods-selection-select-dataset"
 PREPROCESING_DATASET_SELECT = "preprocessing-dataset-select"
+PREPROCESING_FIGURE_DATASET = "preprocessing-figure-dataset"
 PREPROCESING_PERIODS_GRAPH = "preprocessing-periods-graph"
 PREPROCESING_RESULTS_CONTAINER = "preprocessing-results-container"
 PREPROCESING_SELECT_ALL_BTN = "preprocessing-select-all-btn"
@@ -89,6 +100,11 @@ ANALYZE_RESULTS_TITLE = "analyze-results-title"
 ANALYZE_SELECT_PERIOD_VIEW = "analyze-select-period-view"
 ANALYZE_TITLE = "analyze-title"
 EELI_APPLY = "eeli-apply"
+EELI_PROGRESS = "eeli-progress"
+EELI_PROGRESS_DIV = "eeli-progress-div"
+EELI_REQUEST = "eeli-request"
+EELI_RESULTS = "eeli-results"
 EELI_RESULTS_GRAPH = "eeli-results-graph"
 EELI_RESULTS_GRAPH_DIV = "eeli-results-graph-div"
+REGIONAL_MAPS_GRAPH = "regional-maps-graph"
 SUMMARY_COLUMN_ANALYZE = "summary-column-analyze"
@@ -1,50 +1,68 @@
 import dash_bootstrap_components as dbc
-from dash import html, page_container
+from dash import dcc, html, page_container
 
-from eit_dash.app import app
+from eit_dash.app import app, session_store
 from eit_dash.callbacks import (  # noqa: F401
     analyze_callbacks,
     load_callbacks,
     preprocessing_callbacks,
 )
+from eit_dash.definitions import element_ids as ids
 from eit_dash.definitions import layout_styles as styles
 
-app.layout = html.Div(
-    [
-        html.H1(
-            id="test-id",
-            children="EIT-ALIVE dashboard",
-            style={"textAlign": "center"},
-        ),
-        dbc.Row(
-            [
-                dbc.Col(
-                    html.H2(dbc.NavLink("LOAD", href="/", style=styles.PAGES_LINK)),
-                ),
-                dbc.Col(
-                    html.H2(
-                        dbc.NavLink(
-                            "PRE-PROCESSING",
-                            href="/preprocessing",
-                            style=styles.PAGES_LINK,
+
+def serve_layout():
+    """Create the layout of the app, with a new session id.
+
+    The session id is kept in the session storage of the browser, so that it survives page reloads.
+    """
+    return html.Div(
+        [
+            dcc.Store(
+                id=ids.SESSION_ID,
+                storage_type="session",
+                data=session_store.new_session_id(),
+            ),
+            html.H1(
+                id="test-id",
+                children="EIT-ALIVE dashboard",
+                style={"textAlign": "center"},
+            ),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.H2(dbc.NavLink("LOAD", href="/", style=styles.PAGES_LINK)),
+                    ),
+                    dbc.Col(
+                        html.H2(
+                            dbc.NavLink(
+                                "PRE-PROCESSING",
+                                href="/preprocessing",
+                                style=styles.PAGES_LINK,
+                            ),
                         ),
                     ),
-                ),
-                dbc.Col(
-                    html.H2(
-                        dbc.NavLink(
-                            "ANALYZE",
-                            href="/analyze",
-                            style=styles.PAGES_LINK,
+                    dbc.Col(
+                        html.H2(
+                            dbc.NavLink(
+                                "ANALYZE",
+                                href="/analyze",
+                                style=styles.PAGES_LINK,
+                            ),
                         ),
                     ),
-                ),
-            ],
-            style={"textAlign": "center"},
-        ),
-        page_container,
-    ],
-)
+                ],
+                style={"textAlign": "center"},
+            ),
+            page_container,
+        ],
+    )
+
+
+app.layout = serve_layout
+
+# the Flask server, to be used by WSGI servers (e.g. `gunicorn eit_dash.main:server`)
+server = app.server
 
 
 if __name__ == "__main__":
@@ -31,6 +31,16 @@ actions = dbc.Col(
             hidden=False,
         ),
         html.P(),
+        # shown while the EELI is computed in the background
+        html.Div(
+            [
+                html.H5("Computing EELI", style=styles.SECTION_TITLE),
+                dbc.Progress(id=ids.EELI_PROGRESS, animated=True, striped=True),
+            ],
+            id=ids.EELI_PROGRESS_DIV,
+            hidden=True,
+        ),
+        html.P(),
         html.Div(
             [
                 dbc.Row(html.H6("Select a period to view the results")),
@@ -38,6 +48,9 @@ actions = dbc.Col(
                 dbc.Row(
                     dcc.Graph(id=ids.EELI_RESULTS_GRAPH, style=styles.EMPTY_ELEMENT),
                 ),
+                dbc.Row(
+                    dcc.Graph(id=ids.REGIONAL_MAPS_GRAPH, style=styles.EMPTY_ELEMENT),
+                ),
             ],
             id=ids.EELI_RESULTS_GRAPH_DIV,
             hidden=True,
@@ -46,12 +59,18 @@ actions = dbc.Col(
     ],
 )
 
+# references to the signals whose EELI is computed in the background, and to the computed results
+eeli_request = dcc.Store(id=ids.EELI_REQUEST)
+eeli_results = dcc.Store(id=ids.EELI_RESULTS)
+
 layout = dbc.Row(
     [
         html.H1("ANALYZE DATA", style=styles.COLUMN_TITLE),
         summary,
         actions,
         results,
+        eeli_request,
+        eeli_results,
         html.Div(
             [
                 dbc.NavLink(
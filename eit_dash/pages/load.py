@@ -38,15 +38,29 @@ add_data_selector = dcc.Loading(
         hidden=True,
         children=[
             html.P(),
-            html.H5("Signal selections", style=styles.SECTION_TITLE),
-            dbc.Row(
-                dcc.Checklist(
-                    id=ids.CHECKBOX_SIGNALS,
-                    inputStyle=styles.CHECKBOX_INPUT,
-                ),
+            # shown while the file is loaded in the background
+            html.Div(
+                [
+                    html.H5("Loading", style=styles.SECTION_TITLE),
+                    dbc.Progress(id=ids.LOAD_PROGRESS, animated=True, striped=True),
+                ],
+                id=ids.LOAD_PROGRESS_DIV,
+                hidden=True,
+            ),
+            html.Div(
+                [
+                    html.H5("Signal selections", style=styles.SECTION_TITLE),
+                    dbc.Row(
+                        dcc.Checklist(
+                            id=ids.CHECKBOX_SIGNALS,
+                            inputStyle=styles.CHECKBOX_INPUT,
+                        ),
+                    ),
+                    html.H5("Pre selection", style=styles.SECTION_TITLE),
+                    dcc.Graph(id=ids.FILE_LENGTH_SLIDER),
+                ],
+                id=ids.LOAD_PREVIEW_DIV,
             ),
-            html.H5("Pre selection", style=styles.SECTION_TITLE),
-            dcc.Graph(id=ids.FILE_LENGTH_SLIDER),
             html.Div(),
             dbc.Row(
                 [
@@ -79,12 +93,22 @@ add_data_selector = dcc.Loading(
     ),
 )
 
+# results of the import of all the files of a directory
+import_results = dbc.Alert(
+    id=ids.IMPORT_RESULTS,
+    color="primary",
+    dismissable=True,
+    is_open=False,
+    style={"whiteSpace": "pre-line"},
+)
+
 actions = dbc.Col(
     [
         html.H2("Load datasets", style=styles.COLUMN_TITLE),
         html.P(),
         input_type_selector,
         html.P(),
+        import_results,
         add_data_selector,
     ],
 )
@@ -95,6 +119,12 @@ placeholder_nfiles = html.Div(
     children=0,
 )
 
+# file to be loaded in the background, and reference to the loaded data, set when the loading is completed
+load_request = dcc.Store(id=ids.LOAD_REQUEST)
+loaded_file = dcc.Store(id=ids.LOADED_FILE)
+# reference to the results of the import of all the files of a directory, set when the import is completed
+imported_files = dcc.Store(id=ids.IMPORTED_FILES)
+
 file_browser = html.Div(
     [
         dbc.Row(
@@ -133,12 +163,20 @@ modal_dialog = html.Div(
                         ),
                         dbc.ModalBody([alert_load, file_browser]),
                         dbc.ModalFooter(
-                            dbc.Button(
-                                "Confirm",
-                                id=ids.SELECT_CONFIRM_BUTTON,
-                                className="ms-auto",
-                                n_clicks=0,
-                            ),
+                            [
+                                dbc.Button(
+                                    "Import all the files of the directory",
+                                    id=ids.IMPORT_FOLDER_BUTTON,
+                                    color="secondary",
+                                    n_clicks=0,
+                                ),
+                                dbc.Button(
+                                    "Confirm",
+                                    id=ids.SELECT_CONFIRM_BUTTON,
+                                    className="ms-auto",
+                                    n_clicks=0,
+                                ),
+                            ],
                         ),
                     ],
                     id=ids.CHOOSE_DATA_POPUP,
@@ -162,6 +200,9 @@ layout = dbc.Row(
         actions,
         results,
         placeholder_nfiles,
+        load_request,
+        loaded_file,
+        imported_files,
         modal_dialog,
         populate_loaded_data,
         # TODO: the following is duplicated in multiple pages. To be refactored
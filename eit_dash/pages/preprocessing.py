@@ -3,6 +3,7 @@ from dash import dcc, html, register_page
 
 import eit_dash.definitions.element_ids as ids
 import eit_dash.definitions.layout_styles as styles
+from eit_dash.definitions.constants import FILTER_PREVIEW_DEBOUNCE
 from eit_dash.definitions.option_lists import (
     FilterTypes,
     PeriodsSelectMethods,
@@ -134,6 +135,8 @@ modal_selection_body = html.Div(
         dbc.Row(id=ids.PERIODS_SELECTION_SELECT_DATASET),
         html.P(),
         dbc.Row(id=ids.PREPROCESING_SIGNALS_CHECKBOX_ROW),
+        # dataset of the figure, set when the checkbox of the dataset is ready
+        dcc.Store(id=ids.PREPROCESING_FIGURE_DATASET),
         html.P(),
         dcc.Loading(
             html.Div(
@@ -226,23 +229,33 @@ filter_params = html.Div(
                 dbc.Col(
                     [
                         html.P("Filter Order"),
-                        dbc.Input(id=ids.FILTER_ORDER, type="number", min=0),
+                        dbc.Input(id=ids.FILTER_ORDER, type="number", min=0, debounce=FILTER_PREVIEW_DEBOUNCE),
                     ],
                 ),
                 dbc.Col(
                     [
                         html.P("Cut off frequency low"),
-                        dbc.Input(id=ids.FILTER_CUTOFF_LOW, type="number", min=0),
+                        dbc.Input(id=ids.FILTER_CUTOFF_LOW, type="number", min=0, debounce=FILTER_PREVIEW_DEBOUNCE),
                     ],
                 ),
                 dbc.Col(
                     [
                         html.P("Cut off frequency high"),
-                        dbc.Input(id=ids.FILTER_CUTOFF_HIGH, type="number", min=0),
+                        dbc.Input(id=ids.FILTER_CUTOFF_HIGH, type="number", min=0, debounce=FILTER_PREVIEW_DEBOUNCE),
                     ],
                 ),
             ],
         ),
+        dbc.Row(
+            dbc.Col(
+                dbc.Checkbox(
+                    id=ids.FILTER_PIXELS,
+                    label="Filter also the impedance of each pixel (needed for the regional analysis)",
+                    value=False,
+                ),
+            ),
+            style=styles.BUTTONS_ROW,
+        ),
         dbc.Row(
             [
                 dbc.Col(
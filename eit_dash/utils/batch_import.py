@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from eitprocessing.datahandling.eitdata import Vendor
+from eitprocessing.datahandling.loading import load_eit_data
+
+from eit_dash.utils.data_singleton import compact_sequence
+from eit_dash.utils.loading import get_file_key
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from eitprocessing.datahandling.sequence import Sequence
+
+    from eit_dash.utils.data_singleton import LoadedData
+    from eit_dash.utils.loading import LoadingCache, RecordingCache
+
+# vendor of the recordings, by file extension, with the same values as the vendors selected in the load page
+RECORDING_EXTENSIONS = {
+    ".bin": Vendor.DRAEGER.value,
+    ".txt": Vendor.TIMPEL.value,
+    ".zri": Vendor.SENTEC.value,
+}
+
+
+@dataclass
+class ImportedFile:
+    """Result of the import of a recording.
+
+    Attributes:
+        path: path of the file
+        vendor: vendor of the device used for the recording
+        nbytes: size of the file
+        data: the loaded data. None if the import failed, or if the data has been saved in the recording cache
+        error: description of the error, if the import failed
+    """
+
+    path: Path
+    vendor: str
+    nbytes: int
+    data: Sequence | None = None
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        """Whether the file could not be imported."""
+        return self.error is not None
+
+
+@dataclass
+class ImportReport:
+    """Results of the import of several recordings.
+
+    Attributes:
+        files: the results of each file, in the order of the paths
+        elapsed: duration of the import in seconds
+    """
+
+    files: list[ImportedFile]
+    elapsed: float
+
+    @property
+    def failures(self) -> list[ImportedFile]:
+        """The files that could not be imported."""
+        return [file for file in self.files if file.failed]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the imported files."""
+        return sum(file.nbytes for file in self.files if not file.failed)
+
+    @property
+    def files_per_second(self) -> float:
+        """Number of files imported per second."""
+        return (len(self.files) - len(self.failures)) / self.elapsed if self.elapsed else 0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Megabytes of files imported per second."""
+        return self.nbytes / 1e6 / self.elapsed if self.elapsed else 0
+
+    def summary(self) -> str:
+        """Describe the results of the import and its throughput."""
+        imported = len(self.files) - len(self.failures)
+        summary = (
+            f"{imported} of {len(self.files)} files imported in {self.elapsed:.1f} s "
+            f"({self.files_per_second:.2f} files/s, {self.megabytes_per_second:.1f} MB/s)"
+        )
+
+        for file in self.failures:
+            summary += f"\n{file.path.name}: {file.error}"
+
+        return summary
+
+
+def find_recordings(directory: str | Path, recursive: bool = False) -> list[Path]:
+    """Find the recordings that can be loaded in a directory.
+
+    Args:
+        directory: the directory
+        recursive: if True, the subdirectories are searched too
+
+    Returns:
+        The paths of the recordings, sorted.
+    """
+    files = Path(directory).rglob("*") if recursive else Path(directory).iterdir()
+
+    return sorted(path for path in files if path.suffix in RECORDING_EXTENSIONS and path.is_file())
+
+
+def import_file(path: Path, recording_cache: RecordingCache | None = None) -> ImportedFile:
+    """Load a recording, saving it in the recording cache if given.
+
+    A recording that is already in the recording cache (e.g. imported before) is not parsed again.
+
+    This runs in the processes of the pool, so the errors are returned instead of being raised.
+
+    Args:
+        path: path of the file
+        recording_cache: cache where the loaded data is saved. If the data is saved, it is not returned, so that it
+            does not have to be sent back to the main process
+    """
+    vendor = RECORDING_EXTENSIONS[path.suffix]
+    result = ImportedFile(path, vendor, path.stat().st_size)
+
+    try:
+        key = get_file_key(path, vendor)
+        if recording_cache is not None and key in recording_cache:
+            return result
+
+        data = load_eit_data(path, vendor=vendor, label="selected data")
+
+        if recording_cache is None or not recording_cache.put(key, data):
+            result.data = data
+    # a file that cannot be loaded must not stop the import of the other files
+    except Exception as e:  # noqa: BLE001
+        result.error = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def import_files(
+    paths: list[Path],
+    recording_cache: RecordingCache | None = None,
+    max_workers: int | None = None,
+    progress: Callable[[ImportedFile, int, int], None] | None = None,
+) -> ImportReport:
+    """Load several recordings in parallel, in a pool of processes.
+
+    Args:
+        paths: paths of the files
+        recording_cache: cache where the loaded data is saved, see `import_file`
+        max_workers: number of processes. Defaults to the number of processors
+        progress: function called when a file has been loaded, with its result, the number of files loaded and the
+            total number of files
+
+    Returns:
+        The results of the import, in the order of the paths.
+    """
+    start = time.perf_counter()
+    results: dict[Path, ImportedFile] = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(import_file, path, recording_cache): path for path in paths}
+
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            # e.g. a worker process has been killed
+            except Exception as e:  # noqa: BLE001
+                result = ImportedFile(path, RECORDING_EXTENSIONS[path.suffix], 0, error=f"{type(e).__name__}: {e}")
+
+            results[path] = result
+            if progress is not None:
+                progress(result, len(results), len(paths))
+
+    return ImportReport([results[path] for path in paths], time.perf_counter() - start)
+
+
+def register_datasets(
+    report: ImportReport,
+    data_object: LoadedData,
+    loading_cache: LoadingCache,
+    compact: bool = False,
+) -> list[Sequence]:
+    """Add the imported recordings to the datasets, in the order of the files.
+
+    Args:
+        report: results of the import
+        data_object: the datasets, where the recordings are added
+        loading_cache: cache used to read the data saved in the recording cache
+        compact: if True, the datasets are stored in single precision (see `compact_sequence`)
+
+    Returns:
+        The added datasets.
+    """
+    datasets = []
+
+    for file in report.files:
+        if file.failed:
+            continue
+
+        data = file.data if file.data is not None else loading_cache.load(file.path, file.vendor)
+        # the loaded data may be shared through the caches, so it is not relabeled in place
+        dataset = dataclasses.replace(data, label=data_object.get_next_dataset_label())
+        if compact:
+            dataset = compact_sequence(dataset)
+        data_object.add_sequence(dataset)
+        datasets.append(dataset)
+
+    return datasets
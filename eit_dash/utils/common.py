@@ -7,10 +7,12 @@ import dash_bootstrap_components as dbc
 import plotly.colors
 import plotly.graph_objects as go
 from dash import html
+from dash.exceptions import PreventUpdate
 
 from eit_dash.definitions import element_ids as ids
 from eit_dash.definitions import layout_styles as styles
-from eit_dash.definitions.constants import RAW_EIT_LABEL
+from eit_dash.definitions.constants import MAX_PLOT_POINTS, RAW_EIT_LABEL
+from eit_dash.utils.downsampling import downsample
 
 if TYPE_CHECKING:
     from eitprocessing.datahandling.sequence import Sequence
@@ -119,6 +121,8 @@ def create_slider_figure(
     dataset: Sequence,
     continuous_data: list[str] | None = None,
     clickable_legend: bool = False,
+    max_points: int | None = MAX_PLOT_POINTS,
+    time_range: tuple[float, float] | None = None,
 ) -> go.Figure:
     """Create the figure for the selection of range. The raw global impedance is plotted by default.
 
@@ -126,6 +130,9 @@ def create_slider_figure(
         dataset: Sequence object containing the selected dataset
         continuous_data: list of the continuous data signals to be plotted
         clickable_legend: if True, the user can hide a signal by clicking on the legend
+        max_points: maximum number of points plotted for each signal. Longer signals are decimated
+            preserving their min/max envelope. If None, all the samples are plotted
+        time_range: visible time range. The samples in this range are plotted with full detail, up to `max_points`
     """
     figure = go.Figure()
     params = {}
@@ -134,10 +141,16 @@ def create_slider_figure(
     if continuous_data is None:
         continuous_data = []
 
+    x, y = downsample(
+        dataset.continuous_data[RAW_EIT_LABEL].time,
+        dataset.continuous_data[RAW_EIT_LABEL].values,
+        max_points,
+        time_range,
+    )
     figure.add_trace(
         go.Scatter(
-            x=dataset.continuous_data[RAW_EIT_LABEL].time,
-            y=dataset.continuous_data[RAW_EIT_LABEL].values,
+            x=x,
+            y=y,
             name=RAW_EIT_LABEL,
             line={"color": plotly.colors.DEFAULT_PLOTLY_COLORS[0]},
         ),
@@ -149,10 +162,16 @@ def create_slider_figure(
 
     for n, cont_signal in enumerate(continuous_data):
         if cont_signal != RAW_EIT_LABEL:
+            x, y = downsample(
+                dataset.continuous_data[cont_signal].time,
+                dataset.continuous_data[cont_signal].values,
+                max_points,
+                time_range,
+            )
             figure.add_trace(
                 go.Scatter(
-                    x=dataset.continuous_data[cont_signal].time,
-                    y=dataset.continuous_data[cont_signal].values,
+                    x=x,
+                    y=y,
                     name=cont_signal,
                     line={"color": plotly.colors.DEFAULT_PLOTLY_COLORS[n + 1]},
                     opacity=0.5,
@@ -208,6 +227,9 @@ def create_slider_figure(
 def mark_selected_periods(
     original_figure: go.Figure | dict,
     periods: list[Period],
+    max_points: int | None = MAX_PLOT_POINTS,
+    time_range: tuple[float, float] | None = None,
+    signals: list[str] | None = None,
 ) -> go.Figure:
     """
     Create the figure for the selection of range.
@@ -216,14 +238,24 @@ def mark_selected_periods(
         original_figure: figure to update
         periods: list of Sequence object containing the selected dataset.
         These ranges, the signal is plotted in black
+        max_points: maximum number of points plotted for each signal of a period. If None, all the samples are plotted
+        time_range: visible time range. The samples in this range are plotted with full detail, up to `max_points`
+        signals: signals to be marked, in the same order used for creating the figure. If None, all the signals
+            of each period are marked
     """
     for period in periods:
         seq = period.get_data()
 
-        for n, cont_signal in enumerate(seq.continuous_data):
+        for n, cont_signal in enumerate(signals or seq.continuous_data):
+            x, y = downsample(
+                seq.continuous_data[cont_signal].time,
+                seq.continuous_data[cont_signal].values,
+                max_points,
+                time_range,
+            )
             params = {
-                "x": seq.continuous_data[cont_signal].time,
-                "y": seq.continuous_data[cont_signal].values,  # noqa: PD011
+                "x": x,
+                "y": y,
                 "name": cont_signal,
                 "meta": {"uid": period.get_period_index()},
                 "line": {"color": "black"},
@@ -246,6 +278,32 @@ def mark_selected_periods(
     return original_figure
 
 
+def get_figure_traces(
+    signals: list[str],
+    periods: list[Period] | None = None,
+) -> list[tuple[str, int | None]]:
+    """List the traces of a figure created with `create_slider_figure` and `mark_selected_periods`.
+
+    This allows updating the traces of the figure in the browser by their index (e.g. with `dash.Patch`),
+    without sending the whole figure back to the server.
+
+    Args:
+        signals: continuous signals plotted in the figure, in the order used for creating it
+        periods: periods marked in the figure, in the order used for marking them
+
+    Returns:
+        A list with the name of the signal and the index of the period (None for the dataset signals)
+        for each trace of the figure.
+    """
+    traces = [(RAW_EIT_LABEL, None)]
+    traces += [(signal, None) for signal in signals if signal != RAW_EIT_LABEL]
+
+    for period in periods or []:
+        traces += [(signal, period.get_period_index()) for signal in signals]
+
+    return traces
+
+
 def get_signal_options(
     dataset: Sequence,
     show_eit: bool = False,
@@ -289,3 +347,29 @@ def get_selections_slidebar(slidebar_stat: dict) -> tuple:
         start_sample = stop_sample = None
 
     return start_sample, stop_sample
+
+
+def get_zoom_range(relayout_data: dict | None) -> tuple[float, float] | None:
+    """Given the layout data of a graph, it returns the visible time range after zooming or panning.
+
+    Args:
+        relayout_data: Layout data of a graph.
+
+    Returns:
+        A tuple with the first and the last visible time point, or None if the whole signal is shown.
+
+    Raises:
+        PreventUpdate: if the layout change does not involve the time axis.
+    """
+    if not relayout_data:
+        raise PreventUpdate
+
+    start, stop = get_selections_slidebar(relayout_data)
+
+    if start is not None and stop is not None:
+        return start, stop
+
+    if relayout_data.get("xaxis.autorange"):
+        return None
+
+    raise PreventUpdate
@@ -1,34 +1,40 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from threading import Lock
+import dataclasses
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-    from eitprocessing.datahandling.sequence import Sequence
+import numpy as np
+from eitprocessing.datahandling.datacollection import DataCollection
+from eitprocessing.datahandling.sequence import Sequence
 
+if TYPE_CHECKING:
+    from eitprocessing.datahandling.continuousdata import ContinuousData
+    from eitprocessing.datahandling.eitdata import EITData
 
-_singleton = None
-_lock = Lock()
 
+# collections of a sequence, and those that are views of the dataset in the data of a period
+DATA_COLLECTIONS = ("eit_data", "continuous_data", "sparse_data", "interval_data")
+VIEW_COLLECTIONS = ("eit_data", "continuous_data")
 
-def get_singleton():
-    """Initialize singleton."""
-    with _lock:
-        global _singleton
 
-        if _singleton is None:
-            _singleton = LoadedData()
+class LoadedData:
+    """Loaded data.
 
-        return _singleton
+    The datasets and the stable periods are indexed by dictionaries, so that they can be looked up without scanning
+    all of them: the datasets by label, the periods by period index and by dataset index. Datasets are also kept in a
+    list, because they are referred to by their position.
 
-
-class LoadedData:
-    """Loaded data."""
+    The index of a new period is taken from a counter, so that the index of a removed period is not given to another
+    one, whose results could be mistaken for those of the removed period.
+    """
 
     def __init__(self):
         self._data: list[Sequence] = []
-        self._stable_periods: list[Period] = []
+        self._labels: dict[str, Sequence] = {}
+        self._stable_periods: dict[int, Period] = {}
+        self._dataset_periods: dict[int, dict[int, Period]] = {}
+        self._next_period_index = 0
 
     def add_sequence(self, new_sequence: Sequence) -> None:
         """Add a sequence to the singleton.
@@ -37,11 +43,15 @@ class LoadedData:
         new_sequence: Sequence object containing the selected dataset
         """
         self._data.append(new_sequence)
+        self._labels.setdefault(new_sequence.label, new_sequence)
 
     def clear_data(self) -> None:
         """Remove all data from the singleton."""
         self._data.clear()
+        self._labels.clear()
         self._stable_periods.clear()
+        self._dataset_periods.clear()
+        self._next_period_index = 0
 
     def get_all_sequences(self):
         """Get all the saved sequences."""
@@ -69,13 +79,12 @@ class LoadedData:
 
     def get_next_dataset_label(self):
         """Determines the label to be assigned to the next dataset."""
-        available_labels = self.get_dataset_labels()
         label = f"Dataset {self.get_sequence_list_length()}"
 
-        if label in available_labels:
+        if label in self._labels:
             for i in range(self.get_sequence_list_length()):
                 label = f"Dataset {i}"
-                if label not in available_labels:
+                if label not in self._labels:
                     break
         return label
 
@@ -93,13 +102,18 @@ class LoadedData:
         data: Sequence,
         dataset_index: int,
         period_index: int | None = None,
+        dataset: Sequence | None = None,
     ):
         """Add a stable period to the singleton.
 
+        If the period is a selection of its dataset (e.g. from `select_by_time`), only its position in the dataset is
+        kept when the data is saved.
+
         Args:
             data: Sequence object containing the stable period
             dataset_index: index of the reference dataset where the period has been selected
             period_index: index of the sable period.
+            dataset: the dataset where the period has been selected, if it is not stored in this object
         """
         if not self.dataset_exists(dataset_index):
             msg = f"Index higher than list length {self.get_sequence_list_length()}"
@@ -109,12 +123,20 @@ class LoadedData:
             period_index = self.get_next_period_index()
 
         # check that the index doesn't exist
-        for period in self._stable_periods:
-            if period.get_period_index() == period_index:
-                msg = f"Index {period_index} exist already"
-                raise ValueError(msg)
+        if period_index in self._stable_periods:
+            msg = f"Index {period_index} exist already"
+            raise ValueError(msg)
 
-        self._stable_periods.append(Period(data, dataset_index, period_index))
+        if dataset is None and dataset_index < self.get_sequence_list_length():
+            dataset = self._data[dataset_index]
+
+        period = Period(data, dataset_index, period_index)
+        if dataset is not None:
+            period.link_dataset(dataset)
+
+        self._stable_periods[period_index] = period
+        self._dataset_periods.setdefault(dataset_index, {})[period_index] = period
+        self._next_period_index = max(self._next_period_index, period_index + 1)
 
     def remove_data(self, label: str):
         """Remove a sequence from data from the singleton.
@@ -122,13 +144,18 @@ class LoadedData:
         Args:
             label: label of the sequence to be removed.
         """
-        for sequence in self._data:
-            if sequence.label == label:
-                self._data.remove(sequence)
-                return
+        if (sequence := self._labels.pop(label, None)) is None:
+            msg = f"Sequence with label {label} not found"
+            raise ValueError(msg)
+
+        # `list.remove` compares the sequences by value, which may find another sequence equal to this one
+        del self._data[next(i for i, other in enumerate(self._data) if other is sequence)]
 
-        msg = f"Sequence with label {label} not found"
-        raise ValueError(msg)
+        # another sequence may have the same label
+        for other in self._data:
+            if other.label == label:
+                self._labels[label] = other
+                break
 
     def remove_stable_period(self, index: int):
         """Remove a stable period from the singleton.
@@ -136,13 +163,14 @@ class LoadedData:
         Args:
             index: index of the sable period to be removed.
         """
-        for period in self._stable_periods:
-            if period.get_period_index() == index:
-                self._stable_periods.remove(period)
-                return
+        if (period := self._stable_periods.pop(index, None)) is None:
+            msg = f"Period with index {index} not found"
+            raise ValueError(msg)
 
-        msg = f"Period with index {index} not found"
-        raise ValueError(msg)
+        dataset_periods = self._dataset_periods[period.get_dataset_index()]
+        del dataset_periods[index]
+        if not dataset_periods:
+            del self._dataset_periods[period.get_dataset_index()]
 
     def get_stable_periods_list_length(self):
         """Get the number of stored periods."""
@@ -159,14 +187,14 @@ class LoadedData:
             msg = f"Index higher than list length {self.get_sequence_list_length()}"
             raise ValueError(msg)
 
-        return [period for period in self._stable_periods if period.get_dataset_index() == dataset_index]
+        return list(self._dataset_periods.get(dataset_index, {}).values())
 
     def get_all_stable_periods(self) -> list[Period]:
         """Retrieve all the saved stable periods.
 
         Returns: A list of Sequences containing the stable periods.
         """
-        return self._stable_periods
+        return list(self._stable_periods.values())
 
     def get_stable_period(self, index: int):
         """Get a stable period from the singleton, using its index.
@@ -174,31 +202,37 @@ class LoadedData:
         Args:
             index: index of the sable period to be retrieved.
         """
-        for period in self._stable_periods:
-            if period.get_period_index() == index:
-                return period
+        if (period := self._stable_periods.get(index)) is None:
+            msg = f"Period with index {index} not found"
+            raise ValueError(msg)
 
-        msg = f"Period with index {index} not found"
-        raise ValueError(msg)
+        return period
 
     def get_stable_periods_indexes(self) -> list[int]:
         """Get a list of the indexes of the stable periods currently available."""
-        return [period.get_period_index() for period in self._stable_periods]
+        return list(self._stable_periods)
 
     def get_next_period_index(self):
         """Determines the index to be assigned to the next stable period."""
-        available_indexes = self.get_stable_periods_indexes()
-
-        return max(available_indexes) + 1 if available_indexes else 0
+        return self._next_period_index
 
 
 @dataclass
 class Period:
-    """Stable period."""
+    """Stable period.
+
+    The data of a period selected from a dataset is a view of the arrays of the dataset. When the period is linked to
+    its dataset (see `link_dataset`), only the position of the period in the dataset and the data added to the period
+    (e.g. the filtered signal) are pickled, and the view is restored when unpickling.
+    """
 
     _data: Sequence
     _dataset_index: int
     _period_index: int
+    _dataset: Sequence | None = field(default=None, repr=False)
+    # first and last (excluded) frames of the period in its dataset
+    _start: int = 0
+    _stop: int = 0
 
     def get_data(self) -> Sequence:
         """Get all the Sequence representing the period.
@@ -233,6 +267,9 @@ class Period:
         self._dataset_index = dataset_index
         self._period_index = period_index
 
+        if self._dataset is not None:
+            self.link_dataset(self._dataset)
+
     def update_data(self, data: Sequence) -> Sequence:
         """Update the data of a period.
 
@@ -240,3 +277,198 @@ class Period:
             data: The sequence with the updated period data
         """
         self._data = data
+
+        if self._dataset is not None:
+            self.link_dataset(self._dataset)
+
+    def copy_data(self) -> Sequence:
+        """Get a copy of the data of the period, which can be modified without changing the period.
+
+        The arrays are not copied, only the collections holding them. New data (e.g. a filtered signal) can be added
+        to the copy, but its arrays must not be modified in place.
+        """
+        return Sequence(
+            label=self._data.label,
+            name=self._data.name,
+            description=self._data.description,
+            **{key: copy_collection(getattr(self._data, key)) for key in DATA_COLLECTIONS},
+        )
+
+    def get_dataset(self) -> Sequence | None:
+        """Get the dataset the data of the period is a view of, or None if the period is not linked to it."""
+        return self._dataset
+
+    def get_selection(self) -> tuple:
+        """Get what identifies the selection of the period: its dataset, and the time and number of its frames.
+
+        Unlike the index of the period, this does not change when the period is removed and another one is added
+        with the same index, nor when the data is saved and loaded again.
+        """
+        time = get_frames_time(self._data)
+        if time is None or not len(time):
+            return self._dataset_index, None, None, 0
+
+        return self._dataset_index, float(time[0]), float(time[-1]), len(time)
+
+    def link_dataset(self, dataset: Sequence) -> None:
+        """Link the period to the dataset it has been selected from.
+
+        The period is only linked if its data is a view of a range of frames of the dataset.
+
+        Args:
+            dataset: the dataset where the period has been selected
+        """
+        self._dataset = None
+        dataset_time, time = get_frames_time(dataset), get_frames_time(self._data)
+
+        if dataset_time is None or time is None or not len(time) or not np.may_share_memory(time, dataset_time):
+            return
+
+        start = int(np.searchsorted(dataset_time, time[0]))
+        stop = start + len(time)
+
+        if stop <= len(dataset_time) and np.array_equal(dataset_time[start:stop], time):
+            self._dataset, self._start, self._stop = dataset, start, stop
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+
+        if self._dataset is not None:
+            # only the data that is not shared with the dataset is kept, with the order of the labels
+            state["_labels"] = {key: list(getattr(self._data, key)) for key in VIEW_COLLECTIONS}
+            state["_data"] = Sequence(
+                label=self._data.label,
+                name=self._data.name,
+                description=self._data.description,
+                **{
+                    key: get_own_items(getattr(self._data, key), getattr(self._dataset, key))
+                    for key in VIEW_COLLECTIONS
+                },
+                sparse_data=self._data.sparse_data,
+                interval_data=self._data.interval_data,
+            )
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        labels = state.pop("_labels", None)
+        self.__dict__.update(state)
+
+        if self._dataset is None:
+            return
+
+        own_data = self._data
+        dataset_time = get_frames_time(self._dataset)
+        end_time = dataset_time[self._stop] if self._stop < len(dataset_time) else None
+        view = self._dataset.select_by_time(dataset_time[self._start], end_time)
+
+        collections = {}
+        for key in VIEW_COLLECTIONS:
+            own_items, view_items = getattr(own_data, key), getattr(view, key)
+            collections[key] = DataCollection(
+                view_items.data_type,
+                {label: own_items[label] if label in own_items else view_items[label] for label in labels[key]},
+            )
+
+        self._data = Sequence(
+            label=own_data.label,
+            name=own_data.name,
+            description=own_data.description,
+            **collections,
+            sparse_data=own_data.sparse_data,
+            interval_data=own_data.interval_data,
+        )
+
+
+def compact_sequence(sequence: Sequence, dtype: type[np.floating] = np.float32) -> Sequence:
+    """Get a copy of a sequence storing the impedance of the pixels and the continuous signals with less precision.
+
+    With the default single precision, the data takes about half of the memory. Each value is rounded to the nearest
+    single precision number, i.e. with a relative error of at most 2**-24 (about 6e-8), which is far below the
+    resolution of the EIT devices. The time axes are kept in double precision, because single precision cannot
+    represent the time of the frames of long recordings exactly enough (e.g. only to 4 ms after 10 hours).
+
+    Args:
+        sequence: the sequence
+        dtype: type of the stored values
+    """
+    # the continuous data refers to the EIT data it is derived from, which must not keep the original arrays alive
+    replaced = {}
+
+    def replace(item: EITData | ContinuousData) -> EITData | ContinuousData:
+        if id(item) not in replaced:
+            name = "pixel_impedance" if hasattr(item, "pixel_impedance") else "values"
+            changes = {name: getattr(item, name).astype(dtype, copy=False)}
+            if hasattr(item, "derived_from"):
+                changes["derived_from"] = [replaced.get(id(source), source) for source in item.derived_from]
+            replaced[id(item)] = dataclasses.replace(item, **changes)
+        return replaced[id(item)]
+
+    # the EIT data is replaced first, so that the continuous data derived from it refers to the replaced EIT data
+    collections = {}
+    for key in VIEW_COLLECTIONS:
+        collection = getattr(sequence, key)
+        collections[key] = DataCollection(
+            collection.data_type,
+            {label: replace(item) for label, item in collection.items()},
+        )
+
+    return Sequence(
+        label=sequence.label,
+        name=sequence.name,
+        description=sequence.description,
+        **collections,
+        sparse_data=sequence.sparse_data,
+        interval_data=sequence.interval_data,
+    )
+
+
+def copy_collection(collection: DataCollection) -> DataCollection:
+    """Copy a collection, without copying its items.
+
+    Args:
+        collection: the collection
+    """
+    return DataCollection(collection.data_type, collection)
+
+
+def get_frames_time(sequence: Sequence) -> np.ndarray | None:
+    """Get the time axis of the frames of a sequence, or None if it has no raw EIT data.
+
+    Args:
+        sequence: the sequence
+    """
+    eit_data: EITData | None = sequence.eit_data.get("raw")
+
+    return None if eit_data is None else eit_data.time
+
+
+def get_own_items(collection: DataCollection, dataset_collection: DataCollection) -> DataCollection:
+    """Get the items of a collection of a period that are not views of the same items of its dataset.
+
+    Args:
+        collection: collection of the period
+        dataset_collection: the same collection of the dataset
+    """
+    return DataCollection(
+        collection.data_type,
+        {
+            key: item
+            for key, item in collection.items()
+            if key not in dataset_collection or not is_view(item, dataset_collection[key])
+        },
+    )
+
+
+def is_view(item: EITData | ContinuousData, dataset_item: EITData | ContinuousData) -> bool:
+    """Check whether the arrays of an item of a period are views of the arrays of the same item of its dataset.
+
+    Args:
+        item: item of the period
+        dataset_item: item of the dataset
+    """
+    return all(
+        np.may_share_memory(getattr(item, name), getattr(dataset_item, name))
+        for name in ("time", "pixel_impedance", "values")
+        if hasattr(item, name)
+    )
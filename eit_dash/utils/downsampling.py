@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def minmax_indices(values: np.ndarray, max_points: int | None) -> np.ndarray:
+    """Select the indices of the samples to keep, preserving the min/max envelope of a signal.
+
+    The signal is divided in equally sized buckets. For each bucket, the position of the minimum and of the maximum
+    are kept, so that peaks survive the decimation. The first and the last sample are always kept, so that the time
+    range of the decimated signal is the same as the original one.
+
+    Args:
+        values: the values of the signal to be decimated
+        max_points: maximum number of samples to keep. If None, or if the signal is shorter than this,
+            all the samples are kept
+
+    Returns:
+        A sorted array with the indices of the samples to keep.
+    """
+    n_samples = len(values)
+
+    if max_points is None or n_samples <= max_points:
+        return np.arange(n_samples)
+
+    # two samples per bucket, plus the first and the last sample of the signal
+    n_buckets = max((max_points - 2) // 2, 1)
+    bucket_size = -(-n_samples // n_buckets)
+    n_buckets = -(-n_samples // bucket_size)
+
+    # pad the signal with its last value, so that it can be reshaped in buckets of the same size
+    padded = np.pad(
+        np.asarray(values, dtype=float),
+        (0, n_buckets * bucket_size - n_samples),
+        mode="edge",
+    ).reshape(n_buckets, bucket_size)
+    missing = np.isnan(padded)
+
+    offsets = np.arange(n_buckets) * bucket_size
+    argmin = np.where(missing, np.inf, padded).argmin(axis=1) + offsets
+    argmax = np.where(missing, -np.inf, padded).argmax(axis=1) + offsets
+
+    indices = np.concatenate(([0], argmin, argmax, [n_samples - 1]))
+
+    return np.unique(np.minimum(indices, n_samples - 1))
+
+
+def window_indices(
+    time: np.ndarray,
+    values: np.ndarray,
+    max_points: int | None,
+    time_range: tuple[float, float],
+) -> np.ndarray:
+    """Select the indices of the samples to keep, with full detail in a time window.
+
+    The whole signal is decimated to `max_points`, so that an overview remains available (e.g. in a range slider),
+    and the samples inside the time window are decimated separately to `max_points`. When the window is short enough,
+    all its samples are kept.
+
+    Args:
+        time: the time axis of the signal
+        values: the values of the signal
+        max_points: maximum number of samples to keep, for the overview and for the window
+        time_range: first and last time point of the window
+
+    Returns:
+        A sorted array with the indices of the samples to keep.
+    """
+    overview = minmax_indices(values, max_points)
+
+    # include one sample outside each border, so that the plotted line reaches the edges of the window
+    start = max(np.searchsorted(time, time_range[0], side="left") - 1, 0)
+    stop = min(np.searchsorted(time, time_range[1], side="right") + 1, len(time))
+
+    if stop <= start:
+        return overview
+
+    window = minmax_indices(values[start:stop], max_points) + start
+
+    return np.union1d(overview, window)
+
+
+def downsample(
+    time: np.ndarray,
+    values: np.ndarray,
+    max_points: int | None,
+    time_range: tuple[float, float] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a signal to a maximum number of points for plotting, preserving its min/max envelope.
+
+    Args:
+        time: the time axis of the signal
+        values: the values of the signal
+        max_points: maximum number of points to keep. If None, the signal is returned unchanged
+        time_range: if provided, the samples between the first and the last time point are plotted
+            with full detail, up to `max_points` (see `window_indices`)
+
+    Returns:
+        A tuple with the decimated time axis and the decimated values.
+    """
+    if time_range is None:
+        indices = minmax_indices(values, max_points)
+    else:
+        indices = window_indices(np.asarray(time), values, max_points, time_range)
+
+    if len(indices) == len(values):
+        return time, values
+
+    return np.asarray(time)[indices], np.asarray(values)[indices]
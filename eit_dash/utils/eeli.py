@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING
+
+import numpy as np
+from scipy import signal
+
+from eit_dash.definitions.constants import (
+    EELI_RESULT,
+    FILTERED_EIT_LABEL,
+    MIN_BREATH_DURATION,
+    MIN_BREATH_PROMINENCE,
+    RAW_EIT_LABEL,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from eitprocessing.datahandling.sequence import Sequence
+
+    from eit_dash.utils.data_singleton import Period
+    from eit_dash.utils.results_store import ResultsStore
+
+
+def get_eeli_label(sequence: Sequence) -> str:
+    """Get the label of the signal used for the EELI: the filtered global impedance if available, the raw one if not.
+
+    Args:
+        sequence: the data of the period
+    """
+    return FILTERED_EIT_LABEL if FILTERED_EIT_LABEL in sequence.continuous_data else RAW_EIT_LABEL
+
+
+def detect_end_expirations(values: np.ndarray, sample_frequency: float) -> np.ndarray:
+    """Find the end-expirations of an impedance signal, i.e. the minimum of each breath.
+
+    Args:
+        values: the impedance signal
+        sample_frequency: sampling frequency of the signal, in Hz
+
+    Returns:
+        The sorted indices of the end-expirations.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.isfinite(values)
+
+    if not valid.any():
+        return np.array([], dtype=int)
+
+    low, high = np.percentile(values[valid], [5, 95])
+    # missing samples cannot be end-expirations
+    values = np.where(valid, values, high)
+
+    indices, _ = signal.find_peaks(
+        -values,
+        distance=max(int(MIN_BREATH_DURATION * sample_frequency), 1),
+        prominence=MIN_BREATH_PROMINENCE * (high - low),
+    )
+
+    return indices
+
+
+def compute_eeli(sequence: Sequence, label: str | None = None) -> dict:
+    """Compute the end-expiratory lung impedance (EELI) of a period.
+
+    Args:
+        sequence: the data of the period
+        label: label of the impedance signal. Defaults to the signal given by `get_eeli_label`
+
+    Returns:
+        A dictionary with the statistics of the EELI ("mean", "median" and "standard deviation"), the indices of the
+        end-expirations in the signal ("indices") and the impedance at each end-expiration ("values").
+    """
+    data = sequence.continuous_data[label or get_eeli_label(sequence)]
+
+    return compute_signal_eeli(data.values, sequence.eit_data["raw"].framerate)
+
+
+def compute_signal_eeli(signal_values: np.ndarray, sample_frequency: float) -> dict:
+    """Compute the end-expiratory lung impedance (EELI) of an impedance signal.
+
+    Args:
+        signal_values: the impedance signal
+        sample_frequency: sampling frequency of the signal, in Hz
+
+    Returns:
+        The EELI of the signal, see `compute_eeli`.
+    """
+    indices = detect_end_expirations(signal_values, sample_frequency)
+    values = np.asarray(signal_values, dtype=float)[indices]
+
+    return {
+        "mean": float(np.mean(values)) if len(values) else np.nan,
+        "median": float(np.median(values)) if len(values) else np.nan,
+        "standard deviation": float(np.std(values)) if len(values) else np.nan,
+        "indices": indices,
+        "values": values,
+    }
+
+
+def compute_signals_eeli(
+    signals: list[tuple[np.ndarray, float]],
+    max_workers: int | None = None,
+    progress: Callable[[dict, int, int], None] | None = None,
+) -> list[dict]:
+    """Compute the EELI of several impedance signals in parallel, in a pool of processes.
+
+    Only the signals are sent to the processes, not the whole periods with their images.
+
+    Args:
+        signals: the impedance signals, with their sampling frequency in Hz
+        max_workers: number of processes. Defaults to the number of processors
+        progress: function called when the EELI of a signal has been computed, with its result, the number of signals
+            done and the total number of signals
+
+    Returns:
+        The EELI of each signal (see `compute_eeli`), in the order of the signals.
+    """
+    results: dict[int, dict] = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(compute_signal_eeli, values, sample_frequency): n
+            for n, (values, sample_frequency) in enumerate(signals)
+        }
+
+        for future in as_completed(futures):
+            result = results[futures[future]] = future.result()
+            if progress is not None:
+                progress(result, len(results), len(signals))
+
+    return [results[n] for n in range(len(signals))]
+
+
+def get_eeli_inputs(period: Period) -> tuple[str, str]:
+    """Get the inputs of the EELI of a period: the label of the signal used and the parameters of its filter.
+
+    The EELI stored in the results of a period is not used after the period has been filtered with different settings,
+    because its inputs are different.
+
+    Args:
+        period: the stable period
+    """
+    data = period.get_data()
+    label = get_eeli_label(data)
+    parameters = data.continuous_data[label].parameters
+
+    return label, json.dumps(parameters, sort_keys=True, default=str)
+
+
+def get_period_eeli(period: Period, results: ResultsStore) -> dict:
+    """Get the EELI of a period, computing it only if it is not in the results.
+
+    Args:
+        period: the stable period
+        results: the results of the periods. The computed EELI is added to them
+
+    Returns:
+        The EELI of the period, see `compute_eeli`.
+    """
+    inputs = get_eeli_inputs(period)
+
+    if (result := results.get(period.get_period_index(), EELI_RESULT, inputs)) is None:
+        result = compute_eeli(period.get_data(), inputs[0])
+        results.set(period.get_period_index(), EELI_RESULT, result, inputs)
+
+    return result
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+from eitprocessing.datahandling.continuousdata import ContinuousData
+from eitprocessing.datahandling.eitdata import EITData
+from eitprocessing.filters.butterworth_filters import ButterworthFilter
+from scipy import signal
+
+from eit_dash.definitions.constants import (
+    FILTER_DESIGN_CACHE_SIZE,
+    FILTERED_EIT_LABEL,
+    FILTERED_PIXELS_LABEL,
+    PIXEL_FILTER_CHUNK_BYTES,
+    RAW_EIT_LABEL,
+)
+from eit_dash.definitions.option_lists import FilterTypes
+
+if TYPE_CHECKING:
+    from eitprocessing.datahandling.sequence import Sequence
+
+
+def get_selected_parameters(co_high, co_low, order, filter_selected) -> dict:
+    """Build the parameters dictionary for the filter.
+
+    Args:
+        co_high: cut off upper limit
+        co_low: cut off lower limit
+        order: filter order
+        filter_selected: value coming from the filter selection dropbox
+
+    Returns: dictionary containing parameters for the filter
+    """
+    if co_high is None:
+        cutoff_frequency = co_low
+    elif co_low is None:
+        cutoff_frequency = co_high
+    else:
+        cutoff_frequency = [co_low, co_high]
+
+    return {
+        "filter_type": FilterTypes(int(filter_selected)).name,
+        "cutoff_frequency": cutoff_frequency,
+        "order": order,
+    }
+
+
+def filter_data(data: Sequence, filter_params: dict) -> ContinuousData | None:
+    """Filter the impedance data in a period.
+
+    Args:
+        data: sequence containing the data
+        filter_params: parameters for the filter
+
+    Returns: the data with the filtered version added
+    """
+    filter_params["sample_frequency"] = data.eit_data.data["raw"].framerate
+
+    sos = design_filter(filter_params, filter_params["sample_frequency"])
+
+    return create_filtered_data(
+        data,
+        filter_params,
+        signal.sosfiltfilt(sos, data.continuous_data[RAW_EIT_LABEL].values),
+    )
+
+
+def filter_periods(
+    periods: list[Sequence],
+    filter_params: dict,
+    max_workers: int | None = None,
+) -> list[ContinuousData]:
+    """Filter the impedance data of several periods.
+
+    The filter is designed once for each sampling frequency. The periods with the same sampling frequency and length
+    are filtered together, along the rows of a single array, and the groups of periods are filtered in a pool of
+    threads (SciPy releases the GIL while filtering).
+
+    Args:
+        periods: sequences containing the data of the periods
+        filter_params: parameters for the filter, without the sampling frequency
+        max_workers: number of threads. Defaults to the number of processors
+
+    Returns: the filtered data of each period, in the order of the periods
+    """
+    groups: dict[tuple[float, int], list[int]] = {}
+    for n, data in enumerate(periods):
+        key = (data.eit_data.data["raw"].framerate, len(data.continuous_data[RAW_EIT_LABEL].time))
+        groups.setdefault(key, []).append(n)
+
+    sos = {sample_frequency: design_filter(filter_params, sample_frequency) for sample_frequency, _ in groups}
+
+    def filter_group(key: tuple[float, int]) -> np.ndarray:
+        values = np.stack([periods[n].continuous_data[RAW_EIT_LABEL].values for n in groups[key]])  # noqa: PD011
+        return signal.sosfiltfilt(sos[key[0]], values, axis=-1)
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if len(groups) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            filtered_values = dict(zip(groups, executor.map(filter_group, groups), strict=True))
+    else:
+        filtered_values = {key: filter_group(key) for key in groups}
+
+    results: list[ContinuousData | None] = [None] * len(periods)
+    for key, indices in groups.items():
+        for row, n in zip(filtered_values[key], indices, strict=True):
+            results[n] = create_filtered_data(periods[n], {**filter_params, "sample_frequency": key[0]}, row)
+
+    return results
+
+
+def filter_pixels(data: Sequence, filter_params: dict, max_workers: int | None = None) -> EITData:
+    """Filter the impedance of each pixel of a period.
+
+    The filter is applied along the time axis of the images. The pixels are filtered in chunks, to bound the memory
+    used by the filter, and the chunks are filtered in a pool of threads.
+
+    Args:
+        data: sequence containing the data
+        filter_params: parameters for the filter, without the sampling frequency
+        max_workers: number of threads. Defaults to the number of processors
+
+    Returns: the EIT data with the filtered impedance, labelled `FILTERED_PIXELS_LABEL`
+    """
+    eit_data = data.eit_data["raw"]
+    sos = design_filter(filter_params, eit_data.framerate)
+
+    n_frames = eit_data.pixel_impedance.shape[0]
+    # the pixels are the columns, so that each chunk is a range of columns
+    pixels = eit_data.pixel_impedance.reshape(n_frames, -1)
+    # the precision of the pixels is kept, e.g. when the datasets are stored in single precision
+    filtered = np.empty(pixels.shape, dtype=np.result_type(pixels, np.float32))
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # each chunk is at most PIXEL_FILTER_CHUNK_BYTES, and there is at least one chunk per thread
+    n_pixels = pixels.shape[1]
+    chunk_size = min(PIXEL_FILTER_CHUNK_BYTES // (n_frames * filtered.itemsize), -(-n_pixels // max_workers))
+    chunk_size = max(chunk_size, 1)
+    chunks = [slice(start, start + chunk_size) for start in range(0, n_pixels, chunk_size)]
+
+    def filter_chunk(chunk: slice) -> None:
+        filtered[:, chunk] = signal.sosfiltfilt(sos, pixels[:, chunk], axis=0)
+
+    if len(chunks) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # the results are consumed to raise the errors of the threads
+            list(executor.map(filter_chunk, chunks))
+    else:
+        for chunk in chunks:
+            filter_chunk(chunk)
+
+    return EITData(
+        vendor=eit_data.vendor,
+        path=eit_data.path,
+        framerate=eit_data.framerate,
+        nframes=eit_data.nframes,
+        time=eit_data.time,
+        label=FILTERED_PIXELS_LABEL,
+        name=f"pixel impedance filtered with {filter_params['filter_type']}",
+        pixel_impedance=filtered.reshape(eit_data.pixel_impedance.shape),
+    )
+
+
+def design_filter(filter_params: dict, sample_frequency: float) -> np.ndarray:
+    """Design a Butterworth filter, as done by `ButterworthFilter.apply_filter`.
+
+    The designed filters are cached, so that applying the same filter again (e.g. to other periods, or in another
+    session) only costs the filtering itself. The returned array is shared, so it must not be modified.
+
+    Args:
+        filter_params: parameters for the filter. A sampling frequency in the parameters is ignored
+        sample_frequency: sampling frequency of the data to be filtered
+
+    Raises:
+        TypeError, ValueError: if the parameters are not valid for a `ButterworthFilter`.
+
+    Returns: the second-order sections of the filter
+    """
+    cutoff_frequency = filter_params["cutoff_frequency"]
+    # the parameters are the key of the cache, so they must be hashable
+    if isinstance(cutoff_frequency, list):
+        cutoff_frequency = tuple(cutoff_frequency)
+
+    return _design_filter(filter_params["filter_type"], cutoff_frequency, filter_params["order"], sample_frequency)
+
+
+@functools.lru_cache(maxsize=FILTER_DESIGN_CACHE_SIZE)
+def _design_filter(
+    filter_type: str,
+    cutoff_frequency: float | tuple[float, float],
+    order: int,
+    sample_frequency: float,
+) -> np.ndarray:
+    # the parameters are checked by the filter
+    filt = ButterworthFilter(
+        filter_type=filter_type,
+        cutoff_frequency=cutoff_frequency,
+        order=order,
+        sample_frequency=sample_frequency,
+    )
+
+    return signal.butter(
+        N=filt.order,
+        Wn=filt.cutoff_frequency,
+        btype=filt.filter_type,
+        fs=filt.sample_frequency,
+        analog=False,
+        output="sos",
+    )
+
+
+def create_filtered_data(data: Sequence, filter_params: dict, values: np.ndarray) -> ContinuousData:
+    """Create the filtered version of the impedance data of a period.
+
+    Args:
+        data: sequence containing the data
+        filter_params: parameters of the filter, including the sampling frequency
+        values: the filtered values
+    """
+    gi = data.continuous_data[RAW_EIT_LABEL]
+
+    return ContinuousData(
+        FILTERED_EIT_LABEL,
+        f"global_impedance filtered with {filter_params['filter_type']}",
+        "a.u.",
+        "impedance",
+        derived_from=[*gi.derived_from, gi],
+        parameters=filter_params,
+        time=gi.time,
+        values=values,
+    )
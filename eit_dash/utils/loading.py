@@ -0,0 +1,507 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+from eitprocessing.datahandling.continuousdata import ContinuousData
+from eitprocessing.datahandling.eitdata import Vendor
+from eitprocessing.datahandling.event import Event
+from eitprocessing.datahandling.loading import load_eit_data
+from eitprocessing.datahandling.loading.draeger import _convert_medibus_data
+from eitprocessing.datahandling.sequence import Sequence
+from eitprocessing.datahandling.sparsedata import SparseData
+
+from eit_dash.definitions.constants import (
+    LOADING_CACHE_MAX_BYTES,
+    MIN_MAPPED_ARRAY_BYTES,
+    RAW_EIT_LABEL,
+    RECORDING_CACHE_MAX_BYTES,
+)
+from eit_dash.utils.session_store import get_memory_footprint
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# version of the format of the recording cache. Changing it makes the recordings saved with other versions unused
+RECORDING_CACHE_VERSION = 1
+
+# layout of a frame of a Draeger `.bin` file, as read by eitprocessing. The preview also uses the private conversion
+# of the Medibus data of eitprocessing, so eitprocessing is pinned, and the preview is compared with its loader in the
+# tests
+DRAEGER_FRAME = np.dtype(
+    [
+        ("time", "<f8"),
+        ("unused", "<f4"),
+        ("pixel_impedance", "<f4", (1024,)),
+        ("min_max_flag", "<i4"),
+        ("event_marker", "<i4"),
+        ("event_text", "S30"),
+        ("timing_error", "<i4"),
+        ("medibus_data", "<f4", (52,)),
+    ],
+)
+
+# number of frames whose images are read at once when computing the global impedance of a preview
+PREVIEW_CHUNK_FRAMES = 10_000
+
+
+class FileKey(NamedTuple):
+    """Identify the content of a file, to reuse the data loaded from it."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    vendor: str
+
+
+def get_file_key(path: str | Path, vendor: str) -> FileKey:
+    """Get the key identifying the content of a file.
+
+    A file modified after loading it gets a different key, so that it is loaded again.
+
+    Args:
+        path: path of the file
+        vendor: vendor of the device used for the recording, as a `Vendor` or as its value (e.g. "draeger")
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+    """
+    path = Path(path).resolve(strict=True)
+    stat = path.stat()
+
+    # the same file gets the same key whether the vendor is given as a `Vendor` or as its value: they are equal, but
+    # they have different representations, which are hashed by the recording cache
+    return FileKey(str(path), stat.st_size, stat.st_mtime_ns, str(vendor))
+
+
+def load_draeger_preview(path: Path, label: str = "selected data") -> Sequence:
+    """Read the data needed for previewing a Draeger file, without loading its images.
+
+    The file is mapped in memory, and the images are only read to compute the global impedance, a chunk of frames at a
+    time. The preview has the same continuous and sparse data as the complete recording, but no EIT data.
+
+    Args:
+        path: path of the file
+        label: label of the preview
+
+    Raises:
+        OSError: if the size of the file does not match the size of the Draeger frames.
+    """
+    if path.stat().st_size % DRAEGER_FRAME.itemsize:
+        msg = f"File size of {path!s} not divisible by {DRAEGER_FRAME.itemsize}. Make sure it is a valid Draeger file."
+        raise OSError(msg)
+
+    frames = np.memmap(path, dtype=DRAEGER_FRAME, mode="r")
+    time = np.round(frames["time"] * 24 * 60 * 60, 3)
+
+    global_impedance = np.empty(len(frames))
+    for start in range(0, len(frames), PREVIEW_CHUNK_FRAMES):
+        chunk = frames["pixel_impedance"][start : start + PREVIEW_CHUNK_FRAMES]
+        global_impedance[start : start + len(chunk)] = np.nansum(chunk, axis=1, dtype=np.float64)
+
+    continuous_data, sparse_data = _convert_medibus_data(frames["medibus_data"].T.astype(np.float64), time)
+    continuous_data.add(
+        ContinuousData(
+            label=RAW_EIT_LABEL,
+            name="Global impedance (raw)",
+            unit="a.u.",
+            category="impedance",
+            time=time,
+            values=global_impedance,
+        ),
+    )
+
+    min_max_flag = np.asarray(frames["min_max_flag"])
+    sparse_data.add(
+        SparseData(
+            label="minvalues_(draeger)",
+            name="Minimum values detected by Draeger device.",
+            unit=None,
+            category="minvalue",
+            time=time[min_max_flag == -1],
+        ),
+        SparseData(
+            label="maxvalues_(draeger)",
+            name="Maximum values detected by Draeger device.",
+            unit=None,
+            category="maxvalue",
+            time=time[min_max_flag == 1],
+        ),
+        SparseData(
+            label="events_(draeger)",
+            name="Events loaded from Draeger data",
+            unit=None,
+            category="event",
+            **get_draeger_events(frames, time),
+        ),
+    )
+
+    return Sequence(label=label, continuous_data=continuous_data, sparse_data=sparse_data)
+
+
+def get_draeger_events(frames: np.ndarray, time: NDArray) -> dict:
+    """Get the events of the frames of a Draeger file, i.e. the frames where the event marker increases.
+
+    Args:
+        frames: the frames of the file, with the `DRAEGER_FRAME` layout
+        time: the time of the frames
+
+    Returns:
+        The time and the values of the events, as arguments of `SparseData`.
+    """
+    markers = np.asarray(frames["event_marker"])
+    indices = np.flatnonzero(np.diff(markers) > 0) + 1
+
+    return {
+        "time": time[indices],
+        "values": [Event(int(markers[i]), frames["event_text"][i].decode().rstrip()) for i in indices],
+    }
+
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickler saving the large arrays in separate `.npy` files, which are referred to by their name."""
+
+    def __init__(self, file, directory: Path):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.names: dict[int, str] = {}
+
+    def persistent_id(self, obj) -> str | None:
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject or obj.nbytes < MIN_MAPPED_ARRAY_BYTES:
+            return None
+
+        # the same array can be used more than once (e.g. the time axis), but it is saved only once
+        if (name := self.names.get(id(obj))) is None:
+            name = self.names[id(obj)] = f"{len(self.names)}.npy"
+            np.save(self.directory / name, obj, allow_pickle=False)
+
+        return name
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    """Unpickler mapping in memory the arrays saved by `_ArrayPickler`."""
+
+    def __init__(self, file, directory: Path):
+        super().__init__(file)
+        self.directory = directory
+
+    def persistent_load(self, pid: str) -> np.ndarray:
+        return np.load(self.directory / Path(pid).name, mmap_mode="r", allow_pickle=False)
+
+
+class RecordingCache:
+    """Persistent cache of the data parsed from files, shared by all the processes and kept after a restart.
+
+    Each recording is saved in its own directory: the arrays (images, time axes, signals) as `.npy` files, and the rest
+    of the sequence pickled referring to them. Reading a recording from the cache maps its arrays in memory, so that
+    only the parts that are used are read from the disk, and they do not count in the memory of the process.
+
+    The least recently used recordings are removed when the recordings exceed `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = RECORDING_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def __contains__(self, key: FileKey) -> bool:
+        return (self._get_path(key) / "sequence.pkl").exists()
+
+    def _get_path(self, key: FileKey) -> Path:
+        digest = hashlib.sha256(repr((RECORDING_CACHE_VERSION, *key)).encode()).hexdigest()
+        return self.cache_dir / digest[:32]
+
+    def get(self, key: FileKey) -> Sequence | None:
+        """Read a recording from the cache, mapping its arrays in memory.
+
+        Args:
+            key: key of the file, from `get_file_key`
+
+        Returns:
+            The loaded data, or None if it is not in the cache.
+        """
+        path = self._get_path(key)
+
+        try:
+            with (path / "sequence.pkl").open("rb") as file:
+                data = _ArrayUnpickler(file, path).load()
+            # the modification time of the directory is used to find the least recently used recordings
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+
+        return data
+
+    def put(self, key: FileKey, data: Sequence) -> bool:
+        """Save a recording in the cache, removing the least recently used recordings if needed.
+
+        Args:
+            key: key of the file, from `get_file_key`
+            data: the loaded data
+
+        Returns:
+            Whether the recording has been saved. It is not saved if it is larger than the cache, or if the disk is
+            full.
+        """
+        path = self._get_path(key)
+
+        if path.exists():
+            return True
+
+        # write to a temporary directory first, so that the other processes never read a partially written recording
+        tmp_path = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-"))
+
+        try:
+            with (tmp_path / "sequence.pkl").open("wb") as file:
+                _ArrayPickler(file, tmp_path).dump(data)
+
+            if get_directory_size(tmp_path) > self.max_bytes:
+                return False
+
+            tmp_path.rename(path)
+        except OSError:
+            # the disk is full, or another process has saved the same recording in the meantime
+            return path.exists()
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        self.evict(keep=path)
+
+        return True
+
+    def evict(self, keep: Path | None = None) -> None:
+        """Remove the least recently used recordings until the size limit is respected.
+
+        Args:
+            keep: directory of a recording that is never removed (i.e. the one just saved)
+        """
+        paths = sorted(
+            (path for path in self.cache_dir.iterdir() if path.is_dir() and not path.name.startswith(".")),
+            key=lambda path: path.stat().st_mtime,
+        )
+        sizes = {path: get_directory_size(path) for path in paths}
+        total = sum(sizes.values())
+
+        for path in paths:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # on POSIX systems, the recordings still mapped by other processes remain readable after removal
+            shutil.rmtree(path, ignore_errors=True)
+            total -= sizes[path]
+
+
+def get_directory_size(path: Path) -> int:
+    """Get the number of bytes of the files in a directory.
+
+    Args:
+        path: path of the directory
+    """
+    return sum(file.stat().st_size for file in path.iterdir() if file.is_file())
+
+
+class LoadingCache:
+    """Cache of the data loaded from files, shared by all the sessions.
+
+    The least recently used data is removed when the data in the cache exceeds `max_bytes`. The loaded data is read
+    only, so the same sequence can be used by several sessions.
+
+    When a `RecordingCache` is given, the data that is not in memory is looked for in it before parsing the file, and
+    the parsed files are saved in it.
+
+    Attributes:
+        hits: number of lookups that found the data in the cache
+        misses: number of lookups that did not find the data in the cache
+    """
+
+    def __init__(self, max_bytes: int = LOADING_CACHE_MAX_BYTES, recording_cache: RecordingCache | None = None):
+        self.max_bytes = max_bytes
+        self.recording_cache = recording_cache
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[FileKey, Sequence] = OrderedDict()
+        self._nbytes: dict[FileKey, int] = {}
+        self._lock = RLock()
+
+    def __contains__(self, key: FileKey) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used by the data in the cache."""
+        with self._lock:
+            return sum(self._nbytes.values())
+
+    def get(self, key: FileKey) -> Sequence | None:
+        """Get the data loaded from a file, updating the hit and miss counters.
+
+        Args:
+            key: key of the file, from `get_file_key`
+
+        Returns:
+            The loaded data, or None if it is not in the cache.
+        """
+        with self._lock:
+            data = self.peek(key)
+
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+
+            return data
+
+    def peek(self, key: FileKey) -> Sequence | None:
+        """Get the data loaded from a file, without updating the counters and the order of use.
+
+        Args:
+            key: key of the file, from `get_file_key`
+        """
+        with self._lock:
+            return self._data.get(key)
+
+    def put(self, key: FileKey, data: Sequence) -> None:
+        """Add the data loaded from a file, removing the least recently used data if needed.
+
+        Data larger than the cache is not added.
+
+        Args:
+            key: key of the file, from `get_file_key`
+            data: the loaded data
+        """
+        nbytes = get_memory_footprint([data])
+
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            self._data[key] = data
+            self._data.move_to_end(key)
+            self._nbytes[key] = nbytes
+
+            while self.nbytes > self.max_bytes:
+                oldest, _ = self._data.popitem(last=False)
+                del self._nbytes[oldest]
+
+    def is_persisted(self, key: FileKey) -> bool:
+        """Check whether a file is in the recording cache, so that it can be read without parsing it.
+
+        Args:
+            key: key of the file, from `get_file_key`
+        """
+        return self.recording_cache is not None and key in self.recording_cache
+
+    def load_preview(self, path: str | Path, vendor: str) -> Sequence:
+        """Load the data needed for previewing a file: the time axis, the global impedance and the other signals.
+
+        The images of Draeger files are not loaded, unless the file is in the caches already. For the other vendors,
+        the complete data is loaded.
+
+        Args:
+            path: path of the file
+            vendor: vendor of the device used for the recording
+        """
+        key = get_file_key(path, vendor)
+
+        if key in self or self.is_persisted(key) or vendor != Vendor.DRAEGER:
+            return self.load(path, vendor)
+
+        return load_draeger_preview(Path(key.path))
+
+    def load_selection(
+        self,
+        path: str | Path,
+        vendor: str,
+        time: NDArray,
+        start_time: float,
+        end_time: float,
+    ) -> Sequence:
+        """Load the frames of a file between two time points, in the same way as `Sequence.select_by_time`.
+
+        If the file is in the caches, the selection is a view of the cached recording. Otherwise, only the frames in
+        the selection are read from the file, so that the memory needed scales with the selection.
+
+        Args:
+            path: path of the file
+            vendor: vendor of the device used for the recording
+            time: time axis of the file (e.g. from its preview), to find the frames of the selection
+            start_time: time of the first frame of the selection (included)
+            end_time: time of the end of the selection (excluded)
+        """
+        key = get_file_key(path, vendor)
+
+        if key in self or self.is_persisted(key):
+            return self.load(path, vendor).select_by_time(start_time, end_time)
+
+        # the same frames as `select_by_time`: from the last frame at or before the start, to the end (excluded)
+        first_frame = max(int(np.searchsorted(time, start_time, side="right")) - 1, 0)
+        end_frame = int(np.searchsorted(time, end_time))
+
+        if end_frame <= first_frame:
+            # the selection is empty. eitprocessing loads all the remaining frames when max_frames is 0, so a single
+            # frame is loaded, and selected in the same way as the cached recording
+            data = load_eit_data(
+                Path(key.path),
+                vendor=vendor,
+                label="selected data",
+                first_frame=first_frame,
+                max_frames=1,
+            )
+            return data.select_by_time(start_time, end_time, label="selected data")
+
+        return load_eit_data(
+            Path(key.path),
+            vendor=vendor,
+            label="selected data",
+            first_frame=first_frame,
+            max_frames=end_frame - first_frame,
+        )
+
+    def load(self, path: str | Path, vendor: str) -> Sequence:
+        """Load a file, or get its data from the caches if it has been loaded already.
+
+        Args:
+            path: path of the file
+            vendor: vendor of the device used for the recording
+        """
+        key = get_file_key(path, vendor)
+
+        if (data := self.get(key)) is not None:
+            return data
+
+        if self.recording_cache is not None:
+            data = self.recording_cache.get(key)
+
+        if data is None:
+            data = load_eit_data(Path(key.path), vendor=vendor, label="selected data")
+
+            # the parsed data is replaced by the saved one, which is mapped in memory instead of being kept in it
+            if self.recording_cache is not None and self.recording_cache.put(key, data):
+                saved_data = self.recording_cache.get(key)
+                data = data if saved_data is None else saved_data
+
+        self.put(key, data)
+
+        return data
+
+    def clear(self) -> None:
+        """Remove all the data and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._nbytes.clear()
+            self.hits = self.misses = 0
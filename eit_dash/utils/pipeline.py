@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from eit_dash.definitions.option_lists import FilterTypes
+from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.eeli import compute_eeli, get_eeli_label
+from eit_dash.utils.filtering import filter_periods, get_selected_parameters
+from eit_dash.utils.loading import LoadingCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from eit_dash.utils.loading import RecordingCache
+
+# columns of the summary of the results, with one row per period
+SUMMARY_COLUMNS = ["recording", "period", "start", "end", "signal", "breaths", "mean", "median", "standard deviation"]
+
+
+@dataclass
+class RecordingConfig:
+    """A recording to be analyzed by the pipeline.
+
+    Attributes:
+        path: path of the file
+        vendor: vendor of the device used for the recording
+        periods: start and end time of each stable period, in seconds, as shown in the dashboard
+    """
+
+    path: Path
+    vendor: str
+    periods: list[tuple[float, float]]
+
+
+@dataclass
+class PipelineConfig:
+    """Configuration of the pipeline.
+
+    Attributes:
+        recordings: the recordings to be analyzed
+        filter_params: parameters of the filter applied to the periods, as built by `get_selected_parameters`.
+            None if the periods are not filtered
+    """
+
+    recordings: list[RecordingConfig]
+    filter_params: dict | None = None
+
+
+@dataclass
+class RecordingResult:
+    """Results of the pipeline for a recording.
+
+    Attributes:
+        recording: the analyzed recording
+        periods: the EELI of each period (see `compute_eeli`), with the index, the start and the end of the period, the
+            label of the signal used and the time of the end-expirations ("times")
+        error: description of the error, if the recording could not be analyzed
+    """
+
+    recording: RecordingConfig
+    periods: list[dict] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        """Whether the recording could not be analyzed."""
+        return self.error is not None
+
+
+@dataclass
+class PipelineReport:
+    """Results of the pipeline for all the recordings.
+
+    Attributes:
+        recordings: the results of each recording, in the order of the configuration
+        filter_params: parameters of the filter applied to the periods
+        elapsed: duration of the pipeline in seconds
+    """
+
+    recordings: list[RecordingResult]
+    filter_params: dict | None
+    elapsed: float
+
+    @property
+    def failures(self) -> list[RecordingResult]:
+        """The recordings that could not be analyzed."""
+        return [result for result in self.recordings if result.failed]
+
+    def summary(self) -> str:
+        """Describe the results of the pipeline."""
+        analyzed = len(self.recordings) - len(self.failures)
+        periods = sum(len(result.periods) for result in self.recordings)
+        summary = (
+            f"{analyzed} of {len(self.recordings)} recordings analyzed in {self.elapsed:.1f} s ({periods} periods)"
+        )
+
+        for result in self.failures:
+            summary += f"\n{result.recording.path.name}: {result.error}"
+
+        return summary
+
+
+def read_config(path: str | Path) -> PipelineConfig:
+    """Read the configuration of the pipeline from a JSON file.
+
+    The file contains the recordings, with their vendor and the time ranges of their stable periods, and optionally the
+    filter, with the same parameters as in the dashboard:
+
+        {
+            "filter": {"type": "bandpass", "cutoff_low": 0.1, "cutoff_high": 1, "order": 4},
+            "recordings": [{"path": "patient_1.bin", "vendor": "draeger", "periods": [[10, 70], [300, 360]]}]
+        }
+
+    Relative paths are relative to the directory of the configuration file.
+
+    Args:
+        path: path of the configuration file
+
+    Raises:
+        ValueError: if the configuration is not valid.
+    """
+    path = Path(path)
+    config = json.loads(path.read_text())
+
+    try:
+        recordings = [
+            RecordingConfig(
+                path=path.parent / recording["path"],
+                vendor=recording["vendor"],
+                periods=[(float(start), float(end)) for start, end in recording["periods"]],
+            )
+            for recording in config["recordings"]
+        ]
+
+        filter_params = None
+        if (filter_config := config.get("filter")) is not None:
+            filter_params = get_selected_parameters(
+                filter_config.get("cutoff_high"),
+                filter_config.get("cutoff_low"),
+                filter_config["order"],
+                FilterTypes[filter_config["type"]].value,
+            )
+    except (KeyError, TypeError, ValueError) as e:
+        msg = f"Invalid pipeline configuration {path}: {type(e).__name__}: {e}"
+        raise ValueError(msg) from e
+
+    return PipelineConfig(recordings, filter_params)
+
+
+def run_recording(
+    recording: RecordingConfig,
+    filter_params: dict | None = None,
+    recording_cache: RecordingCache | None = None,
+) -> RecordingResult:
+    """Select the stable periods of a recording, filter them and compute their EELI.
+
+    The steps are the same as in the dashboard, so that the results are the same too. This runs in the processes of the
+    pool, so the errors are returned instead of being raised.
+
+    Args:
+        recording: the recording
+        filter_params: parameters of the filter. If None, the periods are not filtered
+        recording_cache: cache of the recordings, used to skip parsing the files that have already been imported
+    """
+    result = RecordingResult(recording)
+
+    try:
+        data_object = LoadedData()
+        data = LoadingCache(recording_cache=recording_cache).load(recording.path, recording.vendor)
+        data_object.add_sequence(data)
+
+        for start, end in recording.periods:
+            period_index = data_object.get_next_period_index()
+            cut_data = data.select_by_time(start_time=start, end_time=end, label=f"Period {period_index}")
+            data_object.add_stable_period(cut_data, 0)
+
+        periods = data_object.get_all_stable_periods()
+        if filter_params is not None:
+            filtered_data = filter_periods([period.get_data() for period in periods], filter_params)
+            for period, period_filtered_data in zip(periods, filtered_data, strict=True):
+                period.get_data().continuous_data.add(period_filtered_data, overwrite=True)
+
+        for (start, end), period in zip(recording.periods, periods, strict=True):
+            period_data = period.get_data()
+
+            label = get_eeli_label(period_data)
+            eeli = compute_eeli(period_data, label)
+            result.periods.append(
+                {
+                    "index": period.get_period_index(),
+                    "start": start,
+                    "end": end,
+                    "signal": label,
+                    **eeli,
+                    "times": period_data.continuous_data[label].time[eeli["indices"]],
+                },
+            )
+    # a recording that cannot be analyzed must not stop the analysis of the other recordings
+    except Exception as e:  # noqa: BLE001
+        result.error = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def run_pipeline(
+    config: PipelineConfig,
+    recording_cache: RecordingCache | None = None,
+    max_workers: int | None = None,
+    progress: Callable[[RecordingResult, int, int], None] | None = None,
+) -> PipelineReport:
+    """Analyze several recordings in parallel, in a pool of processes.
+
+    Args:
+        config: the configuration of the pipeline
+        recording_cache: cache of the recordings, see `run_recording`
+        max_workers: number of processes. Defaults to the number of processors
+        progress: function called when a recording has been analyzed, with its result, the number of recordings
+            analyzed and the total number of recordings
+
+    Returns:
+        The results, in the order of the recordings in the configuration.
+    """
+    start = time.perf_counter()
+    results: dict[int, RecordingResult] = {}
+    recordings = config.recordings
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_recording, recording, config.filter_params, recording_cache): n
+            for n, recording in enumerate(recordings)
+        }
+
+        for future in as_completed(futures):
+            n = futures[future]
+            try:
+                result = future.result()
+            # e.g. a worker process has been killed
+            except Exception as e:  # noqa: BLE001
+                result = RecordingResult(recordings[n], error=f"{type(e).__name__}: {e}")
+
+            results[n] = result
+            if progress is not None:
+                progress(result, len(results), len(recordings))
+
+    return PipelineReport(
+        [results[n] for n in range(len(recordings))],
+        config.filter_params,
+        time.perf_counter() - start,
+    )
+
+
+def write_results(report: PipelineReport, output_dir: str | Path) -> list[Path]:
+    """Write the results of the pipeline.
+
+    A summary of the EELI of all the periods is written to `eeli.csv`, and the end-expirations of the periods of each
+    recording are written to a JSON file named after the recording.
+
+    Args:
+        report: the results of the pipeline
+        output_dir: directory where the results are written
+
+    Returns:
+        The paths of the written files.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    summary_path = output_dir / "eeli.csv"
+    paths = [summary_path]
+    names: set[str] = set()
+
+    with summary_path.open("w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(SUMMARY_COLUMNS)
+
+        for result in report.recordings:
+            if result.failed:
+                continue
+
+            for period in result.periods:
+                writer.writerow(
+                    [
+                        result.recording.path,
+                        period["index"],
+                        period["start"],
+                        period["end"],
+                        period["signal"],
+                        len(period["indices"]),
+                        period["mean"],
+                        period["median"],
+                        period["standard deviation"],
+                    ],
+                )
+
+            # recordings with the same name in different directories get different file names
+            name = result.recording.path.stem
+            while name in names:
+                name += "_"
+            names.add(name)
+
+            path = output_dir / f"{name}.json"
+            path.write_text(json.dumps(get_recording_results(result, report.filter_params), indent=2))
+            paths.append(path)
+
+    return paths
+
+
+def get_recording_results(result: RecordingResult, filter_params: dict | None) -> dict:
+    """Convert the results of a recording to a dictionary that can be saved as JSON.
+
+    Args:
+        result: the results of the recording
+        filter_params: parameters of the filter applied to the periods
+    """
+    return {
+        "path": str(result.recording.path),
+        "vendor": result.recording.vendor,
+        "filter": filter_params,
+        "periods": [
+            {
+                "index": period["index"],
+                "start": period["start"],
+                "end": period["end"],
+                "signal": period["signal"],
+                "mean": period["mean"],
+                "median": period["median"],
+                "standard deviation": period["standard deviation"],
+                "end-expirations": {
+                    "time": period["times"].tolist(),
+                    "values": period["values"].tolist(),
+                },
+            }
+            for period in result.periods
+        ],
+    }
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import warnings
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from eit_dash.definitions.constants import FILTERED_PIXELS_LABEL, REGIONAL_RESULT
+from eit_dash.utils.eeli import get_eeli_inputs, get_period_eeli
+
+if TYPE_CHECKING:
+    from eitprocessing.datahandling.sequence import Sequence
+
+    from eit_dash.utils.data_singleton import Period
+    from eit_dash.utils.results_store import ResultsStore
+
+
+def get_pixels_label(sequence: Sequence) -> str:
+    """Get the label of the EIT data used for the regional analysis: the filtered pixels if available, else the raw.
+
+    Args:
+        sequence: the data of the period
+    """
+    return FILTERED_PIXELS_LABEL if FILTERED_PIXELS_LABEL in sequence.eit_data else "raw"
+
+
+def compute_regional_maps(pixel_impedance: np.ndarray, end_expirations: np.ndarray) -> dict:
+    """Compute the end-expiratory lung impedance (EELI) and the tidal variation of each pixel.
+
+    The breaths are delimited by the end-expirations of the global impedance. The EELI of a pixel is the mean of its
+    impedance at the end-expirations, and its tidal variation is the mean, over the breaths, of the difference between
+    its maximum during the breath and its impedance at the end-expiration starting the breath. All the breaths and the
+    pixels are computed together, with a single reduction over the frames.
+
+    Args:
+        pixel_impedance: the impedance of the pixels, with shape (frames, rows, columns)
+        end_expirations: the sorted indices of the end-expirations of the global impedance
+
+    Returns:
+        A dictionary with the map of the EELI ("eeli") and the map of the tidal variation ("tidal variation"), with
+        shape (rows, columns). The maps are NaN where they cannot be computed, e.g. the tidal variation if there are
+        less than two end-expirations.
+    """
+    end_expirations = np.asarray(end_expirations, dtype=int)
+    eeli = np.full(pixel_impedance.shape[1:], np.nan)
+    tidal_variation = np.full(pixel_impedance.shape[1:], np.nan)
+
+    # pixels without data give "mean of empty slice" warnings, and their maps are NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        if len(end_expirations):
+            eeli = np.nanmean(pixel_impedance[end_expirations], axis=0)
+
+        if len(end_expirations) > 1:
+            # maximum of each pixel during each breath, from an end-expiration to the next one
+            inspirations = np.fmax.reduceat(pixel_impedance[: end_expirations[-1]], end_expirations[:-1], axis=0)
+            tidal_variation = np.nanmean(inspirations - pixel_impedance[end_expirations[:-1]], axis=0)
+
+    return {"eeli": eeli, "tidal variation": tidal_variation}
+
+
+def get_period_regional_maps(period: Period, results: ResultsStore) -> dict:
+    """Get the regional maps of a period, computing them only if they are not in the results.
+
+    The end-expirations are those of the EELI of the period, which is computed too if needed.
+
+    Args:
+        period: the stable period
+        results: the results of the periods. The computed maps are added to them
+
+    Returns:
+        The maps of the period, see `compute_regional_maps`.
+    """
+    data = period.get_data()
+    pixels_label = get_pixels_label(data)
+    inputs = (*get_eeli_inputs(period), pixels_label)
+
+    if (maps := results.get(period.get_period_index(), REGIONAL_RESULT, inputs)) is None:
+        end_expirations = get_period_eeli(period, results)["indices"]
+        maps = compute_regional_maps(data.eit_data[pixels_label].pixel_impedance, end_expirations)
+        results.set(period.get_period_index(), REGIONAL_RESULT, maps, inputs)
+
+    return maps
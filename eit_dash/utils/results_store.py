@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from threading import RLock
+from typing import Any
+
+
+class ResultsStore:
+    """Results of the analysis of the stable periods of a session.
+
+    The results are indexed by period index and by name of the parameter (e.g. "eeli"), so that the result of a period
+    is looked up without scanning the results of the other periods. Each result is stored with the inputs it has been
+    computed from (e.g. the signal and its filter), and it is only returned for the same inputs.
+
+    The store is shared by the requests of the session, which can run in different threads, so it is protected by a
+    lock. The lock does not protect the store from the other worker processes, which get their own copy of the session:
+    the store must only be changed (by `set`, `remove_period` and `clear`, or by the `get_period_*` functions that
+    compute the missing results) within `SessionStore.edit`, so that the changes are saved without overwriting those of
+    the other workers.
+    """
+
+    def __init__(self):
+        self._results: dict[int, dict[str, tuple[Any, Any]]] = {}
+        self._lock = RLock()
+
+    def get(self, period_index: int, parameter: str, inputs: Any = None) -> Any:
+        """Get the result of a period.
+
+        Args:
+            period_index: index of the period
+            parameter: name of the parameter
+            inputs: the inputs the result must have been computed from
+
+        Returns:
+            The result, or None if it is not available for these inputs.
+        """
+        with self._lock:
+            stored_inputs, result = self._results.get(period_index, {}).get(parameter, (None, None))
+
+        return result if stored_inputs == inputs else None
+
+    def set(self, period_index: int, parameter: str, result: Any, inputs: Any = None) -> None:
+        """Store the result of a period, replacing the previous one.
+
+        Args:
+            period_index: index of the period
+            parameter: name of the parameter
+            result: the result
+            inputs: the inputs the result has been computed from
+        """
+        with self._lock:
+            self._results.setdefault(period_index, {})[parameter] = (inputs, result)
+
+    def get_period_results(self, period_index: int) -> dict[str, Any]:
+        """Get all the results of a period, by name of the parameter.
+
+        Args:
+            period_index: index of the period
+        """
+        with self._lock:
+            return {parameter: result for parameter, (_, result) in self._results.get(period_index, {}).items()}
+
+    def remove_period(self, period_index: int) -> None:
+        """Remove the results of a period, e.g. when the period is removed or filtered again.
+
+        Args:
+            period_index: index of the period
+        """
+        with self._lock:
+            self._results.pop(period_index, None)
+
+    def clear(self) -> None:
+        """Remove all the results."""
+        with self._lock:
+            self._results.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(results) for results in self._results.values())
+
+    def __getstate__(self) -> dict:
+        # the lock cannot be pickled, e.g. when the session is saved
+        with self._lock:
+            return {"_results": self._results}
+
+    def __setstate__(self, state: dict) -> None:
+        self._results = state["_results"]
+        self._lock = RLock()
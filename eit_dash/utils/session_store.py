@@ -0,0 +1,496 @@
+from __future__ import annotations
+
+import pickle
+import shutil
+import tempfile
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import RLock
+from typing import TYPE_CHECKING
+
+import numpy as np
+from dash.exceptions import PreventUpdate
+
+from eit_dash.definitions.constants import (
+    MIN_MAPPED_ARRAY_BYTES,
+    SESSION_EVICT_INTERVAL,
+    SESSION_IDLE_TIMEOUT,
+    SESSION_MAX_BYTES,
+)
+from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.results_store import ResultsStore
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows, where the sessions are not locked between processes
+    fcntl = None
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from eitprocessing.datahandling.sequence import Sequence
+
+# files of the arrays saved with a session, by id of the array. The reference checks that the id is still that array
+ArrayFiles = dict[int, tuple[weakref.ref, str]]
+
+
+@dataclass
+class SessionData:
+    """Data of a browser session.
+
+    Attributes:
+        loaded_data: the datasets and the stable periods selected in the session
+        file_data: the file currently previewed in the load page
+        tmp_results: the filtered periods, waiting to be confirmed
+        results: the results of the analysis of the stable periods
+        last_access: time of the last access to the session, from `time.monotonic`
+    """
+
+    loaded_data: LoadedData = field(default_factory=LoadedData)
+    file_data: Sequence | None = None
+    tmp_results: LoadedData = field(default_factory=LoadedData)
+    results: ResultsStore = field(default_factory=ResultsStore)
+    last_access: float = field(default_factory=time.monotonic)
+
+    def get_sequences(self) -> Iterator[Sequence]:
+        """Iterate over all the sequences kept in the session."""
+        if self.file_data is not None:
+            yield self.file_data
+
+        for data in (self.loaded_data, self.tmp_results):
+            yield from data.get_all_sequences()
+            for period in data.get_all_stable_periods():
+                yield period.get_data()
+
+    def get_memory_footprint(self) -> int:
+        """Get the number of bytes used by the arrays of the session.
+
+        Arrays sharing their memory (e.g. a period, which is a view of its dataset) are counted once.
+        """
+        return get_memory_footprint(self.get_sequences())
+
+
+def get_memory_footprint(sequences: Iterable[Sequence]) -> int:
+    """Get the number of bytes used by the arrays of some sequences.
+
+    Arrays sharing their memory (e.g. a period, which is a view of its dataset) are counted once.
+
+    Args:
+        sequences: the sequences
+    """
+    buffers = {}
+
+    for sequence in sequences:
+        for array in get_sequence_arrays(sequence):
+            base = array
+            while isinstance(base.base, np.ndarray):
+                base = base.base
+            buffers[id(base)] = base.nbytes
+
+    return sum(buffers.values())
+
+
+def get_sequence_arrays(sequence: Sequence) -> Iterator[np.ndarray]:
+    """Iterate over the arrays holding the data of a sequence.
+
+    Args:
+        sequence: the sequence
+    """
+    for eit_data in sequence.eit_data.values():
+        yield from (eit_data.time, eit_data.pixel_impedance)
+
+    for continuous_data in sequence.continuous_data.values():
+        yield from (continuous_data.time, continuous_data.values)  # noqa: PD011
+
+
+def get_file_version(path: Path) -> tuple[int, int, int]:
+    """Identify the version of a file, to detect when it has been replaced.
+
+    The modification time alone is not enough, as its resolution depends on the file system.
+
+    Args:
+        path: path of the file
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+    """
+    stat = path.stat()
+
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def get_modification_time(path: Path) -> float:
+    """Get the modification time of a file, or 0 if the file does not exist.
+
+    Args:
+        path: path of the file
+    """
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0
+
+
+class _SessionPickler(pickle.Pickler):
+    """Pickler saving the large arrays of a session in separate `.npy` files, which are referred to by their name.
+
+    The arrays already saved with the previous version of the session (or loaded from it) are not saved again, so that
+    only the arrays added since (e.g. a new dataset or a filtered signal) are written.
+    """
+
+    def __init__(self, file, directory: Path, saved: ArrayFiles):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.saved = saved
+        # files of the arrays referred to by this version of the session
+        self.files: ArrayFiles = {}
+
+    def persistent_id(self, obj) -> str | None:
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject or obj.nbytes < MIN_MAPPED_ARRAY_BYTES:
+            return None
+
+        if (entry := self.files.get(id(obj))) is None:
+            reference, name = self.saved.get(id(obj), (None, None))
+            # the id of an array that has been released can be reused by another array
+            if reference is None or reference() is not obj or not (self.directory / name).exists():
+                name = f"{uuid.uuid4().hex}.npy"
+                np.save(self.directory / name, obj, allow_pickle=False)
+            entry = self.files[id(obj)] = (weakref.ref(obj), name)
+
+        return entry[1]
+
+
+class _SessionUnpickler(pickle.Unpickler):
+    """Unpickler mapping in memory the arrays saved by `_SessionPickler`, keeping track of their files."""
+
+    def __init__(self, file, directory: Path):
+        super().__init__(file)
+        self.directory = directory
+        self.files: ArrayFiles = {}
+
+    def persistent_load(self, pid: str) -> np.ndarray:
+        array = np.load(self.directory / Path(pid).name, mmap_mode="r", allow_pickle=False)
+        self.files[id(array)] = (weakref.ref(array), pid)
+
+        return array
+
+
+class SessionStore:
+    """Server side store of the data of the browser sessions.
+
+    Each session is identified by an id, which is kept by the browser in a `dcc.Store`. Sessions that have not been
+    accessed for longer than `idle_timeout` are removed, and the least recently used sessions are removed when the
+    data of all the sessions exceeds `max_bytes`.
+
+    When a cache directory is set, the sessions are also saved in it, so that they can be shared by several worker
+    processes (e.g. when running with gunicorn). Each worker keeps its own copy of the sessions in memory, and reloads
+    a session from the cache when another worker has saved a newer version. The session files are only removed by the
+    idle timeout: the least recently used sessions are only removed from memory.
+
+    The large arrays of a saved session (e.g. the images of the datasets) are saved once, as `.npy` files that are
+    mapped in memory when loading the session, and only the rest of the session is pickled at each save. The sessions
+    are modified within `edit`, which locks them from loading to saving, so that the changes made at the same time by
+    several processes are not lost.
+
+    When `compact` is True, the datasets added to the sessions are stored in single precision, to use about half of
+    the memory (see `compact_sequence`).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = SESSION_MAX_BYTES,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        cache_dir: str | Path | None = None,
+        compact: bool = False,
+        evict_interval: float = SESSION_EVICT_INTERVAL,
+    ):
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self.cache_dir = cache_dir
+        self.compact = compact
+        self.evict_interval = evict_interval
+        self._sessions: OrderedDict[str, SessionData] = OrderedDict()
+        # version of the file in the cache of the sessions kept in memory (see `get_file_version`)
+        self._versions: dict[str, tuple[int, int, int]] = {}
+        # files of the arrays of the version in the cache of the sessions kept in memory
+        self._array_files: dict[str, ArrayFiles] = {}
+        self._last_eviction = -float("inf")
+        self._lock = RLock()
+
+    @property
+    def cache_dir(self) -> Path | None:
+        """Directory where the sessions are saved, to be shared by several processes. None if not shared."""
+        return self._cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, cache_dir: str | Path | None) -> None:
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+
+        if self._cache_dir is not None:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def new_session_id() -> str:
+        """Generate the id of a new session."""
+        return uuid.uuid4().hex
+
+    def get(self, session_id: str | None) -> SessionData:
+        """Get the data of a session, creating an empty session if it does not exist (e.g. after eviction).
+
+        To modify the session, use `edit` instead.
+
+        Args:
+            session_id: id of the session
+
+        Raises:
+            PreventUpdate: if the session id is not available yet.
+        """
+        if not session_id:
+            raise PreventUpdate
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+
+            if self.cache_dir is not None:
+                session = self._load(session_id) or session
+                path = self._get_path(session_id)
+                # the access time is shared by the processes through a separate file, so that accessing a session
+                # does not make the other processes reload it. Sessions that have never been saved have no files
+                if path.exists():
+                    path.with_suffix(".access").touch()
+
+            if session is None:
+                session = self._sessions[session_id] = SessionData()
+            else:
+                self._sessions[session_id] = session
+                self._sessions.move_to_end(session_id)
+
+            session.last_access = time.monotonic()
+
+            if session.last_access - self._last_eviction >= self.evict_interval:
+                self._last_eviction = session.last_access
+                self.evict(keep=session_id)
+
+            return session
+
+    @contextmanager
+    def edit(self, session_id: str | None) -> Iterator[SessionData]:
+        """Get the data of a session to modify it, and save it afterwards (see `save`).
+
+        When a cache directory is set, the session is locked for the other processes and threads from its loading to
+        its saving, so that the changes they make at the same time are not lost. The session is not saved if an
+        exception is raised (e.g. `PreventUpdate`).
+
+        Args:
+            session_id: id of the session
+
+        Raises:
+            PreventUpdate: if the session id is not available yet.
+        """
+        if not session_id:
+            raise PreventUpdate
+
+        with self._lock_session(session_id):
+            session = self.get(session_id)
+            yield session
+            self.save(session_id)
+
+    def save(self, session_id: str) -> None:
+        """Save a session in the cache directory, so that the changes are visible to the other processes.
+
+        This has to be called after modifying the data of a session, which is done by `edit`. Nothing is done if no
+        cache directory is set.
+
+        Args:
+            session_id: id of the session
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+
+            if self.cache_dir is None or session is None:
+                return
+
+            path = self._get_path(session_id)
+            directory = path.with_suffix(".arrays")
+            directory.mkdir(exist_ok=True)
+            previous_files = self._array_files.get(session_id, {})
+
+            # write to a temporary file first, so that the other processes never read a partially written session
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as file:
+                pickler = _SessionPickler(file, directory, previous_files)
+                pickler.dump(session)
+            Path(file.name).replace(path)
+
+            # the arrays of the previous version are kept, as another process may be loading it
+            names = {name for _, name in (*previous_files.values(), *pickler.files.values())}
+            for array_path in directory.iterdir():
+                if array_path.name not in names:
+                    array_path.unlink(missing_ok=True)
+
+            self._versions[session_id] = get_file_version(path)
+            self._array_files[session_id] = pickler.files
+
+    def remove(self, session_id: str) -> None:
+        """Remove a session and its data.
+
+        Args:
+            session_id: id of the session
+        """
+        with self._lock:
+            self._forget(session_id)
+
+            if self.cache_dir is not None:
+                path = self._get_path(session_id)
+                path.unlink(missing_ok=True)
+                shutil.rmtree(path.with_suffix(".arrays"), ignore_errors=True)
+                for suffix in (".access", ".lock"):
+                    path.with_suffix(suffix).unlink(missing_ok=True)
+
+    def _forget(self, session_id: str) -> None:
+        """Remove a session from memory only."""
+        self._sessions.pop(session_id, None)
+        self._versions.pop(session_id, None)
+        self._array_files.pop(session_id, None)
+
+    def _get_path(self, session_id: str) -> Path:
+        # the session id comes from the browser, so only its name is used to build the path
+        return self.cache_dir / f"{Path(session_id).name}.pkl"
+
+    @contextmanager
+    def _lock_session(self, session_id: str) -> Iterator[None]:
+        """Lock a session for the other processes and threads, with a lock file in the cache directory.
+
+        Args:
+            session_id: id of the session
+        """
+        if self.cache_dir is None or fcntl is None:
+            yield
+            return
+
+        # each lock opens the file again, so that it also excludes the other threads of this process
+        with self._get_path(session_id).with_suffix(".lock").open("a") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            # closing the file releases the lock
+            yield
+
+    def _load(self, session_id: str) -> SessionData | None:
+        """Load a session from the cache directory, if it has been saved by another process since the last access.
+
+        Args:
+            session_id: id of the session
+
+        Returns:
+            The session saved in the cache, or None if the session in memory is up to date or it has not been saved.
+        """
+        path = self._get_path(session_id)
+
+        try:
+            version = get_file_version(path)
+        except FileNotFoundError:
+            return None
+
+        if session_id in self._sessions and self._versions.get(session_id) == version:
+            return None
+
+        try:
+            with path.open("rb") as file:
+                unpickler = _SessionUnpickler(file, path.with_suffix(".arrays"))
+                session = unpickler.load()
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+
+        self._versions[session_id] = version
+        self._array_files[session_id] = unpickler.files
+
+        return session
+
+    def get_session_ids(self) -> list[str]:
+        """Get the ids of the sessions, from the least to the most recently used."""
+        with self._lock:
+            return list(self._sessions)
+
+    def get_memory_footprint(self) -> int:
+        """Get the number of bytes used by the data of all the sessions."""
+        with self._lock:
+            return sum(session.get_memory_footprint() for session in self._sessions.values())
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """Remove the idle sessions, then the least recently used ones until the memory limit is respected.
+
+        This is done when accessing a session, at most every `evict_interval` seconds.
+
+        Args:
+            keep: id of a session that is never evicted (i.e. the one being accessed)
+
+        Returns:
+            The ids of the removed sessions.
+        """
+        with self._lock:
+            now = time.monotonic()
+            evicted = [
+                session_id
+                for session_id, session in self._sessions.items()
+                if session_id != keep and now - session.last_access > self.idle_timeout
+            ]
+            for session_id in evicted:
+                if self.cache_dir is None:
+                    self.remove(session_id)
+                else:
+                    # the session may still be used by another process. Its file is removed by `_evict_cache`
+                    self._forget(session_id)
+
+            if self.cache_dir is not None:
+                evicted += [session_id for session_id in self._evict_cache(keep) if session_id not in evicted]
+
+            footprints = {session_id: session.get_memory_footprint() for session_id, session in self._sessions.items()}
+            total = sum(footprints.values())
+
+            for session_id, footprint in footprints.items():
+                if total <= self.max_bytes:
+                    break
+                if session_id == keep:
+                    continue
+                # the session is only removed from memory, it can be reloaded from the cache if needed
+                self._forget(session_id)
+                evicted.append(session_id)
+                total -= footprint
+
+            return evicted
+
+    def _evict_cache(self, keep: str | None = None) -> list[str]:
+        """Remove the files of the sessions idle for longer than the idle timeout from the cache directory.
+
+        The files left without a saved session (e.g. the lock of a session removed by another process) are removed
+        once they are idle too.
+
+        Args:
+            keep: id of a session that is never evicted
+
+        Returns:
+            The ids of the removed sessions.
+        """
+        now = time.time()
+        evicted = []
+
+        for path in self.cache_dir.glob("*.pkl"):
+            last_access = max(get_modification_time(path), get_modification_time(path.with_suffix(".access")))
+            if path.stem != keep and now - last_access > self.idle_timeout:
+                self.remove(path.stem)
+                evicted.append(path.stem)
+
+        for suffix in (".access", ".lock", ".arrays"):
+            for path in self.cache_dir.glob(f"*{suffix}"):
+                if (
+                    path.stem != keep
+                    and not path.with_suffix(".pkl").exists()
+                    and now - get_modification_time(path) > self.idle_timeout
+                ):
+                    self.remove(path.stem)
+
+        return evicted
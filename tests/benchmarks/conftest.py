@@ -0,0 +1,18 @@
+import pytest
+
+# measurements reported by the benchmarks, printed at the end of the session
+REPORT_KEY = pytest.StashKey[list[str]]()
+
+
+@pytest.fixture()
+def report(request: pytest.FixtureRequest):
+    """Add lines to the measurements printed in the summary of the session."""
+    lines = request.config.stash.setdefault(REPORT_KEY, [])
+    return lambda line: lines.append(f"{request.node.name}: {line}")
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter, config: pytest.Config) -> None:
+    if lines := config.stash.get(REPORT_KEY, []):
+        terminalreporter.section("benchmarks")
+        for line in lines:
+            terminalreporter.write_line(line)
@@ -0,0 +1,43 @@
+import gc
+import time
+
+import pytest
+
+from eit_dash.utils.common import create_slider_figure
+from tests.conftest import create_sequence
+
+pytestmark = pytest.mark.benchmark
+
+# two hours of recording at 50 Hz
+N_FRAMES = 2 * 60 * 60 * 50
+FRAMERATE = 50
+
+
+def render_figure(sequence, max_points):
+    """Build the slider figure and serialize it as it is sent to the browser.
+
+    Returns: the size of the payload in bytes and the time needed to create it.
+    """
+    # a garbage collection of the objects left by the other tests would be counted in the time of the figure
+    gc.collect()
+
+    start = time.perf_counter()
+    figure = create_slider_figure(sequence, continuous_data=list(sequence.continuous_data), max_points=max_points)
+    payload = figure.to_json()
+    elapsed = time.perf_counter() - start
+
+    return len(payload), elapsed
+
+
+def test_slider_figure_payload(report):
+    """Compare the payload size and the render time of the full resolution and of the decimated slider figure."""
+    sequence = create_sequence(N_FRAMES, FRAMERATE, pixels=2)
+
+    full_size, full_time = render_figure(sequence, None)
+    size, elapsed = render_figure(sequence, 4000)
+
+    report(f"full resolution: {full_size / 1e6:.1f} MB in {full_time:.3f} s")
+    report(f"decimated: {size / 1e6:.3f} MB in {elapsed:.3f} s")
+
+    assert size * 50 < full_size
+    assert elapsed < full_time
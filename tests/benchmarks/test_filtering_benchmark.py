@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from eit_dash.utils.filtering import filter_data, filter_periods
+from tests.conftest import create_sequence
+
+pytestmark = pytest.mark.benchmark
+
+FILTER_PARAMS = {"filter_type": "bandpass", "cutoff_frequency": [0.1, 1], "order": 4}
+# periods of one minute at 50 Hz, as selected from a day long recording
+FRAMERATE = 50
+PERIOD_DURATION = 60
+N_PERIODS = [10, 100, 1000]
+N_LENGTHS = 50
+
+
+def test_filter_periods_scaling(report):
+    """Compare the time needed to filter the periods one by one and together, with the number of periods."""
+    # periods selected by hand have different lengths, so they are not all filtered in the same array
+    lengths = [
+        create_sequence(n_frames=PERIOD_DURATION * FRAMERATE + n, framerate=FRAMERATE, pixels=1)
+        for n in range(N_LENGTHS)
+    ]
+    # warm up, so that the first measurement does not include the loading of the modules of SciPy
+    filter_periods(lengths, FILTER_PARAMS)
+
+    for n_periods in N_PERIODS:
+        periods = [lengths[n % N_LENGTHS] for n in range(n_periods)]
+
+        start = time.perf_counter()
+        for period in periods:
+            filter_data(period, dict(FILTER_PARAMS))
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        filter_periods(periods, FILTER_PARAMS)
+        batched_time = time.perf_counter() - start
+
+        report(f"{n_periods} periods: {serial_time:.3f} s one by one, {batched_time:.3f} s together")
+
+    # with many periods, most of them have the same length as another one
+    assert batched_time * 2 < serial_time
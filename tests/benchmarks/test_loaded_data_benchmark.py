@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from eit_dash.utils.data_singleton import LoadedData
+from tests.conftest import create_sequence
+
+pytestmark = pytest.mark.benchmark
+
+N_DATASETS = 500
+N_PERIODS = 10_000
+N_LOOKUPS = 1000
+
+
+def fill(n_datasets: int, n_periods: int) -> LoadedData:
+    """Create a data object with the given number of datasets and periods, with small sequences."""
+    data_object = LoadedData()
+
+    for _ in range(n_datasets):
+        data_object.add_sequence(create_sequence(n_frames=10, pixels=2, label=data_object.get_next_dataset_label()))
+
+    period = create_sequence(n_frames=10, pixels=2, label="period")
+    for i in range(n_periods):
+        data_object.add_stable_period(period, i % n_datasets, i)
+
+    return data_object
+
+
+def time_lookups(data_object: LoadedData, n_periods: int) -> float:
+    """Time the lookups done by the callbacks, returning the time per lookup in seconds."""
+    start = time.perf_counter()
+
+    for i in range(N_LOOKUPS):
+        index = (i * 7919) % n_periods
+        data_object.get_stable_period(index)
+        data_object.get_dataset_stable_periods(index % N_DATASETS)
+        data_object.get_next_dataset_label()
+
+    return (time.perf_counter() - start) / N_LOOKUPS
+
+
+def test_loaded_data_scaling(report):
+    """Test that the lookups do not slow down with the number of periods."""
+    start = time.perf_counter()
+    data_object = fill(N_DATASETS, N_PERIODS)
+    fill_time = time.perf_counter() - start
+
+    small = time_lookups(fill(N_DATASETS, N_PERIODS // 10), N_PERIODS // 10)
+    large = time_lookups(data_object, N_PERIODS)
+
+    start = time.perf_counter()
+    for index in range(0, N_PERIODS, 2):
+        data_object.remove_stable_period(index)
+    remove_time = time.perf_counter() - start
+
+    report(f"filling with {N_PERIODS} periods: {fill_time:.3f} s")
+    report(f"lookups: {small * 1e6:.1f} us with {N_PERIODS // 10} periods, {large * 1e6:.1f} us with {N_PERIODS}")
+    report(f"removing {N_PERIODS // 2} periods: {remove_time:.3f} s")
+
+    assert data_object.get_stable_periods_list_length() == N_PERIODS // 2
+    assert large < 5 * small
+    assert remove_time < 1
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import gc
+import time
+import tracemalloc
+
+import pytest
+
+from eit_dash.utils.data_singleton import compact_sequence
+from eit_dash.utils.session_store import SessionData
+from tests.conftest import create_sequence
+
+pytestmark = pytest.mark.benchmark
+
+# five minutes of recording at 50 Hz, with 32x32 pixels
+N_FRAMES = 5 * 60 * 50
+FRAMERATE = 50
+N_PERIODS = 10
+
+
+def create_session(compact: bool) -> SessionData:
+    """Create a session with a dataset and its stable periods, stored in double or in single precision."""
+    session = SessionData()
+    dataset = create_sequence(N_FRAMES, FRAMERATE, label="Dataset 0")
+    if compact:
+        dataset = compact_sequence(dataset)
+    session.loaded_data.add_sequence(dataset)
+
+    duration = N_FRAMES / FRAMERATE / N_PERIODS
+    for i in range(N_PERIODS):
+        period = dataset.select_by_time(i * duration, (i + 1) * duration, label=f"Period {i}")
+        session.loaded_data.add_stable_period(period, 0, i)
+
+    return session
+
+
+def measure_session(compact: bool) -> tuple[int, int, float]:
+    """Create a session and measure the memory allocated for it.
+
+    Returns: the memory still used by the session once it is created, the peak memory used to create it, and the
+        time needed to create it.
+    """
+    # the objects left by the other tests would be counted in the memory of the session
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        session = create_session(compact)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        used, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # the memory used by the process is that of the arrays of the session, i.e. the periods do not copy them
+    assert used < session.get_memory_footprint() * 1.05
+
+    return used, peak, elapsed
+
+
+def test_compact_storage_memory(report):
+    """Compare the memory used by the process for a dataset and its periods, in double and in single precision."""
+    used, peak, elapsed = measure_session(compact=False)
+    report(f"double precision: {used / 1e6:.1f} MB used, {peak / 1e6:.1f} MB peak, created in {elapsed:.2f} s")
+
+    compact_used, compact_peak, elapsed = measure_session(compact=True)
+    report(
+        f"single precision: {compact_used / 1e6:.1f} MB used, {compact_peak / 1e6:.1f} MB peak, "
+        f"created in {elapsed:.2f} s",
+    )
+
+    # only the time axes are kept in double precision. The dataset is converted after it is loaded, so the peak
+    # includes its double precision copy
+    assert compact_used < used * 0.55
@@ -1,8 +1,16 @@
 import os
 from pathlib import Path
 
+import numpy as np
 import pytest
+from eitprocessing.datahandling.continuousdata import ContinuousData
+from eitprocessing.datahandling.datacollection import DataCollection
+from eitprocessing.datahandling.eitdata import EITData, Vendor
 from eitprocessing.datahandling.loading import load_eit_data
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.definitions.constants import RAW_EIT_LABEL
+from eit_dash.utils.session_store import SessionStore
 
 environment = os.environ.get(
     "TEST_DATA",
@@ -12,6 +20,8 @@ environment = os.environ.get(
 data_directory = Path(environment) / "tests" / "test_data"
 data_path = Path(data_directory) / "Draeger_Test3.bin"
 
+SESSION_ID = "test-session"
+
 
 @pytest.fixture(scope="session")
 def file_data():
@@ -20,3 +30,72 @@ def file_data():
         vendor="draeger",
         label="selected data",
     )
+
+
+def create_sequence(
+    n_frames: int = 2000,
+    framerate: float = 20,
+    pixels: int = 32,
+    label: str = "synthetic data",
+) -> Sequence:
+    """Create a sequence with a synthetic breathing signal, to be used when no recording is needed.
+
+    Args:
+        n_frames: number of frames of the sequence
+        framerate: sampling frequency of the sequence
+        pixels: number of pixels of each side of the EIT images
+        label: label of the sequence
+    """
+    rng = np.random.default_rng(0)
+    time = np.arange(n_frames) / framerate
+
+    # breaths of 4 seconds, with a different amplitude in each pixel
+    breathing = np.sin(2 * np.pi * 0.25 * time)
+    amplitude = rng.uniform(0.5, 1.5, (pixels, pixels))
+    pixel_impedance = breathing[:, None, None] * amplitude + rng.normal(0, 0.05, (n_frames, pixels, pixels))
+
+    eit_data = EITData(
+        vendor=Vendor.DRAEGER,
+        path="synthetic.bin",
+        framerate=framerate,
+        nframes=n_frames,
+        time=time,
+        label="raw",
+        pixel_impedance=pixel_impedance,
+    )
+    sequence = Sequence(label=label, eit_data=DataCollection(EITData, raw=eit_data))
+    sequence.continuous_data.add(
+        ContinuousData(
+            label="airway pressure",
+            name="airway pressure",
+            unit="mbar",
+            category="airway pressure",
+            time=time,
+            values=10 + 5 * breathing,
+        ),
+        ContinuousData(
+            label=RAW_EIT_LABEL,
+            name="Global impedance (raw)",
+            unit="a.u.",
+            category="impedance",
+            derived_from=[eit_data],
+            time=time,
+            values=eit_data.calculate_global_impedance(),
+        ),
+    )
+
+    return sequence
+
+
+@pytest.fixture(scope="session")
+def synthetic_data():
+    return create_sequence()
+
+
+@pytest.fixture()
+def session_store():
+    """Store of the sessions data, containing an empty session with id `SESSION_ID`."""
+    store = SessionStore()
+    store.get(SESSION_ID)
+
+    return store
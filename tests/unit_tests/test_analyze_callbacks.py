@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+import diskcache
+import pytest
+from dash.exceptions import PreventUpdate
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.callbacks.analyze_callbacks import (
+    apply_eeli,
+    compute_eeli_job,
+    show_eeli,
+    show_regional_maps,
+    store_eeli,
+)
+from eit_dash.definitions.constants import EELI_RESULT, REGIONAL_RESULT
+from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.eeli import get_eeli_inputs
+from eit_dash.utils.regional import get_pixels_label
+from eit_dash.utils.session_store import SessionStore
+from tests.conftest import SESSION_ID
+
+
+@pytest.fixture()
+def job_cache(tmp_path):
+    """Cache shared with the background jobs."""
+    with diskcache.Cache(tmp_path) as cache:
+        yield cache
+
+
+@pytest.fixture()
+def periods_data_object(synthetic_data: Sequence):
+    """Data object with a synthetic dataset and two stable periods."""
+    data_object = LoadedData()
+    data_object.add_sequence(synthetic_data)
+    data_object.add_stable_period(synthetic_data.select_by_time(10, 40, label="Period 0"), 0, 0)
+    data_object.add_stable_period(synthetic_data.select_by_time(40, 70, label="Period 1"), 0, 1)
+
+    return data_object
+
+
+def test_store_eeli_reused_index(
+    periods_data_object: LoadedData,
+    session_store: SessionStore,
+    job_cache: diskcache.Cache,
+    synthetic_data: Sequence,
+):
+    """Test that the EELI computed for a period is not stored for another period added with the same index."""
+    session = session_store.get(SESSION_ID)
+    session.loaded_data = periods_data_object
+
+    with patch("eit_dash.callbacks.analyze_callbacks.session_store", new=session_store), patch(
+        "eit_dash.callbacks.analyze_callbacks.job_cache",
+        new=job_cache,
+    ):
+        _, request = apply_eeli(1, SESSION_ID)
+        computed = compute_eeli_job(lambda _: None, request, SESSION_ID)
+
+        # while the job is running, the data is loaded again and another period gets index 1
+        periods_data_object.remove_stable_period(1)
+        periods_data_object.add_stable_period(synthetic_data.select_by_time(70, 90, label="Period 1"), 0, 1)
+
+        hidden = store_eeli(computed, SESSION_ID)
+
+    first, second = (periods_data_object.get_stable_period(index) for index in (0, 1))
+
+    assert hidden is False
+    assert session.results.get(0, EELI_RESULT, get_eeli_inputs(first)) is not None
+    assert session.results.get(1, EELI_RESULT, get_eeli_inputs(second)) is None
+
+
+def test_show_eeli_saves_result(periods_data_object: LoadedData, tmp_path):
+    """Test that the EELI computed to show a period is saved, so that it is found by the other workers."""
+    shown_by, other = SessionStore(cache_dir=tmp_path), SessionStore(cache_dir=tmp_path)
+    session_id = shown_by.new_session_id()
+    with shown_by.edit(session_id) as session:
+        session.loaded_data = periods_data_object
+
+    with patch("eit_dash.callbacks.analyze_callbacks.session_store", new=shown_by):
+        show_eeli("0", session_id)
+
+    period = other.get(session_id).loaded_data.get_stable_period(0)
+
+    assert other.get(session_id).results.get(0, EELI_RESULT, get_eeli_inputs(period)) is not None
+
+
+def test_show_eeli_cleared_selection(session_store: SessionStore):
+    """Test that nothing is shown when the selection of the period is cleared."""
+    with patch("eit_dash.callbacks.analyze_callbacks.session_store", new=session_store), pytest.raises(PreventUpdate):
+        show_eeli(None, SESSION_ID)
+
+
+def test_show_regional_maps_saves_result(periods_data_object: LoadedData, tmp_path):
+    """Test that the regional maps computed to show a period are saved, so that they are found by the other workers."""
+    shown_by, other = SessionStore(cache_dir=tmp_path), SessionStore(cache_dir=tmp_path)
+    session_id = shown_by.new_session_id()
+    with shown_by.edit(session_id) as session:
+        session.loaded_data = periods_data_object
+
+    with patch("eit_dash.callbacks.analyze_callbacks.session_store", new=shown_by):
+        show_regional_maps("1", session_id)
+
+    period = other.get(session_id).loaded_data.get_stable_period(1)
+
+    inputs = (*get_eeli_inputs(period), get_pixels_label(period.get_data()))
+
+    assert other.get(session_id).results.get(1, REGIONAL_RESULT, inputs) is not None
+
+
+def test_show_regional_maps_cleared_selection(session_store: SessionStore):
+    """Test that no maps are shown when the selection of the period is cleared."""
+    with patch("eit_dash.callbacks.analyze_callbacks.session_store", new=session_store), pytest.raises(PreventUpdate):
+        show_regional_maps(None, SESSION_ID)
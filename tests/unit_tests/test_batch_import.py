@@ -0,0 +1,102 @@
+import shutil
+from unittest.mock import patch
+
+import diskcache
+import numpy as np
+import pytest
+from eitprocessing.datahandling.loading import load_eit_data
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.callbacks.load_callbacks import register_imported_files
+from eit_dash.utils.batch_import import find_recordings, import_file, import_files, register_datasets
+from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.loading import LoadingCache, RecordingCache, get_file_key
+from eit_dash.utils.session_store import SessionStore
+from tests.conftest import SESSION_ID, data_path
+
+
+@pytest.fixture()
+def directory(tmp_path):
+    """Directory with two recordings, a corrupted one and a file that is not a recording."""
+    directory = tmp_path / "study"
+    directory.mkdir()
+
+    for name in ("first.bin", "second.bin"):
+        shutil.copy(data_path, directory / name)
+    (directory / "corrupted.bin").write_bytes(data_path.read_bytes()[:100])
+    (directory / "notes.md").write_text("not a recording")
+
+    return directory
+
+
+def test_import_files(tmp_path, directory, file_data: Sequence):
+    """Test that the recordings are loaded in parallel, and that a corrupted file does not stop the import."""
+    paths = find_recordings(directory)
+    progress = []
+    recording_cache = RecordingCache(tmp_path / "recordings")
+
+    report = import_files(paths, recording_cache, max_workers=2, progress=lambda *args: progress.append(args))
+
+    assert [path.name for path in paths] == ["corrupted.bin", "first.bin", "second.bin"]
+    assert sorted(done for _, done, _ in progress) == [1, 2, 3]
+    assert [file.path for file in report.failures] == [directory / "corrupted.bin"]
+    assert "OSError" in report.failures[0].error
+    assert report.nbytes == 2 * data_path.stat().st_size
+    assert report.files_per_second > 0
+    assert report.summary().startswith("2 of 3 files imported")
+
+    # the data is passed through the recording cache
+    data_object = LoadedData()
+    datasets = register_datasets(report, data_object, LoadingCache(recording_cache=recording_cache))
+
+    assert data_object.get_dataset_labels() == ["Dataset 0", "Dataset 1"]
+    assert [dataset.eit_data["raw"].path.name for dataset in datasets] == ["first.bin", "second.bin"]
+    assert len(datasets[0].time) == len(file_data.time)
+
+    datasets = register_datasets(report, LoadedData(), LoadingCache(recording_cache=recording_cache), compact=True)
+    assert all(dataset.eit_data["raw"].pixel_impedance.dtype == np.float32 for dataset in datasets)
+
+
+def test_import_cached_file(tmp_path, directory):
+    """Test that a recording already in the recording cache is not parsed again."""
+    recording_cache = RecordingCache(tmp_path / "recordings")
+    path = directory / "first.bin"
+
+    with patch("eit_dash.utils.batch_import.load_eit_data", wraps=load_eit_data) as load_mock:
+        first = import_file(path, recording_cache)
+        second = import_file(path, recording_cache)
+
+    load_mock.assert_called_once()
+    assert get_file_key(path, first.vendor) in recording_cache
+    assert not second.failed
+    assert second.data is None
+
+
+def test_imported_files_found_by_load_page(tmp_path, directory):
+    """Test that the recordings imported in the recording cache are found with the key used by the load page."""
+    recording_cache = RecordingCache(tmp_path / "recordings")
+    import_files(find_recordings(directory), recording_cache, max_workers=2)
+    loading_cache = LoadingCache(recording_cache=recording_cache)
+
+    for name in ("first.bin", "second.bin"):
+        assert loading_cache.is_persisted(get_file_key(directory / name, "draeger"))
+
+
+def test_register_imported_files_callback(directory, session_store: SessionStore, tmp_path):
+    """Test that the imported recordings are added to the datasets of the session."""
+    job_cache = diskcache.Cache(tmp_path / "jobs")
+    # without recording cache, the data is passed through the job cache
+    job_cache.set("imported-files", import_files(find_recordings(directory), max_workers=2))
+
+    with patch("eit_dash.callbacks.load_callbacks.session_store", new=session_store), patch(
+        "eit_dash.callbacks.load_callbacks.job_cache",
+        new=job_cache,
+    ):
+        cards, summary, is_open = register_imported_files({"key": "imported-files"}, None, SESSION_ID)
+
+        assert register_imported_files({"key": None}, None, SESSION_ID)[1] == "No recordings found in the directory"
+
+    assert is_open
+    assert [card.id for card in cards] == ["Dataset 0", "Dataset 1"]
+    assert "corrupted.bin" in summary
+    assert session_store.get(SESSION_ID).loaded_data.get_sequence_list_length() == len(cards)
@@ -0,0 +1,118 @@
+import pickle
+
+import numpy as np
+from eitprocessing.datahandling.continuousdata import ContinuousData
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.definitions.constants import FILTERED_EIT_LABEL, RAW_EIT_LABEL
+from eit_dash.utils.data_singleton import LoadedData, compact_sequence
+from eit_dash.utils.session_store import get_memory_footprint
+from tests.conftest import create_sequence
+
+N_PERIODS = 50
+
+
+def add_periods(data_object: LoadedData, dataset: Sequence, n_periods: int = N_PERIODS) -> None:
+    for i in range(n_periods):
+        period = dataset.select_by_time(i, i + 10, label=f"Period {i}")
+        data_object.add_stable_period(period, 0, i)
+
+
+def test_period_views_pickle_size(synthetic_data: Sequence):
+    """Test that the periods selected from a dataset do not copy its arrays when pickled."""
+    data_object = LoadedData()
+    data_object.add_sequence(synthetic_data)
+    dataset_size = len(pickle.dumps(data_object))
+
+    add_periods(data_object, synthetic_data)
+
+    assert all(period.get_dataset() is synthetic_data for period in data_object.get_all_stable_periods())
+    assert len(pickle.dumps(data_object)) - dataset_size < N_PERIODS * 10_000
+
+
+def test_period_views_unpickled(synthetic_data: Sequence):
+    """Test that the periods are restored as views of their dataset, keeping the data added to them."""
+    data_object = LoadedData()
+    data_object.add_sequence(synthetic_data)
+    add_periods(data_object, synthetic_data, n_periods=2)
+
+    period = data_object.get_stable_period(1)
+    data = period.copy_data()
+    gi = data.continuous_data[RAW_EIT_LABEL]
+    filtered = ContinuousData(
+        FILTERED_EIT_LABEL,
+        "filtered global impedance",
+        "a.u.",
+        "impedance",
+        time=gi.time,
+        values=gi.values * 2,  # noqa: PD011
+    )
+    data.continuous_data.add(filtered)
+
+    # the copy does not change the period
+    assert FILTERED_EIT_LABEL not in period.get_data().continuous_data
+
+    period.update_data(data)
+    restored = pickle.loads(pickle.dumps(data_object))  # noqa: S301
+    dataset = restored.get_sequence_at(0)
+    restored_data = restored.get_stable_period(1).get_data()
+
+    assert restored_data.label == "Period 1"
+    assert list(restored_data.continuous_data) == list(data.continuous_data)
+    assert np.may_share_memory(restored_data.eit_data["raw"].pixel_impedance, dataset.eit_data["raw"].pixel_impedance)
+    assert np.array_equal(restored_data.eit_data["raw"].pixel_impedance, data.eit_data["raw"].pixel_impedance)
+    assert np.array_equal(restored_data.continuous_data[FILTERED_EIT_LABEL].values, filtered.values)
+
+
+def test_compact_sequence(synthetic_data: Sequence):
+    """Test that the compact copy of a sequence stores its values in single precision, within the precision bound."""
+    compact = compact_sequence(synthetic_data)
+    eit_data, compact_eit_data = synthetic_data.eit_data["raw"], compact.eit_data["raw"]
+
+    assert compact_eit_data.pixel_impedance.dtype == np.float32
+    assert compact_eit_data.time is eit_data.time
+    error = np.abs(compact_eit_data.pixel_impedance - eit_data.pixel_impedance)
+    assert np.all(error <= np.abs(eit_data.pixel_impedance) * 2**-24)
+
+    for label, data in synthetic_data.continuous_data.items():
+        compact_data = compact.continuous_data[label]
+        assert compact_data.values.dtype == np.float32  # noqa: PD011
+        assert np.allclose(compact_data.values, data.values, rtol=2**-24, atol=0)
+        # the original EIT data is not kept alive by the compact continuous data
+        assert all(source is not eit_data for source in compact_data.derived_from)
+
+    assert get_memory_footprint([compact]) < get_memory_footprint([synthetic_data]) * 0.55
+
+    # periods are still views of the compact dataset
+    data_object = LoadedData()
+    data_object.add_sequence(compact)
+    add_periods(data_object, compact, 1)
+    assert data_object.get_stable_period(0).get_dataset() is compact
+
+
+def test_next_period_index_not_reused(synthetic_data: Sequence):
+    """Test that the index of a removed period is not given to a new period."""
+    data_object = LoadedData()
+    data_object.add_sequence(synthetic_data)
+    add_periods(data_object, synthetic_data, n_periods=2)
+
+    data_object.remove_stable_period(1)
+    data_object.add_stable_period(synthetic_data.select_by_time(0, 10), 0)
+
+    assert data_object.get_stable_periods_indexes() == [0, 2]
+
+    data_object.clear_data()
+    assert data_object.get_next_period_index() == 0
+
+
+def test_remove_data_equal_sequences():
+    """Test that removing a dataset removes that dataset, and not another one with the same data."""
+    data_object = LoadedData()
+    first, second = create_sequence(label="Dataset 0"), create_sequence(label="Dataset 1")
+    data_object.add_sequence(first)
+    data_object.add_sequence(second)
+
+    data_object.remove_data("Dataset 1")
+
+    assert data_object.get_sequence_list_length() == 1
+    assert data_object.get_sequence_at(0) is first
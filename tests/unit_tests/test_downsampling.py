@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.definitions.constants import RAW_EIT_LABEL
+from eit_dash.utils.common import create_slider_figure
+from eit_dash.utils.downsampling import downsample, minmax_indices
+
+MAX_POINTS = 100
+PEAK_INDEX = 1234
+VALLEY_INDEX = 8765
+
+
+def test_minmax_indices_short_signal():
+    """Signals shorter than the budget are not decimated."""
+    values = np.arange(MAX_POINTS)
+
+    assert np.array_equal(minmax_indices(values, MAX_POINTS), values)
+    assert np.array_equal(minmax_indices(values, None), values)
+
+
+def test_minmax_indices_preserves_envelope():
+    """Test that the peaks and the boundaries of a long signal are kept."""
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 1, 10_000)
+    values[PEAK_INDEX] = 100
+    values[VALLEY_INDEX] = -100
+
+    indices = minmax_indices(values, MAX_POINTS)
+
+    assert len(indices) <= MAX_POINTS
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] == 0
+    assert indices[-1] == len(values) - 1
+    assert PEAK_INDEX in indices
+    assert VALLEY_INDEX in indices
+
+
+def test_minmax_indices_missing_values():
+    """NaN values do not hide the peaks of a bucket."""
+    values = np.full(10_000, np.nan)
+    values[PEAK_INDEX] = 1
+
+    indices = minmax_indices(values, MAX_POINTS)
+
+    assert PEAK_INDEX in indices
+
+
+def test_downsample():
+    time = np.arange(10_000) / 20
+    values = np.sin(time)
+
+    x, y = downsample(time, values, MAX_POINTS)
+
+    assert len(x) == len(y) <= MAX_POINTS
+    assert x[0] == time[0]
+    assert x[-1] == time[-1]
+    assert np.max(y) == pytest.approx(np.max(values))
+    assert np.min(y) == pytest.approx(np.min(values))
+
+
+def test_create_slider_figure_downsampling(synthetic_data: Sequence):
+    """The number of plotted samples can be switched per figure."""
+    full_figure = create_slider_figure(synthetic_data, max_points=None)
+    figure = create_slider_figure(synthetic_data, max_points=MAX_POINTS)
+
+    assert len(full_figure.data[0].x) == len(synthetic_data.continuous_data[RAW_EIT_LABEL].time)
+    assert len(figure.data[0].x) <= MAX_POINTS
+
+
+def test_downsample_time_range():
+    """The samples in the visible time range are plotted with full detail, the rest as an overview."""
+    time = np.arange(100_000) / 20
+    values = np.sin(time)
+    time_range = (1000, 1002)
+
+    x, _ = downsample(time, values, MAX_POINTS, time_range)
+
+    in_window = (time >= time_range[0]) & (time <= time_range[1])
+    plotted_in_window = (x >= time_range[0]) & (x <= time_range[1])
+
+    assert np.sum(plotted_in_window) == np.sum(in_window)
+    assert len(x) <= 2 * MAX_POINTS + 2
+    assert x[0] == time[0]
+    assert x[-1] == time[-1]
@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+import numpy as np
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.definitions.constants import EELI_RESULT, RAW_EIT_LABEL
+from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.eeli import (
+    compute_eeli,
+    compute_signals_eeli,
+    detect_end_expirations,
+    get_period_eeli,
+)
+from eit_dash.utils.filtering import filter_data, get_selected_parameters
+from eit_dash.utils.results_store import ResultsStore
+
+
+def test_detect_end_expirations(synthetic_data: Sequence):
+    """Test that an end-expiration is found at the minimum of each breath of the synthetic signal."""
+    data = synthetic_data.continuous_data[RAW_EIT_LABEL]
+    indices = detect_end_expirations(data.values, 20)
+
+    # breaths of 4 seconds, with the minimum 3 seconds after the start of each breath
+    assert len(indices) == 25  # noqa: PLR2004
+    assert np.allclose(data.time[indices] % 4, 3, atol=0.5)
+
+    # missing samples are ignored
+    values = data.values.copy()  # noqa: PD011
+    values[: len(values) // 2] = np.nan
+    assert np.array_equal(detect_end_expirations(values, 20), indices[indices >= len(values) // 2])
+
+
+def test_compute_eeli(synthetic_data: Sequence):
+    """Test the statistics of the EELI."""
+    result = compute_eeli(synthetic_data)
+    values = synthetic_data.continuous_data[RAW_EIT_LABEL].values[result["indices"]]  # noqa: PD011
+
+    assert np.array_equal(result["values"], values)
+    assert result["mean"] == np.mean(values)
+    assert result["median"] == np.median(values)
+    assert result["standard deviation"] == np.std(values)
+
+
+def test_compute_signals_eeli(synthetic_data: Sequence):
+    """Test that the EELI computed in parallel is the same as the EELI of each period, in the order of the periods."""
+    periods = [synthetic_data.select_by_time(start, start + 20) for start in range(0, 100, 20)]
+    signals = [(period.continuous_data[RAW_EIT_LABEL].values, 20) for period in periods]  # noqa: PD011
+    progress = []
+
+    def report_progress(_, done, total):
+        progress.append((done, total))
+
+    results = compute_signals_eeli(signals, max_workers=2, progress=report_progress)
+
+    for period, result in zip(periods, results, strict=True):
+        expected = compute_eeli(period)
+        assert np.array_equal(result["indices"], expected["indices"])
+        assert result["mean"] == expected["mean"]
+    assert progress == [(done, len(periods)) for done in range(1, len(periods) + 1)]
+
+
+def test_cached_eeli(synthetic_data: Sequence):
+    """Test that the EELI of a period is only computed again when the period is filtered with different settings."""
+    data_object = LoadedData()
+    data_object.add_sequence(synthetic_data)
+    data_object.add_stable_period(synthetic_data.select_by_time(10, 90, label="Period 0"), 0, 0)
+    period = data_object.get_stable_period(0)
+    results = ResultsStore()
+
+    with patch("eit_dash.utils.eeli.compute_eeli", wraps=compute_eeli) as mock_compute:
+        result = get_period_eeli(period, results)
+        assert get_period_eeli(period, results) is result
+        assert results.get(0, EELI_RESULT, (RAW_EIT_LABEL, "{}")) is result
+        assert mock_compute.call_count == 1
+
+        for cutoff in (1, 1, 2):
+            data = period.copy_data()
+            filter_params = get_selected_parameters(cutoff, None, 4, 0)
+            data.continuous_data.add(filter_data(data, filter_params), overwrite=True)
+            period.update_data(data)
+            result = get_period_eeli(period, results)
+
+        # filtering again with the same settings does not change the result
+        assert mock_compute.call_count == 3  # noqa: PLR2004
+        assert results.get_period_results(0) == {EELI_RESULT: result}
+
+        results.remove_period(0)
+        assert not len(results)
+        get_period_eeli(period, results)
+        assert mock_compute.call_count == 4  # noqa: PLR2004
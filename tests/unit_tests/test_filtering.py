@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from eitprocessing.datahandling.sequence import Sequence
+from eitprocessing.filters.butterworth_filters import ButterworthFilter
+
+from eit_dash.definitions.constants import FILTERED_EIT_LABEL, FILTERED_PIXELS_LABEL
+from eit_dash.utils.filtering import design_filter, filter_data, filter_periods, filter_pixels
+
+FILTER_PARAMS = {"filter_type": "bandpass", "cutoff_frequency": [0.1, 1], "order": 4}
+
+
+def test_filter_periods(synthetic_data: Sequence):
+    """Test that filtering the periods together gives the same results as filtering them one by one."""
+    # two periods with the same length, filtered in the same array, and a longer one
+    periods = [synthetic_data.select_by_time(start, end) for start, end in ((10, 30), (40, 60), (0, 80))]
+
+    filtered_data = filter_periods(periods, FILTER_PARAMS, max_workers=2)
+
+    for period, data in zip(periods, filtered_data, strict=True):
+        expected = filter_data(period, dict(FILTER_PARAMS))
+
+        assert data.label == FILTERED_EIT_LABEL
+        assert data.parameters == expected.parameters
+        assert np.allclose(data.values, expected.values)
+        assert np.array_equal(data.time, period.time)
+
+
+def test_design_filter_cache():
+    """Test that a filter is designed once, and shared by all the calls with the same parameters."""
+    sos = design_filter({**FILTER_PARAMS, "cutoff_frequency": [0.2, 2]}, 20)
+
+    assert design_filter({**FILTER_PARAMS, "cutoff_frequency": (0.2, 2), "sample_frequency": 50}, 20) is sos
+    assert design_filter({**FILTER_PARAMS, "cutoff_frequency": [0.2, 2]}, 50) is not sos
+
+    with pytest.raises(TypeError):
+        design_filter({"filter_type": "lowpass", "cutoff_frequency": [0.2, 2], "order": 4}, 20)
+
+
+def test_filter_pixels(synthetic_data: Sequence):
+    """Test that the pixels are filtered in chunks as they would be one by one."""
+    period = synthetic_data.select_by_time(10, 30)
+    pixel_impedance = period.eit_data["raw"].pixel_impedance
+
+    # chunks of 100 pixels
+    with patch("eit_dash.utils.filtering.PIXEL_FILTER_CHUNK_BYTES", new=100 * len(pixel_impedance) * 8):
+        filtered = filter_pixels(period, FILTER_PARAMS, max_workers=2)
+
+    filt = ButterworthFilter(**FILTER_PARAMS, sample_frequency=period.eit_data["raw"].framerate)
+
+    assert filtered.label == FILTERED_PIXELS_LABEL
+    assert np.array_equal(filtered.time, period.eit_data["raw"].time)
+    for row, column in ((0, 0), (12, 31), (31, 7)):
+        assert np.allclose(filtered.pixel_impedance[:, row, column], filt.apply_filter(pixel_impedance[:, row, column]))
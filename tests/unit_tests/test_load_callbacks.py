@@ -1,19 +1,32 @@
 from unittest.mock import patch
 
 import dash_bootstrap_components as dbc
+import diskcache
+import numpy as np
 import plotly.graph_objects as go
 import pytest
-from dash import html
+from dash import html, no_update
+from dash._callback import GLOBAL_CALLBACK_LIST
 from dash._callback_context import context_value
 from dash._utils import AttributeDict
+from dash.exceptions import PreventUpdate
 from eitprocessing.datahandling.eitdata import Vendor
 from eitprocessing.datahandling.sequence import Sequence
 
 import eit_dash.definitions.element_ids as ids
 import eit_dash.definitions.layout_styles as styles
-from eit_dash.callbacks.load_callbacks import load_selected_data, show_info
+from eit_dash.callbacks.load_callbacks import (
+    load_file,
+    load_selected_data,
+    request_file,
+    show_info,
+    update_slider_resolution,
+)
+from eit_dash.definitions.constants import MAX_PLOT_POINTS, RAW_EIT_LABEL
 from eit_dash.definitions.option_lists import InputFiletypes
-from tests.conftest import data_path
+from eit_dash.utils.loading import LoadingCache, RecordingCache, get_file_key, load_draeger_preview
+from eit_dash.utils.session_store import SessionStore
+from tests.conftest import SESSION_ID, data_path
 
 EXPECTED_CONTINUOUS_DATA = [
     {"label": "airway pressure", "value": 0},
@@ -48,12 +61,64 @@ def expected_cut_info_data(file_data: Sequence):
     }
 
 
-def test_load_selected_data_callback(file_data: Sequence, expected_cut_info_data: dict):
+@pytest.fixture()
+def job_cache(tmp_path):
+    """Cache shared with the background jobs."""
+    with diskcache.Cache(tmp_path) as cache:
+        yield cache
+
+
+def test_load_file_background(job_cache: diskcache.Cache):
+    """Test that the file is loaded in the background, reporting the progress and passing the data in the cache."""
+    progress = []
+
+    selected_file = {"path": str(data_path), "vendor": "draeger"}
+
+    with patch("eit_dash.callbacks.load_callbacks.job_cache", new=job_cache), patch(
+        "eit_dash.callbacks.load_callbacks.loading_cache",
+        new=LoadingCache(),
+    ):
+        loaded_file = load_file(progress.append, selected_file, SESSION_ID)
+
+        assert load_file(progress.append, None, SESSION_ID) is None
+
+    assert [label for _, label in progress] == ["Reading the file", "Preparing the preview"]
+    assert loaded_file["path"] == str(data_path)
+    # only the preview is loaded, without the images
+    preview = job_cache[loaded_file["key"]]
+    assert len(preview.continuous_data[RAW_EIT_LABEL].time) > 0
+    assert len(preview.eit_data) == 0
+
+
+def test_load_file_recording_cache(tmp_path, job_cache: diskcache.Cache):
+    """Test that a recording saved in the recording cache is not passed through the job cache."""
+    selected_file = {"path": str(data_path), "vendor": "draeger"}
+    loading_cache = LoadingCache(recording_cache=RecordingCache(tmp_path / "recordings"))
+    loading_cache.load(data_path, "draeger")
+    loading_cache.clear()
+
+    with patch("eit_dash.callbacks.load_callbacks.job_cache", new=job_cache), patch(
+        "eit_dash.callbacks.load_callbacks.loading_cache",
+        new=loading_cache,
+    ):
+        loaded_file = load_file(lambda _: None, selected_file, SESSION_ID)
+
+    assert loaded_file == selected_file
+    assert len(job_cache) == 0
+    assert loading_cache.is_persisted(get_file_key(data_path, "draeger"))
+
+
+def test_load_selected_data_callback(
+    file_data: Sequence,
+    expected_cut_info_data: dict,
+    session_store: SessionStore,
+    job_cache: diskcache.Cache,
+):
     """Test the loading of data from a selected file."""
+    loading_cache = LoadingCache()
     cancel_load = 0
-    sig = []
-    file_type = InputFiletypes.Draeger.value
-    fig = go.Figure()
+    loaded_file = {"path": str(data_path), "vendor": "draeger", "key": "loaded-file"}
+    job_cache.set(loaded_file["key"], file_data)
 
     # cancel data button input
     context_value.set(
@@ -61,36 +126,67 @@ def test_load_selected_data_callback(file_data: Sequence, expected_cut_info_data
             triggered_inputs=[{"prop_id": f"{ids.LOAD_CANCEL_BUTTON}.n_clicks"}],
         ),
     )
-    output = load_selected_data(data_path, cancel_load, sig, file_type, fig)
+    with patch("eit_dash.callbacks.load_callbacks.session_store", new=session_store), patch(
+        "eit_dash.callbacks.load_callbacks.job_cache",
+        new=job_cache,
+    ):
+        output = load_selected_data(loaded_file, cancel_load, SESSION_ID)
 
     assert output == (True, [], [], go.Figure())
+    assert session_store.get(SESSION_ID).file_data is None
 
-    # file selected input
+    # file loaded in the background
     context_value.set(
         AttributeDict(
-            triggered_inputs=[{"prop_id": f"{ids.NFILES_PLACEHOLDER}.n_clicks"}],
+            triggered_inputs=[{"prop_id": f"{ids.LOADED_FILE}.data"}],
         ),
     )
 
     # run the callback
-    output = load_selected_data(data_path, cancel_load, sig, file_type, fig)
+    with patch("eit_dash.callbacks.load_callbacks.session_store", new=session_store), patch(
+        "eit_dash.callbacks.load_callbacks.job_cache",
+        new=job_cache,
+    ), patch("eit_dash.callbacks.load_callbacks.loading_cache", new=loading_cache):
+        output = load_selected_data(loaded_file, cancel_load, SESSION_ID)
+
+    # the loaded file is moved from the job cache to the session, for the selection of the dataset
+    assert session_store.get(SESSION_ID).file_data is not None
+    assert loaded_file["key"] not in job_cache
+    assert len(loading_cache) == 1
 
     # the output of this function is a figure that uses the loaded data
     # we can check the data in the figure to verify the correct data loading
+    # the signal is decimated before being plotted, but the whole time range is covered
     fig_data = output[3].data[0]["x"]
 
-    assert len(fig_data) == len(file_data.time)
+    assert len(fig_data) <= min(len(file_data.time), MAX_PLOT_POINTS)
+    assert fig_data[0] == file_data.time[0]
+    assert fig_data[-1] == file_data.time[-1]
 
     # we can check that also the other continuous data has been detected and displayed as options
 
     assert output[1] == EXPECTED_CONTINUOUS_DATA
 
 
-def test_show_info_callback(file_data: Sequence, expected_cut_info_data: dict):
-    """Test the slicing of the data through the periods selection."""
+@pytest.mark.parametrize("cached", [True, False])
+def test_show_info_callback(
+    file_data: Sequence,
+    expected_cut_info_data: dict,
+    session_store: SessionStore,
+    cached: bool,
+):
+    """Test the slicing of the data through the periods selection, from the cached recording or from the file."""
+    session_store.get(SESSION_ID).file_data = load_draeger_preview(data_path)
+    loading_cache = LoadingCache()
+    if cached:
+        loading_cache.put(get_file_key(data_path, "draeger"), file_data)
+
     # run the callback
-    with patch("eit_dash.callbacks.load_callbacks.file_data", new=file_data):
-        output = show_info(
+    with patch("eit_dash.callbacks.load_callbacks.session_store", new=session_store), patch(
+        "eit_dash.callbacks.load_callbacks.loading_cache",
+        new=loading_cache,
+    ):
+        output, hidden = show_info(
             btn_click=1,
             loaded_data=data_path,
             container_state=None,
@@ -103,6 +199,7 @@ def test_show_info_callback(file_data: Sequence, expected_cut_info_data: dict):
             },
             selected_signals=[0, 1, 2, 3],
             signals_options=EXPECTED_CONTINUOUS_DATA,
+            session_id=SESSION_ID,
         )
 
     # the output is a card containing the information about the selected signal.
@@ -124,3 +221,66 @@ def test_show_info_callback(file_data: Sequence, expected_cut_info_data: dict):
     # Assessing the string converted objects, to check that the properties are the same.
     # Assessing for the equivalence of the objects directly will fail
     assert str(output) == str(mock_data_card)
+
+    # the preview is released and hidden
+    assert hidden
+    assert session_store.get(SESSION_ID).file_data is None
+
+    selection = session_store.get(SESSION_ID).loaded_data.get_sequence_at(0)
+    expected = file_data.eit_data["raw"].pixel_impedance[FIRST_SAMPLE:LAST_SAMPLE]
+    assert np.array_equal(selection.eit_data["raw"].pixel_impedance, expected, equal_nan=True)
+
+
+def test_update_slider_resolution_callback(synthetic_data: Sequence, session_store: SessionStore):
+    """Test that zooming in the preview plots the visible time range with full detail."""
+    time = synthetic_data.continuous_data[RAW_EIT_LABEL].time
+    options = [{"label": "airway pressure", "value": 0}]
+    session_store.get(SESSION_ID).file_data = synthetic_data
+
+    with patch("eit_dash.callbacks.load_callbacks.session_store", new=session_store):
+        # changes that do not involve the time axis do not update the figure
+        with pytest.raises(PreventUpdate):
+            update_slider_resolution({"autosize": True}, str(data_path), [0], options, SESSION_ID)
+
+        figure = update_slider_resolution(
+            {"xaxis.range[0]": time[FIRST_SAMPLE], "xaxis.range[1]": time[LAST_SAMPLE]},
+            str(data_path),
+            [0],
+            options,
+            SESSION_ID,
+        )
+
+    raw_trace = figure.data[0]
+    in_window = (raw_trace.x >= time[FIRST_SAMPLE]) & (raw_trace.x <= time[LAST_SAMPLE])
+
+    assert raw_trace.name == RAW_EIT_LABEL
+    assert raw_trace.visible is True
+    assert figure.data[1].visible == "legendonly"
+    assert in_window.sum() == LAST_SAMPLE - FIRST_SAMPLE + 1
+
+
+def test_preview_signals_clientside():
+    """Test that ticking a signal of the preview is handled in the browser."""
+    callbacks = [cb for cb in GLOBAL_CALLBACK_LIST if {"id": ids.CHECKBOX_SIGNALS, "property": "value"} in cb["inputs"]]
+
+    assert len(callbacks) == 1
+    assert callbacks[0]["clientside_function"] == {"namespace": "visibility", "function_name": "preview_signals"}
+
+
+def test_request_file_cached(file_data: Sequence):
+    """Test that a file found in the loading cache is shown without loading it again."""
+    loading_cache = LoadingCache()
+    file_type = str(InputFiletypes.Draeger.value)
+
+    with patch("eit_dash.callbacks.load_callbacks.loading_cache", new=loading_cache):
+        loaded_file, load_request = request_file(str(data_path), file_type)
+
+        assert loaded_file is no_update
+        assert load_request == {"path": str(data_path), "vendor": "draeger"}
+
+        loading_cache.put(get_file_key(data_path, "draeger"), file_data)
+        loaded_file, load_request = request_file(str(data_path), file_type)
+
+    assert loaded_file == {"path": str(data_path), "vendor": "draeger"}
+    assert load_request is no_update
+    assert (loading_cache.hits, loading_cache.misses) == (1, 1)
@@ -0,0 +1,175 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.utils.loading import LoadingCache, RecordingCache, get_file_key, load_draeger_preview
+from eit_dash.utils.session_store import get_memory_footprint
+from tests.conftest import create_sequence, data_path
+
+
+def test_file_key(tmp_path):
+    """Test that modifying a file changes its key."""
+    path = tmp_path / "recording.bin"
+    path.write_bytes(b"0" * 10)
+    key = get_file_key(path, "draeger")
+
+    assert key == get_file_key(tmp_path / ".." / tmp_path.name / "recording.bin", "draeger")
+    assert key != get_file_key(path, "timpel")
+
+    os.utime(path, ns=(key.mtime_ns + 10**9, key.mtime_ns + 10**9))
+
+    assert key != get_file_key(path, "draeger")
+
+    with pytest.raises(FileNotFoundError):
+        get_file_key(tmp_path / "missing.bin", "draeger")
+
+
+def test_loading_cache_hits(file_data: Sequence):
+    """Test that a file is loaded only once, and that the hits and the misses are counted."""
+    cache = LoadingCache()
+
+    first = cache.load(data_path, "draeger")
+    second = cache.load(data_path, "draeger")
+
+    assert first is second
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.nbytes == get_memory_footprint([file_data])
+
+
+def test_loading_cache_lru(tmp_path):
+    """Test that the least recently used data is removed when the cache is full."""
+    sequences = [create_sequence(n_frames=100, label=f"sequence {i}") for i in range(3)]
+    keys = [get_file_key(tmp_path, str(i)) for i in range(3)]
+    cache = LoadingCache(max_bytes=int(2.5 * get_memory_footprint(sequences[:1])))
+
+    cache.put(keys[0], sequences[0])
+    cache.put(keys[1], sequences[1])
+    cache.get(keys[0])
+    cache.put(keys[2], sequences[2])
+
+    assert keys[1] not in cache
+    assert cache.peek(keys[0]) is sequences[0]
+    assert cache.peek(keys[2]) is sequences[2]
+    assert cache.nbytes <= cache.max_bytes
+
+    # data larger than the cache is not kept
+    cache.max_bytes = 0
+    cache.put(keys[1], sequences[1])
+
+    assert keys[1] not in cache
+
+
+def test_recording_cache(tmp_path, file_data: Sequence):
+    """Test that a parsed file is read again from the recording cache, with its arrays mapped in memory."""
+    key = get_file_key(data_path, "draeger")
+    LoadingCache(recording_cache=RecordingCache(tmp_path)).load(data_path, "draeger")
+
+    # e.g. after a restart of the app
+    cache = LoadingCache(recording_cache=RecordingCache(tmp_path))
+
+    with patch("eit_dash.utils.loading.load_eit_data", side_effect=AssertionError("the file is parsed again")):
+        data = cache.load(data_path, "draeger")
+
+    eit_data = data.eit_data["raw"]
+
+    assert cache.is_persisted(key)
+    assert isinstance(eit_data.pixel_impedance, np.memmap)
+    assert np.array_equal(eit_data.pixel_impedance, file_data.eit_data["raw"].pixel_impedance, equal_nan=True)
+    assert np.array_equal(eit_data.time, file_data.eit_data["raw"].time)
+    assert list(data.continuous_data) == list(file_data.continuous_data)
+
+
+def test_recording_cache_eviction(tmp_path):
+    """Test that the least recently used recordings are removed when the recording cache is full."""
+    sequence = create_sequence(n_frames=100)
+    keys = [get_file_key(tmp_path, str(i)) for i in range(3)]
+    cache = RecordingCache(tmp_path / "recordings", max_bytes=int(2.5 * get_memory_footprint([sequence])))
+
+    cache.put(keys[0], sequence)
+    cache.put(keys[1], sequence)
+    # the modification time is used to find the least recently used recording
+    os.utime(cache._get_path(keys[0]), (0, 0))  # noqa: SLF001
+    cache.put(keys[2], sequence)
+
+    assert keys[0] not in cache
+    assert keys[1] in cache
+    assert keys[2] in cache
+
+    cache.max_bytes = 0
+
+    assert not cache.put(keys[0], sequence)
+    assert [path.name for path in (tmp_path / "recordings").iterdir() if path.name.startswith(".")] == []
+
+
+def test_draeger_preview(file_data: Sequence):
+    """Test that the preview of a Draeger file has the same signals as the complete recording, without the images."""
+    preview = load_draeger_preview(data_path)
+
+    assert len(preview.eit_data) == 0
+    assert list(preview.continuous_data) == list(file_data.continuous_data)
+    assert list(preview.sparse_data) == list(file_data.sparse_data)
+    assert get_memory_footprint([preview]) * 10 < get_memory_footprint([file_data])
+
+    for label, data in file_data.continuous_data.items():
+        preview_data = preview.continuous_data[label]
+        assert (preview_data.name, preview_data.unit, preview_data.category) == (data.name, data.unit, data.category)
+        assert np.array_equal(preview_data.time, data.time)
+        assert np.array_equal(preview_data.values, data.values, equal_nan=True)
+
+    for label in ("minvalues_(draeger)", "maxvalues_(draeger)"):
+        assert np.array_equal(preview.sparse_data[label].time, file_data.sparse_data[label].time)
+
+    events = file_data.sparse_data["events_(draeger)"]
+    preview_events = preview.sparse_data["events_(draeger)"]
+
+    assert np.array_equal(preview_events.time, events.time)
+    # the padding of the texts of the events is removed
+    assert [(event.marker, event.text) for event in preview_events.values] == [  # noqa: PD011
+        (event.marker, event.text.rstrip("\x00"))
+        for event in events.values  # noqa: PD011
+    ]
+
+
+def test_load_preview_cached(tmp_path):
+    """Test that the complete recording is used as preview when it is in the caches already."""
+    cache = LoadingCache(recording_cache=RecordingCache(tmp_path))
+
+    assert len(cache.load_preview(data_path, "draeger").eit_data) == 0
+
+    cache.load(data_path, "draeger")
+    # the data is read from the recording cache
+    cache.clear()
+
+    assert len(cache.load_preview(data_path, "draeger").eit_data) == 1
+
+
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [
+        # start and end between two samples
+        (1.01, 2.01),
+        # on the samples
+        (1, 2),
+        # before the first and after the last sample
+        (-1, 1000),
+        # empty selections
+        (1.01, 1.02),
+        (2, 1),
+    ],
+)
+def test_load_selection(file_data: Sequence, start: float, end: float):
+    """Test that a selection read from the file has the same frames as a selection of the cached recording."""
+    cache = LoadingCache()
+    time = file_data.time
+    expected = file_data.select_by_time(start, end)
+
+    selection = cache.load_selection(data_path, "draeger", time, start, end)
+
+    assert np.array_equal(selection.time, expected.time)
+    assert np.array_equal(selection.eit_data["raw"].pixel_impedance, expected.eit_data["raw"].pixel_impedance)
+
+    cache.load(data_path, "draeger")
+    assert np.array_equal(cache.load_selection(data_path, "draeger", time, start, end).time, expected.time)
@@ -0,0 +1,74 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.definitions.constants import FILTERED_EIT_LABEL
+from eit_dash.utils.eeli import compute_eeli
+from eit_dash.utils.filtering import filter_data
+from eit_dash.utils.pipeline import read_config, run_pipeline, write_results
+from tests.conftest import data_path
+
+PERIODS = [[10, 70], [80, 140]]
+
+
+@pytest.fixture()
+def config_path(tmp_path):
+    """Configuration of the pipeline, with a recording and a missing file."""
+    path = tmp_path / "config.json"
+    path.write_text(
+        json.dumps(
+            {
+                "filter": {"type": "lowpass", "cutoff_high": 1, "order": 4},
+                "recordings": [
+                    {"path": str(data_path), "vendor": "draeger", "periods": PERIODS},
+                    {"path": "missing.bin", "vendor": "draeger", "periods": [[0, 10]]},
+                ],
+            },
+        ),
+    )
+
+    return path
+
+
+def test_pipeline(config_path, tmp_path, file_data: Sequence):
+    """Test that the pipeline gives the same results as the steps of the dashboard."""
+    config = read_config(config_path)
+
+    assert config.filter_params == {"filter_type": "lowpass", "cutoff_frequency": 1, "order": 4}
+    assert config.recordings[1].path == tmp_path / "missing.bin"
+
+    report = run_pipeline(config, max_workers=2)
+
+    assert [result.recording for result in report.failures] == [config.recordings[1]]
+    assert report.summary().startswith("1 of 2 recordings analyzed")
+
+    for (start, end), result in zip(PERIODS, report.recordings[0].periods, strict=True):
+        period = file_data.select_by_time(start_time=start, end_time=end)
+        period.continuous_data.add(filter_data(period, dict(config.filter_params)))
+        expected = compute_eeli(period)
+
+        assert result["signal"] == FILTERED_EIT_LABEL
+        assert np.array_equal(result["indices"], expected["indices"])
+        assert result["mean"] == expected["mean"]
+
+    paths = write_results(report, tmp_path / "results")
+
+    assert [path.name for path in paths] == ["eeli.csv", f"{data_path.stem}.json"]
+    with paths[0].open() as file:
+        rows = list(csv.DictReader(file))
+    assert [float(row["mean"]) for row in rows] == [period["mean"] for period in report.recordings[0].periods]
+
+    results = json.loads(paths[1].read_text())
+    assert results["periods"][0]["end-expirations"]["values"] == report.recordings[0].periods[0]["values"].tolist()
+
+
+def test_invalid_config(tmp_path):
+    """Test that an invalid configuration is reported."""
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"filter": {"type": "unknown", "order": 4}, "recordings": []}))
+
+    with pytest.raises(ValueError, match="Invalid pipeline configuration"):
+        read_config(path)
@@ -1,21 +1,40 @@
+import json
+import time
 from unittest.mock import patch
 
+import numpy as np
 import pytest
+from dash._callback import GLOBAL_CALLBACK_LIST
 from dash._callback_context import context_value
 from dash._utils import AttributeDict
+from dash.exceptions import PreventUpdate
 from eitprocessing.datahandling.sequence import Sequence
+from plotly.utils import PlotlyJSONEncoder
 
 import eit_dash.definitions.element_ids as ids
+import eit_dash.definitions.layout_styles as styles
 from eit_dash.callbacks.preprocessing_callbacks import (
     apply_filter,
+    create_periods_figure,
+    filter_all_periods,
+    initialize_figure,
+    initialize_signals_checkbox,
     open_periods_modal,
     open_synch_modal,
+    remove_period,
+    save_filtered_signal,
+    select_period,
+    show_filtered_results,
 )
+from eit_dash.definitions.constants import FILTERED_EIT_LABEL, FILTERED_PIXELS_LABEL, RAW_EIT_LABEL
 from eit_dash.definitions.option_lists import FilterTypes
 from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.filtering import filter_data, get_selected_parameters
+from eit_dash.utils.session_store import SessionStore
+from tests.conftest import SESSION_ID
 
 
-@pytest.fixture
+@pytest.fixture()
 def mock_data_object(file_data: Sequence):
     """Mocked object to save and retrieve the data."""
     data_object = LoadedData()
@@ -25,7 +44,31 @@ def mock_data_object(file_data: Sequence):
     return data_object
 
 
-@pytest.fixture
+@pytest.fixture()
+def synthetic_data_object(synthetic_data: Sequence):
+    """Mocked object with a synthetic dataset and a stable period."""
+    data_object = LoadedData()
+    data_object.add_sequence(synthetic_data)
+    data_object.add_stable_period(synthetic_data.select_by_time(10, 20, label="Period 0"), 0, 0)
+
+    return data_object
+
+
+# maximum time in seconds to respond to the selection of a dataset
+MAX_SELECTION_LATENCY = 0.2
+
+SIGNALS_OPTIONS = [
+    {"label": "airway pressure", "value": 0},
+    {"label": RAW_EIT_LABEL, "value": 1},
+]
+
+
+def payload_size(output) -> int:
+    """Size in bytes of a callback output, as sent to the browser."""
+    return len(json.dumps(output, cls=PlotlyJSONEncoder))
+
+
+@pytest.fixture()
 def mock_tmp_results():
     """Mocked temporary results object."""
     return LoadedData()
@@ -34,18 +77,20 @@ def mock_tmp_results():
 def test_apply_filter_callback(
     mock_data_object: LoadedData,
     mock_tmp_results: LoadedData,
+    session_store: SessionStore,
 ):
     """Test the filtering of stable periods."""
     low_cut = 1
     high_cut = 9
     filter_order = 1
 
+    session = session_store.get(SESSION_ID)
+    session.loaded_data = mock_data_object
+    session.tmp_results = mock_tmp_results
+
     with patch(
-        "eit_dash.callbacks.preprocessing_callbacks.data_object",
-        new=mock_data_object,
-    ), patch(
-        "eit_dash.callbacks.preprocessing_callbacks.tmp_results",
-        new=mock_tmp_results,
+        "eit_dash.callbacks.preprocessing_callbacks.session_store",
+        new=session_store,
     ):
         # test error in filter
         with pytest.raises(TypeError):
@@ -56,6 +101,7 @@ def test_apply_filter_callback(
                 order=filter_order,
                 filter_selected=FilterTypes.lowpass.value,
                 results=[],
+                session_id=SESSION_ID,
             )
 
         # test valid filter
@@ -66,6 +112,7 @@ def test_apply_filter_callback(
             order=filter_order,
             filter_selected=FilterTypes.bandpass.value,
             results=[],
+            session_id=SESSION_ID,
         )
 
         # the filtered results are saved in a temporary object before saving them
@@ -74,6 +121,75 @@ def test_apply_filter_callback(
         assert "global_impedance_(filtered)" in mock_tmp_results.get_stable_period(0).get_data().continuous_data
 
 
+def test_apply_filter_pixels(synthetic_data_object: LoadedData, session_store: SessionStore):
+    """Test that the pixels are filtered only when requested, and that the period changes only when confirmed."""
+    session = session_store.get(SESSION_ID)
+    session.loaded_data = synthetic_data_object
+    parameters = {"co_low": 0.1, "co_high": 1, "order": 4, "filter_selected": FilterTypes.bandpass.value}
+
+    with patch("eit_dash.callbacks.preprocessing_callbacks.session_store", new=session_store):
+        apply_filter(0, **parameters, results=[], session_id=SESSION_ID, pixels=True)
+
+        assert FILTERED_PIXELS_LABEL in session.tmp_results.get_stable_period(0).get_data().eit_data
+        assert FILTERED_PIXELS_LABEL not in synthetic_data_object.get_stable_period(0).get_data().eit_data
+
+        apply_filter(0, **parameters, results=[], session_id=SESSION_ID, pixels=False)
+
+        assert FILTERED_PIXELS_LABEL not in session.tmp_results.get_stable_period(0).get_data().eit_data
+
+
+def test_filter_preview(synthetic_data_object: LoadedData, session_store: SessionStore):
+    """Test that the filter is previewed on the selected period, sending only the filtered signal on changes."""
+    session_store.get(SESSION_ID).loaded_data = synthetic_data_object
+    lowpass = FilterTypes.lowpass.value
+
+    with patch("eit_dash.callbacks.preprocessing_callbacks.session_store", new=session_store):
+        context_value.set(AttributeDict(triggered_inputs=[{"prop_id": f"{ids.FILTERING_SELECT_PERIOD_VIEW}.value"}]))
+        figure, style = show_filtered_results("0", None, 1, 2, None, lowpass, styles.EMPTY_ELEMENT, SESSION_ID)
+
+        context_value.set(AttributeDict(triggered_inputs=[{"prop_id": f"{ids.FILTER_ORDER}.value"}]))
+        figure_patch, _ = show_filtered_results("0", None, 1, 4, None, lowpass, styles.GRAPH, SESSION_ID)
+
+        # the preview is not updated while the parameters are not valid
+        with pytest.raises(PreventUpdate):
+            show_filtered_results("0", None, None, 4, None, lowpass, styles.GRAPH, SESSION_ID)
+
+    period = synthetic_data_object.get_stable_period(0).get_data()
+    expected = filter_data(period, get_selected_parameters(1, None, 4, lowpass))
+    operations = figure_patch.to_plotly_json()["operations"]
+
+    assert style == styles.GRAPH
+    assert [trace.name for trace in figure.data] == ["Original signal", "Filtered signal"]
+    assert [operation["location"] for operation in operations] == [["data", 1, "x"], ["data", 1, "y"]]
+    assert np.allclose(operations[1]["params"]["value"], expected.values)
+    assert payload_size(figure_patch) < payload_size(figure)
+    # the period is only filtered when confirming
+    assert session_store.get(SESSION_ID).tmp_results.get_stable_periods_indexes() == []
+
+
+def test_confirm_filter(synthetic_data_object: LoadedData, session_store: SessionStore):
+    """Test that confirming filters all the periods, unless they have been filtered with the same settings."""
+    session = session_store.get(SESSION_ID)
+    session.loaded_data = synthetic_data_object
+    parameters = {"co_low": None, "co_high": 1, "order": 4, "filter_selected": FilterTypes.lowpass.value}
+
+    with patch("eit_dash.callbacks.preprocessing_callbacks.session_store", new=session_store), patch(
+        "eit_dash.callbacks.preprocessing_callbacks.filter_all_periods",
+        wraps=filter_all_periods,
+    ) as filter_mock:
+        results, *_ = save_filtered_signal(1, [], SESSION_ID, **parameters)
+
+        assert filter_mock.call_count == 1
+        assert FILTERED_EIT_LABEL in synthetic_data_object.get_stable_period(0).get_data().continuous_data
+        assert results[-1].id == ids.FILTERING_SAVED_CARD
+
+        apply_filter(0, **parameters, results=[], session_id=SESSION_ID)
+        save_filtered_signal(1, [], SESSION_ID, **parameters)
+
+        # the periods filtered when applying the filter are saved as they are
+        assert filter_mock.call_count == 2  # noqa: PLR2004
+
+
 def test_open_synch_modal_callback():
     """Test opening of synchronization modal."""
     context_value.set(
@@ -126,3 +242,119 @@ def test_open_periods_modal_callback():
 
     assert output == expected_output
     assert output_new_params != expected_output
+
+
+def test_select_signals_clientside():
+    """Test that ticking a signal only changes the visibility of the traces in the browser."""
+    callbacks = [
+        cb
+        for cb in GLOBAL_CALLBACK_LIST
+        if {"id": ids.PREPROCESING_SIGNALS_CHECKBOX, "property": "value"} in cb["inputs"]
+        and ids.PREPROCESING_PERIODS_GRAPH in cb["output"]
+    ]
+
+    assert len(callbacks) == 1
+    assert callbacks[0]["clientside_function"] == {"namespace": "visibility", "function_name": "periods_signals"}
+
+
+def test_select_period_payload(synthetic_data_object: LoadedData, session_store: SessionStore):
+    """Test that selecting a period only sends the traces of the new period to the browser."""
+    session_store.get(SESSION_ID).loaded_data = synthetic_data_object
+
+    with patch(
+        "eit_dash.callbacks.preprocessing_callbacks.session_store",
+        new=session_store,
+    ):
+        full_figure = create_periods_figure(synthetic_data_object, 0)
+        figure_patch, summary_patch = select_period(
+            1,
+            [1],
+            SIGNALS_OPTIONS,
+            "0",
+            {"xaxis.range[0]": 50, "xaxis.range[1]": 60},
+            SESSION_ID,
+        )
+
+    assert synthetic_data_object.get_stable_periods_indexes() == [0, 1]
+
+    operations = figure_patch.to_plotly_json()["operations"]
+    new_traces = operations[0]["params"]["value"]
+
+    assert operations[0]["operation"] == "Extend"
+    assert [trace["meta"]["uid"] for trace in new_traces] == [1, 1]
+    assert summary_patch.to_plotly_json()["operations"][0]["operation"] == "Append"
+    assert payload_size(figure_patch) < 2 * payload_size(full_figure)
+
+
+def test_remove_period_payload(synthetic_data_object: LoadedData, session_store: SessionStore):
+    """Test that removing a period only sends the indexes of the traces to be deleted to the browser."""
+    session_store.get(SESSION_ID).loaded_data = synthetic_data_object
+
+    context_value.set(
+        AttributeDict(
+            triggered_inputs=[
+                {"prop_id": f'{{"index":"0","type":"{ids.REMOVE_PERIOD_BUTTON}"}}.n_clicks'},
+            ],
+        ),
+    )
+
+    with patch(
+        "eit_dash.callbacks.preprocessing_callbacks.session_store",
+        new=session_store,
+    ):
+        full_figure = create_periods_figure(synthetic_data_object, 0)
+        _, figure_patch = remove_period([1], [], "0", SESSION_ID)
+
+    operations = figure_patch.to_plotly_json()["operations"]
+    deleted = [operation["location"][1] for operation in operations if operation["operation"] == "Delete"]
+    period_traces = [n for n, trace in enumerate(full_figure.data) if trace.meta and trace.meta["uid"] == 0]
+
+    assert synthetic_data_object.get_stable_periods_indexes() == []
+    assert deleted == sorted(period_traces, reverse=True)
+    assert payload_size(figure_patch) * 100 < 2 * payload_size(full_figure)
+
+
+def test_dataset_selection_latency(mock_data_object: LoadedData, session_store: SessionStore):
+    """Test that selecting a dataset returns the checkbox quickly, without creating the figure, created afterwards."""
+    session_store.get(SESSION_ID).loaded_data = mock_data_object
+
+    with (
+        patch(
+            "eit_dash.callbacks.preprocessing_callbacks.session_store",
+            new=session_store,
+        ),
+        patch(
+            "eit_dash.callbacks.preprocessing_callbacks.create_periods_figure",
+            wraps=create_periods_figure,
+        ) as figure_mock,
+    ):
+        start = time.perf_counter()
+        checkbox, figure_dataset = initialize_signals_checkbox("0", SESSION_ID)
+        latency = time.perf_counter() - start
+        figure_mock.assert_not_called()
+
+        figure, style = initialize_figure(figure_dataset, None, checkbox[1].options, SESSION_ID)
+        figure_mock.assert_called_once()
+
+    # the selection only creates the checkbox, so the bound has a large margin, also on a slow machine
+    assert latency < MAX_SELECTION_LATENCY
+    assert figure_dataset == "0"
+    assert checkbox[1].id == ids.PREPROCESING_SIGNALS_CHECKBOX
+    assert style == styles.EMPTY_ELEMENT
+    assert not any(trace.visible for trace in figure.data)
+
+
+def test_initialize_figure_ticked_signals(synthetic_data_object: LoadedData, session_store: SessionStore):
+    """Test that the signals ticked before the figure is ready are shown."""
+    session_store.get(SESSION_ID).loaded_data = synthetic_data_object
+
+    with patch(
+        "eit_dash.callbacks.preprocessing_callbacks.session_store",
+        new=session_store,
+    ):
+        figure, style = initialize_figure("0", [1], SIGNALS_OPTIONS, SESSION_ID)
+
+    visible = {trace.name for trace in figure.data if trace.visible}
+
+    assert visible == {RAW_EIT_LABEL}
+    assert style == styles.GRAPH
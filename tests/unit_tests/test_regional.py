@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+import numpy as np
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.definitions.constants import EELI_RESULT, REGIONAL_RESULT
+from eit_dash.utils.data_singleton import LoadedData
+from eit_dash.utils.eeli import compute_eeli
+from eit_dash.utils.regional import compute_regional_maps, get_period_regional_maps
+from eit_dash.utils.results_store import ResultsStore
+
+
+def test_compute_regional_maps(synthetic_data: Sequence):
+    """Test the maps against the EELI and the tidal variation computed pixel by pixel and breath by breath."""
+    pixels = synthetic_data.eit_data["raw"].pixel_impedance.copy()
+    pixels[:, 0, 0] = np.nan
+    end_expirations = compute_eeli(synthetic_data)["indices"]
+
+    maps = compute_regional_maps(pixels, end_expirations)
+
+    for row, column in [(0, 1), (5, 7), (31, 31)]:
+        pixel = pixels[:, row, column]
+        breaths = zip(end_expirations[:-1], end_expirations[1:], strict=True)
+        tidal_variations = [pixel[start:end].max() - pixel[start] for start, end in breaths]
+
+        assert np.isclose(maps["eeli"][row, column], pixel[end_expirations].mean())
+        assert np.isclose(maps["tidal variation"][row, column], np.mean(tidal_variations))
+
+    assert np.isnan(maps["eeli"][0, 0])
+    # the tidal variation follows the amplitude of the breathing in each pixel
+    assert np.all(maps["tidal variation"][1:, 1:] > 0)
+
+    # a single end-expiration gives no breath
+    maps = compute_regional_maps(pixels, end_expirations[:1])
+    assert np.allclose(maps["eeli"][0, 1:], pixels[end_expirations[0], 0, 1:])
+    assert np.all(np.isnan(maps["tidal variation"]))
+
+
+def test_cached_regional_maps(synthetic_data: Sequence):
+    """Test that the maps of a period are only computed once, together with its EELI."""
+    data_object = LoadedData()
+    data_object.add_sequence(synthetic_data)
+    data_object.add_stable_period(synthetic_data.select_by_time(10, 90, label="Period 0"), 0, 0)
+    period = data_object.get_stable_period(0)
+    results = ResultsStore()
+
+    with patch("eit_dash.utils.regional.compute_regional_maps", wraps=compute_regional_maps) as mock_compute:
+        maps = get_period_regional_maps(period, results)
+        assert get_period_regional_maps(period, results) is maps
+        assert mock_compute.call_count == 1
+
+    assert maps["eeli"].shape == (32, 32)
+    assert set(results.get_period_results(0)) == {EELI_RESULT, REGIONAL_RESULT}
@@ -0,0 +1,58 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from eit_dash.utils.results_store import ResultsStore
+from eit_dash.utils.session_store import SessionStore
+
+
+def test_results_inputs():
+    """Test that a result is only returned for the inputs it has been computed from."""
+    results = ResultsStore()
+    results.set(0, "eeli", {"mean": 1}, ("raw", "{}"))
+
+    assert results.get(0, "eeli", ("raw", "{}")) == {"mean": 1}
+    assert results.get(0, "eeli", ("filtered", "{}")) is None
+    assert results.get(0, "tidal variation", ("raw", "{}")) is None
+    assert results.get(1, "eeli", ("raw", "{}")) is None
+
+    results.set(0, "eeli", {"mean": 2}, ("filtered", "{}"))
+    assert results.get(0, "eeli", ("raw", "{}")) is None
+    assert results.get_period_results(0) == {"eeli": {"mean": 2}}
+
+
+def test_results_concurrent_access():
+    """Test that the results of several threads are all stored, and that the store can be pickled with the session."""
+    results = ResultsStore()
+    n_periods = 1000
+
+    def store(period_index: int) -> None:
+        results.set(period_index, "eeli", period_index)
+        if period_index % 2:
+            results.remove_period(period_index)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(store, range(n_periods)))
+
+    assert len(results) == n_periods // 2
+
+    copy = pickle.loads(pickle.dumps(results))  # noqa: S301
+    assert all(copy.get(n, "eeli") == (None if n % 2 else n) for n in range(n_periods))
+
+
+def test_results_shared_by_workers(tmp_path):
+    """Test that the results stored at the same time by several processes, editing the session, are all saved."""
+    workers = [SessionStore(cache_dir=tmp_path) for _ in range(2)]
+    session_id = workers[0].new_session_id()
+    n_periods = 20
+
+    def store(worker_index: int) -> None:
+        for period_index in range(worker_index, n_periods, len(workers)):
+            with workers[worker_index].edit(session_id) as session:
+                session.results.set(period_index, "eeli", period_index)
+
+    with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        list(executor.map(store, range(len(workers))))
+
+    results = SessionStore(cache_dir=tmp_path).get(session_id).results
+
+    assert all(results.get(n, "eeli") == n for n in range(n_periods))
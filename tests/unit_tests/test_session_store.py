@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from dash.exceptions import PreventUpdate
+from eitprocessing.datahandling.sequence import Sequence
+
+from eit_dash.utils.session_store import SessionData, SessionStore, get_sequence_arrays
+from tests.conftest import create_sequence
+
+
+def get_sequence_nbytes(sequence: Sequence) -> int:
+    return sum(array.nbytes for array in get_sequence_arrays(sequence))
+
+
+def test_sessions_are_isolated():
+    """Test that the data of a session is not visible from the other sessions."""
+    store = SessionStore()
+    first, second = store.new_session_id(), store.new_session_id()
+
+    store.get(first).loaded_data.add_sequence(create_sequence(n_frames=100))
+    store.get(first).file_data = create_sequence(n_frames=100)
+
+    assert first != second
+    assert store.get(first).loaded_data.get_sequence_list_length() == 1
+    assert store.get(second).loaded_data.get_sequence_list_length() == 0
+    assert store.get(second).file_data is None
+
+    with pytest.raises(PreventUpdate):
+        store.get(None)
+
+
+def test_memory_footprint_shared_arrays(synthetic_data: Sequence):
+    """Test that periods, which are views of their datasets, do not count in the memory footprint."""
+    session = SessionData()
+    session.loaded_data.add_sequence(synthetic_data)
+    footprint = session.get_memory_footprint()
+
+    session.loaded_data.add_stable_period(synthetic_data.select_by_time(10, 20), 0, 0)
+
+    assert footprint == session.get_memory_footprint()
+    assert footprint <= get_sequence_nbytes(synthetic_data)
+
+
+def test_lru_eviction():
+    """Test that the least recently used sessions are removed when the memory limit is exceeded."""
+    sequence_nbytes = get_sequence_nbytes(create_sequence(n_frames=100))
+    store = SessionStore(max_bytes=int(2.5 * sequence_nbytes), evict_interval=0)
+    session_ids = [store.new_session_id() for _ in range(3)]
+
+    for session_id in session_ids:
+        store.get(session_id).file_data = create_sequence(n_frames=100)
+
+    # the first session is used again, so the second one becomes the least recently used
+    store.get(session_ids[0])
+
+    assert store.get_session_ids() == [session_ids[2], session_ids[0]]
+    assert store.get_memory_footprint() <= store.max_bytes
+
+
+def test_idle_timeout():
+    """Test that the sessions idle for longer than the timeout are removed."""
+    store = SessionStore(idle_timeout=60, evict_interval=0)
+    idle, active = store.new_session_id(), store.new_session_id()
+    store.get(idle)
+
+    with patch("eit_dash.utils.session_store.time.monotonic", return_value=store.get(idle).last_access + 61):
+        store.get(active)
+
+    assert store.get_session_ids() == [active]
+
+
+def test_shared_cache(tmp_path):
+    """Test that the sessions are shared through the cache directory, as with several worker processes."""
+    first_worker = SessionStore(cache_dir=tmp_path)
+    second_worker = SessionStore(cache_dir=tmp_path)
+    session_id = first_worker.new_session_id()
+
+    sequence = create_sequence(n_frames=100)
+    first_worker.get(session_id).loaded_data.add_sequence(sequence)
+    first_worker.save(session_id)
+
+    shared = second_worker.get(session_id).loaded_data.get_sequence_at(0)
+
+    assert shared.label == sequence.label
+    assert np.array_equal(shared.eit_data["raw"].pixel_impedance, sequence.eit_data["raw"].pixel_impedance)
+
+    # the changes of a worker are loaded by the other one
+    second_worker.get(session_id).loaded_data.add_stable_period(shared, 0, 0)
+    second_worker.save(session_id)
+
+    assert first_worker.get(session_id).loaded_data.get_stable_periods_indexes() == [0]
+
+    # removing a session from memory does not remove it from the cache
+    first_worker.max_bytes = 0
+    first_worker.evict()
+
+    assert first_worker.get_session_ids() == []
+    assert first_worker.get(session_id).loaded_data.get_stable_periods_indexes() == [0]
+
+    first_worker.remove(session_id)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_saved_arrays(tmp_path):
+    """Test that the arrays of a session are saved once, and mapped in memory by the other processes."""
+    first_worker = SessionStore(cache_dir=tmp_path)
+    second_worker = SessionStore(cache_dir=tmp_path)
+    session_id = first_worker.new_session_id()
+    sequence = create_sequence(n_frames=100)
+
+    with first_worker.edit(session_id) as session:
+        session.loaded_data.add_sequence(sequence)
+
+    arrays_path = tmp_path / f"{session_id}.arrays"
+    saved = {path.name: path.stat().st_mtime_ns for path in arrays_path.iterdir()}
+
+    # the session is loaded and saved again by another process, without writing its arrays again
+    with second_worker.edit(session_id) as session:
+        shared = session.loaded_data.get_sequence_at(0)
+        session.loaded_data.add_stable_period(shared.select_by_time(1, 2), 0, 0)
+
+    assert isinstance(shared.eit_data["raw"].pixel_impedance, np.memmap)
+    assert {path.name: path.stat().st_mtime_ns for path in arrays_path.iterdir()} == saved
+    assert (tmp_path / f"{session_id}.pkl").stat().st_size < get_sequence_nbytes(sequence) / 10
+    assert first_worker.get(session_id).loaded_data.get_stable_periods_indexes() == [0]
+
+    # the arrays that are not used anymore are removed once they are not used by the previous version either
+    for _ in range(2):
+        with first_worker.edit(session_id) as session:
+            session.loaded_data.clear_data()
+
+    assert list(arrays_path.iterdir()) == []
+
+
+def test_concurrent_edits(tmp_path):
+    """Test that the changes made to a session at the same time by several processes are not lost."""
+    workers = [SessionStore(cache_dir=tmp_path) for _ in range(2)]
+    session_id = workers[0].new_session_id()
+    n_edits = 20
+
+    def add_datasets(worker: SessionStore) -> None:
+        for _ in range(n_edits):
+            with worker.edit(session_id) as session:
+                session.loaded_data.add_sequence(create_sequence(n_frames=10, pixels=2))
+
+    threads = [threading.Thread(target=add_datasets, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SessionStore(cache_dir=tmp_path).get(session_id).loaded_data.get_sequence_list_length() == 2 * n_edits
+
+
+def test_orphan_cache_files(tmp_path):
+    """Test that accessing a session that is not saved leaves no files, and that the files left are removed."""
+    store = SessionStore(cache_dir=tmp_path, idle_timeout=60, evict_interval=0)
+    session_id = store.new_session_id()
+    store.get(session_id)
+
+    assert list(tmp_path.iterdir()) == []
+
+    # files of a session removed by another process
+    orphans = [tmp_path / f"{store.new_session_id()}{suffix}" for suffix in (".access", ".lock")]
+    for path in orphans:
+        path.touch()
+    store.get(session_id)
+
+    assert all(path.exists() for path in orphans)
+
+    for path in orphans:
+        os.utime(path, (time.time() - 61, time.time() - 61))
+    store.get(session_id)
+
+    assert list(tmp_path.iterdir()) == []